@@ -11,10 +11,12 @@
 # Key Endpoints:
 #   1. POST   /api/rag               — Process interview dialog, generate AI questions, feedback, and suggestions
 #   2. POST   /api/sessions/start    — Start a new interview session and auto-generate the first question
-#   3. GET    /api/sessions/{id}     — Retrieve all questions, answers, and feedback for a session
+#   3. GET    /api/sessions/{id}     — Retrieve questions, answers, and feedback for a session
+#                                    (fields= projection, cursor/limit keyset pages, stream=true)
 #   4. POST   /api/sessions/{id}/end — End a session and calculate scores
-#   5. GET    /api/jobs              — List available job positions
-#   6. GET    /api/jobs/{id}         — Get details for a specific job
+#   5. GET    /api/jobs              — List available job positions (cached, ETag / If-None-Match)
+#                                    (/api/jobs/recommend?plan_id= ranks all jobs for a plan's skills)
+#   6. GET    /api/jobs/{id}         — Get details for a specific job (cached, ETag / If-None-Match)
 #   7. POST   /api/upload-job-desc   — Upload and parse a job description file
 #   8. POST   /api/jd_advice         — Generate preparation advice based on a job description
 #   9. POST   /transcribe            — Speech-to-text (ASR) endpoint (OpenAI Whisper)
@@ -23,17 +25,21 @@
 #
 # Dependencies:
 #   - FastAPI / Uvicorn       : Web framework and server
-#   - SQLAlchemy              : Database ORM
+#   - SQLAlchemy (AsyncSession): Database ORM, accessed via models/repositories.py
 #   - OpenAI API              : LLM Q&A and ASR
 #   - python-dotenv           : Environment variable management
 #
 # Author: BeeBee AI Track-B
 # Version: 1.1.1
 # =============================================================================
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, Request
+from utils.startup_timer import StartupTimer
+startup_timer = StartupTimer()  # 启动耗时统计（导入 / 客户端构建 / 数据库初始化）
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from datetime import datetime
@@ -43,8 +49,9 @@ from pathlib import Path
 from dotenv import load_dotenv
 import json
 import uuid
+import time
+import hashlib
 from fastapi import WebSocket, WebSocketDisconnect, Depends
-from sqlalchemy.orm import Session
 from datetime import datetime
 import urllib.parse
 
@@ -61,34 +68,96 @@ if not os.getenv("OPENAI_API_KEY"):
 from config import config
 from models.database import Database, User, Job, InterviewSession, Question
 from models.planner_models import InterviewPlan, ProgressLog, Achievement, UserAchievement
+from models import repositories
+from models.turn_writer import TurnWriter
+from models.job_catalog import job_catalog
+from models.jd_analysis_cache import jd_analysis_cache
+from models.task_queue import TaskQueue, TaskContext, PermanentTaskError
+from models.task_models import TASK_FINISHED
+from models.migrations import run_startup_steps
 # from asr.transcription import CachedTranscriptionService  # 已移除
 from rag.rag_pipeline import RAGPipeline, InterviewContext
 from tts.voice_synthesis import stream_and_save_tts
 from fastapi.responses import StreamingResponse
 from services.planner_analysis import PlannerAnalysisService
-from services.progress_tracker import ProgressTracker
+from services.resume_store import store_upload
+from services.document_extractor import document_extractor, DocumentExtractionError
+from services.model_registry import embedding_models
+from services.candidate_ranker import CandidateRanker
+from services.job_recommender import job_recommendation_index
+from services.recommendation_catalog import get_recommendation_catalog
+from services.recommendation_cache import recommendation_cache
+from llm.llm_backend import get_llm_stats
+from services.planner_pipeline import get_pipeline_stats
+startup_timer.mark("imports", startup_timer.started)
 
 # from asr.transcription import router as asr_router  # 已移除
 # app.include_router(asr_router, prefix="/api/transcribe")  # 已移除
 app = FastAPI(title="Interview Helper API", version="1.0.0")
 
 # Initialize services
-db = Database(config.DATABASE_URL)
+with startup_timer.phase("clients"):
+    db = Database(config.DATABASE_URL)
+    turn_writer = TurnWriter(
+        db,
+        durability=config.TURN_WRITE_DURABILITY,
+        batch_size=config.TURN_WRITE_BATCH_SIZE,
+        max_delay_ms=config.TURN_WRITE_MAX_DELAY_MS
+    )
+    # transcription_service = CachedTranscriptionService(backend="mock")  # 已移除
+    # transcription_service = CachedTranscriptionService(
+    #     backend=config.DEFAULT_ASR_BACKEND, 
+    #     use_cache=True
+    # )
+    rag_pipeline = RAGPipeline()
+    # tts_service = TTSService(provider="mock")
+    planner_analysis = PlannerAnalysisService(config.OPENAI_API_KEY)
+    task_queue = TaskQueue(
+        db,
+        workers=config.TASK_WORKERS,
+        max_attempts=config.TASK_MAX_ATTEMPTS,
+        retry_delay=config.TASK_RETRY_DELAY,
+        lease_seconds=config.TASK_LEASE_SECONDS,
+        dedup_window=config.TASK_DEDUP_WINDOW
+    )
+    candidate_ranker = CandidateRanker(
+        planner_analysis,
+        db,
+        workers=config.RANK_WORKERS,
+        results_kept=config.RANK_RESULTS_KEPT
+    )
 # db.create_tables()
 # db.init_default_data()
 @app.on_event("startup")
 def startup_event():
-    db.create_tables()
-    db.init_default_data()
+    with startup_timer.phase("db_init"):
+        config.ensure_directories()
+        # 按 schema_versions 跳过已应用的建表 / 种子数据 / 统计回填
+        startup_timer.details["startup_steps"] = run_startup_steps(db)
+        # JD分析 / 推荐缓存落库（表由 schema 步骤创建）
+        jd_analysis_cache.bind(db)
+        recommendation_cache.bind(db)
+    if config.EMBEDDING_WARMUP:
+        # 后台加载嵌入模型，不阻塞启动；首个语义匹配请求直接复用
+        embedding_models.warm_up()
+    startup_timer.print_report()
     print(">>> Database tables created & default data initialized")
-# transcription_service = CachedTranscriptionService(backend="mock")  # 已移除
-# transcription_service = CachedTranscriptionService(
-#     backend=config.DEFAULT_ASR_BACKEND, 
-#     use_cache=True
-# )
-rag_pipeline = RAGPipeline()
-# tts_service = TTSService(provider="mock")
-planner_analysis = PlannerAnalysisService(config.OPENAI_API_KEY)
+
+@app.on_event("startup")
+async def start_turn_writer():
+    await turn_writer.start()
+
+@app.on_event("startup")
+async def start_task_queue():
+    await task_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # 先把排队中的面试轮次写完再释放连接池；执行中的规划任务放回队列
+    await turn_writer.stop()
+    await task_queue.stop()
+    await db.async_engine.dispose()
+    document_extractor.shutdown()
 
 
 # CORS configuration
@@ -102,13 +171,10 @@ app.add_middleware(
 print(">>> This is the actual app.py being loaded")
 # ===== Example Models =====
 # ===== Dependency =====
-def get_db():
-    """Database dependency"""
-    db_session = db.get_session()
-    try:
+async def get_db():
+    """Database dependency (AsyncSession)"""
+    async with db.get_async_session() as db_session:
         yield db_session
-    finally:
-        db_session.close()
 
 # ===== Request/Response Models =====
 class TranscribeResponse(BaseModel):
@@ -178,6 +244,14 @@ class InterviewPlanResponse(BaseModel):
     recommended_practice: List[Dict[str, Any]] = []
     progress: Dict[str, Any] = {}
     badges_earned: List[str] = []
+    stage_timings: Dict[str, Any] = {}
+
+class TaskAcceptedResponse(BaseModel):
+    task_id: str
+    status: str
+    deduplicated: bool = False  # an identical submission is already queued / running / just finished
+    status_url: str
+    events_url: str
 
 class ProgressUpdateRequest(BaseModel):
     activity_type: str  # course, project, interview
@@ -191,46 +265,37 @@ class ProgressUpdateRequest(BaseModel):
 @app.post("/api/rag", response_model=RAGResponse)
 async def rag_endpoint(
     request: RAGRequest,
-    db_session: Session = Depends(get_db)
+    db_session: AsyncSession = Depends(get_db)
 ):
     """Process user input through RAG pipeline"""
     try:
         # Get session if provided
         session = None
         if request.session_id:
-            session = db_session.query(InterviewSession).filter_by(
-                id=request.session_id
-            ).first()
+            session = await repositories.get_interview_session(db_session, request.session_id, with_job=False)
             if not session:
                 raise HTTPException(status_code=404, detail="Session not found")
+        # 岗位信息取自内存中的岗位目录，不再懒加载 session.job
+        job = await job_catalog.get_job(db_session, session.job_id if session else None)
         # Create context，优先用传入的job_desc
         context = InterviewContext(
-            job_title=request.job_title or (session.job.title if session else ""),
-            job_description=request.job_desc if request.job_desc else (session.job.description if session and session.job else None),
+            job_title=request.job_title or (job["title"] if job else ""),
+            job_description=request.job_desc if request.job_desc else (job["description"] if job else None),
             interview_type=request.interview_type or "behavioral",
             session_history=[]
         )
         # If session exists, load history
         if session:
-            questions = db_session.query(Question).filter_by(
-                session_id=session.id
-            ).order_by(Question.order_index).all()
-            context.session_history = [
-                {
-                    "question": q.question_text,
-                    "user_response": q.user_response_text,
-                    "timestamp": q.asked_at.isoformat()
-                }
-                for q in questions
-            ]
+            context.session_history = await turn_writer.history(db_session, session.id)
         # Generate response
-        ai_response, analysis = rag_pipeline.generate_response(
+        ai_response, analysis = await run_in_threadpool(
+            rag_pipeline.generate_response,
             request.user_input, 
             context
         )
         # Save to database if session exists
         if session:
-            question = Question(
+            await turn_writer.enqueue(
                 session_id=session.id,
                 question_text=ai_response,
                 user_response_text=request.user_input,
@@ -240,8 +305,6 @@ async def rag_endpoint(
                 improvements=analysis["suggested_improvements"],
                 answered_at=datetime.utcnow()
             )
-            db_session.add(question)
-            db_session.commit()
         return RAGResponse(
             ai_response=ai_response,
             feedback=analysis["feedback"],
@@ -278,7 +341,7 @@ async def text_to_speech(request: TTSRequest):
 @app.post("/api/rag-tts")
 async def rag_tts_endpoint(
     request: RAGRequest,
-    db_session: Session = Depends(get_db)
+    db_session: AsyncSession = Depends(get_db)
 ):
     """
     RAG pipeline + TTS: returns both text and streamed audio of AI response
@@ -288,35 +351,26 @@ async def rag_tts_endpoint(
         # (以下代码复用你的rag_endpoint逻辑)
         session = None
         if request.session_id:
-            session = db_session.query(InterviewSession).filter_by(
-                id=request.session_id
-            ).first()
+            session = await repositories.get_interview_session(db_session, request.session_id, with_job=False)
             if not session:
                 raise HTTPException(status_code=404, detail="Session not found")
+        # 岗位信息取自内存中的岗位目录，不再懒加载 session.job
+        job = await job_catalog.get_job(db_session, session.job_id if session else None)
         context = InterviewContext(
-            job_title=request.job_title or (session.job.title if session else ""),
-            job_description=request.job_desc if request.job_desc else (session.job.description if session and session.job else None),
+            job_title=request.job_title or (job["title"] if job else ""),
+            job_description=request.job_desc if request.job_desc else (job["description"] if job else None),
             interview_type=request.interview_type or "behavioral",
             session_history=[]
         )
         if session:
-            questions = db_session.query(Question).filter_by(
-                session_id=session.id
-            ).order_by(Question.order_index).all()
-            context.session_history = [
-                {
-                    "question": q.question_text,
-                    "user_response": q.user_response_text,
-                    "timestamp": q.asked_at.isoformat()
-                }
-                for q in questions
-            ]
-        ai_response, analysis = rag_pipeline.generate_response(
+            context.session_history = await turn_writer.history(db_session, session.id)
+        ai_response, analysis = await run_in_threadpool(
+            rag_pipeline.generate_response,
             request.user_input, 
             context
         )
         if session:
-            question = Question(
+            await turn_writer.enqueue(
                 session_id=session.id,
                 question_text=ai_response,
                 user_response_text=request.user_input,
@@ -326,8 +380,6 @@ async def rag_tts_endpoint(
                 improvements=analysis["suggested_improvements"],
                 answered_at=datetime.utcnow()
             )
-            db_session.add(question)
-            db_session.commit()
 
 
         #  3. TTS合成与StreamingResponse返回
@@ -376,43 +428,34 @@ def multipart_rag_tts_generator(ai_response, analysis, audio_generator, boundary
 @app.post("/api/rag-tts-multipart")
 async def rag_tts_multipart_endpoint(
     request: RAGRequest,
-    db_session: Session = Depends(get_db)
+    db_session: AsyncSession = Depends(get_db)
 ):
     try:
         # --- 1. session与context加载 ---
         session = None
         if request.session_id:
-            session = db_session.query(InterviewSession).filter_by(
-                id=request.session_id
-            ).first()
+            session = await repositories.get_interview_session(db_session, request.session_id, with_job=False)
             if not session:
                 raise HTTPException(status_code=404, detail="Session not found")
+        # 岗位信息取自内存中的岗位目录，不再懒加载 session.job
+        job = await job_catalog.get_job(db_session, session.job_id if session else None)
         context = InterviewContext(
-            job_title=request.job_title or (session.job.title if session else ""),
-            job_description=request.job_desc if request.job_desc else (session.job.description if session and session.job else None),
+            job_title=request.job_title or (job["title"] if job else ""),
+            job_description=request.job_desc if request.job_desc else (job["description"] if job else None),
             interview_type=request.interview_type or "behavioral",
             session_history=[]
         )
         if session:
-            questions = db_session.query(Question).filter_by(
-                session_id=session.id
-            ).order_by(Question.order_index).all()
-            context.session_history = [
-                {
-                    "question": q.question_text,
-                    "user_response": q.user_response_text,
-                    "timestamp": q.asked_at.isoformat()
-                }
-                for q in questions
-            ]
+            context.session_history = await turn_writer.history(db_session, session.id)
         # --- 2. RAG pipeline生成反馈 ---
-        ai_response, analysis = rag_pipeline.generate_response(
+        ai_response, analysis = await run_in_threadpool(
+            rag_pipeline.generate_response,
             request.user_input, 
             context
         )
         # --- 3. 数据库写入 ---
         if session:
-            question = Question(
+            await turn_writer.enqueue(
                 session_id=session.id,
                 question_text=ai_response,
                 user_response_text=request.user_input,
@@ -422,8 +465,6 @@ async def rag_tts_multipart_endpoint(
                 improvements=analysis["suggested_improvements"],
                 answered_at=datetime.utcnow()
             )
-            db_session.add(question)
-            db_session.commit()
 
         # --- 4. TTS音频流/multipart返回 ---
         voice = getattr(request, "voice", "alloy")
@@ -440,10 +481,7 @@ async def rag_tts_multipart_endpoint(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"RAG+TTS multipart failed: {str(e)}")
 
-async def rag_tts_ws_handler(
-    websocket: WebSocket,
-    db_session: Session = Depends(get_db)
-):
+async def rag_tts_ws_handler(websocket: WebSocket):
     print(">>> [WebSocket] rag_tts_ws_handler called")
     await websocket.accept()
     print(">>> Client connected")
@@ -462,36 +500,27 @@ async def rag_tts_ws_handler(
             interview_type = data.get("interview_type", "behavioral")
             voice = data.get("voice", "alloy")
             tts_model = data.get("tts_model", "tts-1")
-            # 新会话逻辑
-            if not session_id and "session_id" in data:
-                session_id = data["session_id"]
-                session = db_session.query(InterviewSession).filter_by(
-                    id=session_id
-                ).first()
-            # 构建面试上下文
-            context = InterviewContext(
-                job_title=job_title or (session.job.title if session and session.job else ""),
-                job_description=job_desc or (session.job.description if session and session.job else ""),
-                interview_type=interview_type,
-                session_history=[]
-            )
-            if session:
-                questions = db_session.query(Question).filter_by(
-                    session_id=session.id
-                ).order_by(Question.order_index).all()
-                context.session_history = [
-                    {
-                        "question": q.question_text,
-                        "user_response": q.user_response_text,
-                        "timestamp": q.asked_at.isoformat()
-                    }
-                    for q in questions
-                ]
+            # 每轮使用短生命周期的数据库会话，不在整个连接期间占用连接
+            async with db.get_async_session() as db_session:
+                # 新会话逻辑
+                if not session_id and "session_id" in data:
+                    session_id = data["session_id"]
+                    session = await repositories.get_interview_session(db_session, session_id, with_job=False)
+                job = await job_catalog.get_job(db_session, session.job_id if session else None)
+                # 构建面试上下文
+                context = InterviewContext(
+                    job_title=job_title or (job["title"] if job else ""),
+                    job_description=job_desc or (job["description"] if job else ""),
+                    interview_type=interview_type,
+                    session_history=[]
+                )
+                if session:
+                    context.session_history = await turn_writer.history(db_session, session.id)
             # 1. RAG生成AI回复和结构化分析
-            ai_response, analysis = rag_pipeline.generate_response(user_input, context)
+            ai_response, analysis = await run_in_threadpool(rag_pipeline.generate_response, user_input, context)
             # 2. 写入数据库
             if session:
-                question = Question(
+                await turn_writer.enqueue(
                     session_id=session.id,
                     question_text=ai_response,
                     user_response_text=user_input,
@@ -501,8 +530,6 @@ async def rag_tts_ws_handler(
                     improvements=analysis["suggested_improvements"],
                     answered_at=datetime.utcnow()
                 )
-                db_session.add(question)
-                db_session.commit()
             # 3. 推送结构化文本反馈
             await websocket.send_json({
                 "ai_response": ai_response,
@@ -525,10 +552,10 @@ async def rag_tts_ws_handler(
 print(">>> registering ws_router")
 ws_router = APIRouter()
 @ws_router.websocket("/ws/interview")
-async def interview_ws(websocket: WebSocket, db_session: Session = Depends(get_db)):
+async def interview_ws(websocket: WebSocket):
     print("DEBUG: interview_ws")
     try:
-        await rag_tts_ws_handler(websocket, db_session)
+        await rag_tts_ws_handler(websocket)
     except WebSocketDisconnect:
         print("WebSocket disconnected normally.")
     except Exception as e:
@@ -540,46 +567,80 @@ async def interview_ws(websocket: WebSocket, db_session: Session = Depends(get_d
 app.include_router(ws_router, tags=["WebSocket"])
 print(">>> ws_router included")
 
+def _etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match check (list of ETags, weak prefix or *)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
 @app.get("/api/jobs", response_model=List[JobResponse])
 async def list_jobs(
+    request: Request,
+    response: Response,
     category: Optional[str] = None,
-    db_session: Session = Depends(get_db)
+    db_session: AsyncSession = Depends(get_db)
 ):
-    """Get available job positions"""
-    query = db_session.query(Job)
-    if category:
-        query = query.filter(Job.category == category)
-    jobs = query.all()
+    """Get available job positions (served from the in-process job catalog, ETag/304 aware)"""
+    jobs, etag = await job_catalog.list_jobs(db_session, category)
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
     return [
         JobResponse(
-            id=str(job.id),
-            title=str(job.title),
-            category=str(job.category),
-            description=str(job.description) if job.description is not None else None,
-            skills=job.skills if isinstance(job.skills, list) else [],
-            experience_level=str(job.experience_level) if job.experience_level is not None else None
+            id=str(job["id"]),
+            title=str(job["title"]),
+            category=str(job["category"]),
+            description=str(job["description"]) if job["description"] is not None else None,
+            skills=job["skills"] if isinstance(job["skills"], list) else [],
+            experience_level=str(job["experience_level"]) if job["experience_level"] is not None else None
         )
         for job in jobs
     ]
 
+@app.get("/api/jobs/recommend")
+async def recommend_jobs(
+    plan_id: str,
+    limit: int = 10,
+    category: Optional[str] = None,
+    db_session: AsyncSession = Depends(get_db)
+):
+    """Rank every job against a plan's skills (sparse skill × job index, see services/job_recommender.py)"""
+    if not 1 <= limit <= config.JOB_RECOMMEND_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {config.JOB_RECOMMEND_MAX_LIMIT}")
+    plan = await repositories.get_plan(db_session, plan_id)
+    if not plan:
+        raise HTTPException(status_code=404, detail="Plan not found")
+    jobs = await job_recommendation_index.recommend(db_session, plan.skills or [], limit=limit, category=category)
+    return {"plan_id": plan.id, "skills": plan.skills or [], "jobs": jobs}
+
 @app.get("/api/jobs/{job_id}")
 async def get_job_details(
     job_id: str,
-    db_session: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db_session: AsyncSession = Depends(get_db)
 ):
     """Get details for a specific job"""
-    job = db_session.query(Job).filter_by(id=job_id).first()
+    job = await job_catalog.get_job(db_session, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
+    etag = job_catalog.job_etag(job_id)
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
     return {
-        "id": job.id,
-        "title": job.title,
-        "category": job.category,
-        "description": job.description,
-        "skills": job.skills,
-        "experience_level": job.experience_level,
-        "common_questions": job.common_questions,
-        "evaluation_criteria": job.evaluation_criteria
+        "id": job["id"],
+        "title": job["title"],
+        "category": job["category"],
+        "description": job["description"],
+        "skills": job["skills"],
+        "experience_level": job["experience_level"],
+        "common_questions": job["common_questions"],
+        "evaluation_criteria": job["evaluation_criteria"]
     }
 
 @app.post("/api/sessions/start", response_model=SessionResponse)
@@ -587,34 +648,24 @@ async def start_session(
     job_id: str = Form(...),
     user_id: Optional[str] = Form(None),
     interview_type: str = Form("behavioral"),
-    db_session: Session = Depends(get_db)
+    db_session: AsyncSession = Depends(get_db)
 ):
     """Start a new interview session"""
     # Verify job exists
-    job = db_session.query(Job).filter_by(id=job_id).first()
+    job = await job_catalog.get_job(db_session, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    # Create session
-    session = InterviewSession(
-        user_id=user_id,
+    # Create session and ask first question
+    session = await repositories.create_interview_session(
+        db_session,
         job_id=job_id,
-        interview_type=interview_type
-    )
-    db_session.add(session)
-    db_session.commit()
-    db_session.refresh(session)
-    # Ask first question
-    first_question = Question(
-        session_id=session.id,
-        question_text="Tell me about yourself and why you're interested in this position.",
-        question_type="behavioral",
-        order_index=0
+        user_id=user_id,
+        interview_type=interview_type,
+        first_question="Tell me about yourself and why you're interested in this position."
     )
-    db_session.add(first_question)
-    db_session.commit()
     return SessionResponse(
         session_id=str(session.id),
-        job_title=str(job.title),
+        job_title=str(job["title"]),
         start_time=session.start_time if isinstance(session.start_time, datetime) else datetime.utcnow(),
         questions_count=1
     )
@@ -622,16 +673,48 @@ async def start_session(
 @app.get("/api/sessions/{session_id}")
 async def get_session(
     session_id: str,
-    db_session: Session = Depends(get_db)
+    fields: Optional[str] = None,
+    cursor: Optional[int] = None,
+    limit: Optional[int] = None,
+    stream: bool = False,
+    db_session: AsyncSession = Depends(get_db)
 ):
-    """Get session details with all questions and feedback"""
-    session = db_session.query(InterviewSession).filter_by(id=session_id).first()
+    """Get session details with its questions and feedback
+
+    - fields: comma-separated question fields to return (default: all of QUESTION_FIELDS)
+    - cursor / limit: keyset pagination on order_index; pass back next_cursor for the next page
+    - stream: serialize questions as they are fetched instead of building the whole payload
+    - sessions moved to cold storage (services/session_archiver.py) are read through the archive
+    """
+    field_names = [name.strip() for name in fields.split(",") if name.strip()] if fields else list(repositories.QUESTION_FIELDS)
+    unknown = [name for name in field_names if name not in repositories.QUESTION_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    if limit is not None and not 1 <= limit <= config.SESSION_PAGE_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {config.SESSION_PAGE_MAX_LIMIT}")
+    # 多取一行用于判断是否还有下一页
+    fetch_limit = limit + 1 if limit is not None else None
+    session = await repositories.get_interview_session(db_session, session_id)
     if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    questions = db_session.query(Question).filter_by(
-        session_id=session_id
-    ).order_by(Question.order_index).all()
-    return {
+        # 已归档的会话从冷存储读取
+        record = await repositories.get_archived_session(db_session, session_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        header = {
+            "session_id": record["id"],
+            "job": record["job"],
+            "interview_type": record["interview_type"],
+            "start_time": record["start_time"],
+            "end_time": record["end_time"],
+            "duration_seconds": record["duration_seconds"],
+            "overall_score": record["overall_score"],
+            "archived": True
+        }
+        rows = repositories.archived_question_page(record, field_names, cursor, fetch_limit)
+        return _question_page_response(header, rows, limit)
+    # 等待该会话排队中的轮次落库
+    await turn_writer.wait_for_session(session_id)
+    header = {
         "session_id": session.id,
         "job": {
             "title": session.job.title,
@@ -641,50 +724,54 @@ async def get_session(
         "start_time": session.start_time,
         "end_time": session.end_time,
         "duration_seconds": session.duration_seconds,
-        "overall_score": session.overall_score,
-        "questions": [
-            {
-                "id": q.id,
-                "question": q.question_text,
-                "user_response": q.user_response_text,
-                "score": q.score,
-                "feedback": q.ai_feedback,
-                "improvements": q.improvements,
-                "asked_at": q.asked_at,
-                "answered_at": q.answered_at
-            }
-            for q in questions
-        ]
+        "overall_score": session.overall_score
     }
 
+    if stream:
+        async def stream_transcript():
+            head = json.dumps(jsonable_encoder(header), ensure_ascii=False)
+            yield head[:-1] + ', "questions": ['
+            count, last_index, has_more = 0, None, False
+            async with db.get_async_session() as stream_session:
+                async for row in repositories.stream_questions(stream_session, session_id, field_names, cursor, fetch_limit):
+                    if limit is not None and count == limit:
+                        has_more = True
+                        break
+                    last_index = row.pop("order_index")
+                    yield ("," if count else "") + json.dumps(jsonable_encoder(row), ensure_ascii=False)
+                    count += 1
+            yield '], "next_cursor": ' + json.dumps(last_index if has_more else None) + "}"
+        return StreamingResponse(stream_transcript(), media_type="application/json")
+
+    rows = await repositories.list_question_page(db_session, session_id, field_names, cursor, fetch_limit)
+    return _question_page_response(header, rows, limit)
+
+def _question_page_response(header: Dict[str, Any], rows: List[Dict[str, Any]], limit: Optional[int]) -> Dict[str, Any]:
+    """Trim the look-ahead row and attach next_cursor"""
+    has_more = limit is not None and len(rows) > limit
+    rows = rows[:limit] if limit is not None else rows
+    next_cursor = rows[-1]["order_index"] if has_more else None
+    for row in rows:
+        row.pop("order_index")
+    return {**header, "questions": rows, "next_cursor": next_cursor}
+
 @app.post("/api/sessions/{session_id}/end")
 async def end_session(
     session_id: str,
-    db_session: Session = Depends(get_db)
+    db_session: AsyncSession = Depends(get_db)
 ):
     """End interview session and calculate final scores"""
-    session = db_session.query(InterviewSession).filter_by(id=session_id).first()
+    session = await repositories.get_interview_session(db_session, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
-    # Calculate scores
-    questions = db_session.query(Question).filter_by(session_id=session_id).all()
-    if questions:
-        scores = [q.score for q in questions if q.score is not None]
-        if scores:
-            avg_score = sum(scores) / len(scores)
-            db_session.query(InterviewSession).filter_by(id=session_id).update({"overall_score": avg_score})
-    # Update session end_time and duration_seconds
-    end_time = datetime.utcnow()
-    duration = 0
-    if isinstance(session.start_time, datetime):
-        duration = int((end_time - session.start_time).total_seconds())
-    db_session.query(InterviewSession).filter_by(id=session_id).update({"end_time": end_time, "duration_seconds": duration})
-    db_session.commit()
+    # Calculate scores, end_time and duration_seconds (after queued turns are committed)
+    await turn_writer.wait_for_session(session_id)
+    questions_asked = await repositories.end_interview_session(db_session, session)
     return {
         "session_id": session.id,
         "overall_score": session.overall_score,
         "duration_seconds": session.duration_seconds,
-        "questions_asked": len(questions),
+        "questions_asked": questions_asked,
         "end_time": session.end_time
     }
 
@@ -692,7 +779,7 @@ async def end_session(
 async def upload_job_description(
     file: UploadFile = File(...),
     job_title: Optional[str] = Form(None),
-    db_session: Session = Depends(get_db)
+    db_session: AsyncSession = Depends(get_db)
 ):
     """Upload and parse job description"""
     try:
@@ -706,12 +793,15 @@ async def upload_job_description(
         file_path = upload_dir / f"{datetime.utcnow().timestamp()}_{file.filename}"
         with open(file_path, "wb") as f:
             f.write(content)
-        # Extract text (simplified - in production use proper parsers)
+        # Extract text (PDF/DOCX parsed in the document extractor's process pool)
         if file.content_type == "text/plain":
             text_content = content.decode("utf-8")
         else:
-            # For PDF/DOCX, you'd use appropriate libraries
-            text_content = "Parsed job description content"
+            try:
+                document = await document_extractor.extract(file_path)
+            except DocumentExtractionError as e:
+                raise HTTPException(status_code=422, detail=str(e))
+            text_content = document.text
         # Extract key information (mock implementation)
         extracted_info = {
             "title": job_title or "Extracted Job Title",
@@ -722,8 +812,11 @@ async def upload_job_description(
         return {
             "message": "Job description uploaded successfully",
             "file_path": str(file_path),
+            "text_content": text_content,
             "extracted_info": extracted_info
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
@@ -778,164 +871,160 @@ async def health_check():
             "database": "connected",
             "rag": "ready",
             "tts": "ready"
-        }
+        },
+        "llm": get_llm_stats(),
+        "db": db.get_metrics(),
+        "turn_writer": turn_writer.get_stats(),
+        "task_queue": task_queue.get_stats(),
+        "job_catalog": job_catalog.get_stats(),
+        "jd_analysis_cache": jd_analysis_cache.get_stats(),
+        "document_extractor": document_extractor.get_stats(),
+        "embedding_models": embedding_models.get_stats(),
+        "candidate_ranker": candidate_ranker.get_stats(),
+        "job_recommendations": job_recommendation_index.get_stats(),
+        "recommendation_catalog": get_recommendation_catalog().get_stats(),
+        "recommendation_cache": recommendation_cache.get_stats(),
+        "planner": get_pipeline_stats(),
+        "startup": startup_timer.report()
     }
 
 @app.get("/api/stats")
 async def get_statistics(
     user_id: Optional[str] = None,
-    db_session: Session = Depends(get_db)
+    db_session: AsyncSession = Depends(get_db)
 ):
     """Get user statistics"""
-    query = db_session.query(InterviewSession)
-    if user_id:
-        query = query.filter_by(user_id=user_id)
-    sessions = query.all()
-    if not sessions:
-        return {
-            "total_sessions": 0,
-            "average_score": 0,
-            "total_practice_time": 0,
-            "most_practiced_role": None
-        }
-    # Calculate statistics
-    total_time = sum(s.duration_seconds or 0 for s in sessions)
-    scores = [float(s.overall_score) for s in sessions if s.overall_score is not None and isinstance(s.overall_score, (float, int))]
-    avg_score = sum(scores) / len(scores) if scores else 0.0
-    # Most practiced role
-    job_counts = {}
-    for s in sessions:
-        job_title = s.job.title
-        job_counts[job_title] = job_counts.get(job_title, 0) + 1
-    most_practiced = max(job_counts.items(), key=lambda x: x[1])[0] if job_counts else None
-    return {
-        "total_sessions": len(sessions),
-        "average_score": round(avg_score, 2),
-        "total_practice_time": total_time,
-        "most_practiced_role": most_practiced,
-        "recent_sessions": [
-            {
-                "id": s.id,
-                "job_title": s.job.title,
-                "date": s.start_time,
-                "score": s.overall_score,
-                "duration": s.duration_seconds
-            }
-            for s in sorted(sessions, key=lambda x: x.start_time if isinstance(x.start_time, datetime) else datetime.min, reverse=True)[:5]
-        ]
-    }
+    return await repositories.get_statistics(db_session, user_id)
 
 # ===== Interview Planner Endpoints =====
 
-@app.post("/api/planner/create", response_model=InterviewPlanResponse)
-async def create_interview_plan(
-    request: InterviewPlanRequest,
-    db_session: Session = Depends(get_db)
-):
-    """创建面试规划"""
+def _task_dedup_key(kind: str, payload: Dict[str, Any]) -> str:
+    return f"{kind}:" + hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def _task_accepted(task: Dict[str, Any], deduplicated: bool) -> TaskAcceptedResponse:
+    return TaskAcceptedResponse(
+        task_id=task["id"],
+        status=task["status"],
+        deduplicated=deduplicated,
+        status_url=f"/api/tasks/{task['id']}",
+        events_url=f"/api/tasks/{task['id']}/events"
+    )
+
+@app.post("/api/planner/create", status_code=202, response_model=TaskAcceptedResponse)
+async def create_interview_plan(request: InterviewPlanRequest):
+    """创建面试规划（入队后立即返回任务ID，进度见 /api/tasks/{task_id}）"""
+    payload = jsonable_encoder(request)
+    task, deduplicated = await task_queue.submit("plan_create", payload, dedup_key=_task_dedup_key("plan_create", payload))
+    print(f"📥 面试规划任务已入队: {task['id']} ({'重复提交，复用' if deduplicated else '新任务'})")
+    return _task_accepted(task, deduplicated)
+
+async def run_plan_create(payload: Dict[str, Any], ctx: TaskContext) -> Dict[str, Any]:
+    """任务：创建面试规划"""
+    request = InterviewPlanRequest(**payload)
     print(f"🚀 开始创建面试规划: {request.job_title}")
     print(f"📝 JD长度: {len(request.job_description)} 字符")
     print(f"👤 用户技能: {request.skills}")
     print(f"⏰ 工作经验: {request.experience_years} 年")
-    
-    try:
-        # 1. 保存用户画像和JD
-        plan = InterviewPlan(
-            job_title=request.job_title,
-            job_description=request.job_description,
-            target_company=request.target_company,
-            experience_years=request.experience_years,
-            skills=request.skills,
-            career_goals=request.career_goals
-        )
-        db_session.add(plan)
-        db_session.commit()
-        print(f"✅ 计划创建成功: {plan.id}")
-        
-        # 2. 调用AI分析匹配度
-        print("🎯 开始AI分析匹配度...")
-        analysis_result = await planner_analysis.analyze_job_match(
-            request.job_description, 
-            request.skills, 
-            request.experience_years or 0
-        )
-        
-        print(f"📊 AI分析结果:")
-        print(f"  - 技能匹配度: {analysis_result['skill_match']}%")
-        print(f"  - 经验匹配度: {analysis_result['experience_match']}%")
-        print(f"  - 整体匹配度: {analysis_result['overall_match']}%")
-        print(f"  - 差距数量: {len(analysis_result['gaps'])}")
-        print(f"  - 优势数量: {len(analysis_result['strengths'])}")
-        
-        # 显示差距详情
-        if analysis_result['gaps']:
-            print("📋 技能差距详情:")
-            for gap in analysis_result['gaps']:
-                print(f"  - {gap['skill']} ({gap['status']}, 优先级: {gap['priority']})")
-        
-        # 显示优势详情
-        if analysis_result['strengths']:
-            print("✅ 技能优势详情:")
-            for strength in analysis_result['strengths']:
-                print(f"  - {strength['skill']} (重要性: {strength['importance']})")
-        
-        # 3. 生成推荐
-        print("💡 开始生成推荐...")
-        recommendations = await planner_analysis.generate_recommendations(analysis_result)
-        
-        print(f"📚 推荐生成完成:")
-        print(f"  - 课程数量: {len(recommendations.get('courses', []))}")
-        print(f"  - 项目数量: {len(recommendations.get('projects', []))}")
-        print(f"  - 练习数量: {len(recommendations.get('practice', []))}")
-        
-        # 4. 更新计划
-        plan.skill_match_score = analysis_result["skill_match"]
-        plan.experience_match_score = analysis_result["experience_match"]
-        plan.gap_analysis = analysis_result
-        plan.recommended_courses = recommendations["courses"]
-        plan.recommended_projects = recommendations["projects"]
-        plan.recommended_practice = recommendations["practice"]
-        
-        db_session.commit()
-        print(f"✅ 计划更新完成")
-        
-        # 5. 计算进度
-        progress_tracker = ProgressTracker(db_session)
-        progress = progress_tracker.calculate_plan_progress(plan)
-        
-        return InterviewPlanResponse(
-            id=plan.id,
-            job_title=plan.job_title,
-            skill_match_score=plan.skill_match_score,
-            experience_match_score=plan.experience_match_score,
-            experience_years=plan.experience_years,
-            skills=plan.skills,
-            gap_analysis=plan.gap_analysis,
-            recommended_courses=plan.recommended_courses,
-            recommended_projects=plan.recommended_projects,
-            recommended_practice=plan.recommended_practice,
-            progress=progress,
-            badges_earned=plan.badges_earned or []
-        )
-        
-    except Exception as e:
-        print(f"❌ 创建面试规划失败: {e}")
-        db_session.rollback()
-        raise HTTPException(status_code=500, detail=str(e))
+
+    async with db.get_async_session() as db_session:
+        try:
+            # 1. 保存用户画像和JD（重试时复用上次已创建的计划）
+            plan = await repositories.get_plan(db_session, ctx.checkpoint["plan_id"]) if "plan_id" in ctx.checkpoint else None
+            if plan is None:
+                plan = await repositories.create_plan(
+                    db_session,
+                    job_title=request.job_title,
+                    job_description=request.job_description,
+                    target_company=request.target_company,
+                    experience_years=request.experience_years,
+                    skills=request.skills,
+                    career_goals=request.career_goals
+                )
+                await ctx.save_checkpoint(plan_id=plan.id)
+            print(f"✅ 计划创建成功: {plan.id}")
+            await ctx.report("plan_saved", plan_id=plan.id)
+
+            # 2. 调用AI分析匹配度并生成推荐（详细分析与推荐并发执行，每个阶段完成即上报进度）
+            print("🎯 开始AI分析匹配度...")
+            analysis_result, recommendations, stage_timings = await planner_analysis.plan_job_match(
+                request.job_description,
+                request.skills,
+                request.experience_years or 0,
+                on_stage=lambda name, timing: ctx.report(name, ms=timing["ms"], status=timing["status"])
+            )
+
+            print(f"📊 AI分析结果:")
+            print(f"  - 技能匹配度: {analysis_result['skill_match']}%")
+            print(f"  - 经验匹配度: {analysis_result['experience_match']}%")
+            print(f"  - 整体匹配度: {analysis_result['overall_match']}%")
+            print(f"  - 差距数量: {len(analysis_result['gaps'])}")
+            print(f"  - 优势数量: {len(analysis_result['strengths'])}")
+
+            # 显示差距详情
+            if analysis_result['gaps']:
+                print("📋 技能差距详情:")
+                for gap in analysis_result['gaps']:
+                    print(f"  - {gap['skill']} ({gap['status']}, 优先级: {gap['priority']})")
+
+            # 显示优势详情
+            if analysis_result['strengths']:
+                print("✅ 技能优势详情:")
+                for strength in analysis_result['strengths']:
+                    print(f"  - {strength['skill']} (重要性: {strength['importance']})")
+
+            print(f"📚 推荐生成完成:")
+            print(f"  - 课程数量: {len(recommendations.get('courses', []))}")
+            print(f"  - 项目数量: {len(recommendations.get('projects', []))}")
+            print(f"  - 练习数量: {len(recommendations.get('practice', []))}")
+
+            # 3. 更新计划（差距/优势、推荐项写入子表）
+            persist_started = time.perf_counter()
+            await repositories.save_plan_analysis(db_session, plan, analysis_result)
+            await repositories.save_plan_recommendations(db_session, plan, recommendations)
+
+            await db_session.commit()
+            stage_timings["stages"]["persist"] = {"ms": round((time.perf_counter() - persist_started) * 1000, 2), "status": "ok"}
+            await ctx.report("persist", **stage_timings["stages"]["persist"])
+            print(f"✅ 计划更新完成")
+
+            # 4. 计算进度
+            progress = await repositories.run_progress_tracker(db_session, lambda t: t.calculate_plan_progress(plan))
+
+            return jsonable_encoder(InterviewPlanResponse(
+                id=plan.id,
+                job_title=plan.job_title,
+                skill_match_score=plan.skill_match_score,
+                experience_match_score=plan.experience_match_score,
+                experience_years=plan.experience_years,
+                skills=plan.skills,
+                gap_analysis=analysis_result,
+                recommended_courses=recommendations["courses"],
+                recommended_projects=recommendations["projects"],
+                recommended_practice=recommendations["practice"],
+                progress=progress,
+                badges_earned=plan.badges_earned or [],
+                stage_timings=stage_timings
+            ))
+
+        except Exception as e:
+            print(f"❌ 创建面试规划失败: {e}")
+            await db_session.rollback()
+            raise
 
 @app.get("/api/planner/{plan_id}", response_model=InterviewPlanResponse)
 async def get_interview_plan(
     plan_id: str,
-    db_session: Session = Depends(get_db)
+    db_session: AsyncSession = Depends(get_db)
 ):
     """获取面试规划详情"""
-    plan = db_session.query(InterviewPlan).filter(InterviewPlan.id == plan_id).first()
+    plan = await repositories.get_plan(db_session, plan_id)
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found")
     
     # 计算进度
-    progress_tracker = ProgressTracker(db_session)
-    progress = progress_tracker.calculate_plan_progress(plan)
+    progress = await repositories.run_progress_tracker(db_session, lambda t: t.calculate_plan_progress(plan))
+    gap_analysis = await repositories.load_plan_analysis(db_session, plan)
+    recommendations = await repositories.load_plan_recommendations(db_session, plan.id)
     
     return InterviewPlanResponse(
         id=plan.id,
@@ -944,10 +1033,8 @@ async def get_interview_plan(
         experience_match_score=plan.experience_match_score,
         experience_years=plan.experience_years,
         skills=plan.skills,
-        gap_analysis=plan.gap_analysis,
-        recommended_courses=plan.recommended_courses,
-        recommended_projects=plan.recommended_projects,
-        recommended_practice=plan.recommended_practice,
+        gap_analysis=gap_analysis,
+        **recommendations,
         progress=progress,
         badges_earned=plan.badges_earned or []
     )
@@ -956,175 +1043,279 @@ async def get_interview_plan(
 async def update_progress(
     plan_id: str,
     request: ProgressUpdateRequest,
-    db_session: Session = Depends(get_db)
+    db_session: AsyncSession = Depends(get_db)
 ):
     """更新学习进度"""
-    plan = db_session.query(InterviewPlan).filter(InterviewPlan.id == plan_id).first()
+    plan = await repositories.get_plan(db_session, plan_id)
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found")
     
-    progress_tracker = ProgressTracker(db_session)
-    result = progress_tracker.update_progress(
+    result = await repositories.run_progress_tracker(db_session, lambda t: t.update_progress(
         plan_id=plan_id,
         activity_type=request.activity_type,
         activity_id=request.activity_id,
         activity_name=request.activity_name,
         progress_percentage=request.progress_percentage,
         completed=request.completed
-    )
+    ))
     
     return result
 
-@app.post("/api/planner/{plan_id}/upload-resume")
+@app.post("/api/planner/{plan_id}/upload-resume", status_code=202, response_model=TaskAcceptedResponse)
 async def upload_resume(
     plan_id: str,
     file: UploadFile = File(...),
-    db_session: Session = Depends(get_db)
+    db_session: AsyncSession = Depends(get_db)
 ):
-    """上传简历"""
+    """上传简历（文件落盘后入队解析与重新匹配，立即返回任务ID）"""
     print(f"📄 开始处理简历上传: plan_id={plan_id}, filename={file.filename}")
-    
-    plan = db_session.query(InterviewPlan).filter(InterviewPlan.id == plan_id).first()
+
+    plan = await repositories.get_plan(db_session, plan_id)
     if not plan:
         print(f"❌ Plan not found: {plan_id}")
         raise HTTPException(status_code=404, detail="Plan not found")
-    
+
+    # 保存文件（边写边计算哈希，按内容寻址去重）
     try:
-        # 保存文件
-        file_path = f"uploads/resumes/{plan_id}_{file.filename}"
-        os.makedirs("uploads/resumes", exist_ok=True)
-        
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-        
-        print(f"✅ 简历文件保存成功: {file_path}")
-        
-        plan.resume_path = file_path
-        
-        # 解析简历内容
-        print("🔍 开始解析简历内容...")
+        stored = await store_upload(file)
+    except ValueError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    print(f"✅ 简历文件保存成功: {stored.path} ({'已存在，复用' if stored.deduplicated else '新文件'})")
+
+    payload = {
+        "plan_id": plan_id,
+        "path": str(stored.path),
+        "relative_path": stored.relative_path,
+        "content_hash": stored.content_hash,
+        "size": stored.size,
+        "deduplicated": stored.deduplicated
+    }
+    task, deduplicated = await task_queue.submit("resume_upload", payload, dedup_key=f"resume_upload:{plan_id}:{stored.content_hash}")
+    print(f"📥 简历处理任务已入队: {task['id']} ({'重复提交，复用' if deduplicated else '新任务'})")
+    return _task_accepted(task, deduplicated)
+
+async def run_resume_upload(payload: Dict[str, Any], ctx: TaskContext) -> Dict[str, Any]:
+    """任务：解析简历并重新计算匹配度"""
+    file_path = payload["path"]
+    async with db.get_async_session() as db_session:
+        plan = await repositories.get_plan(db_session, payload["plan_id"])
+        if not plan:
+            raise PermanentTaskError(f"Plan not found: {payload['plan_id']}")
+
         try:
-            resume_content = await planner_analysis.parse_resume(file_path)
-            print(f"✅ 简历解析完成: {resume_content}")
-            
-            # 更新用户画像
-            plan.skills = resume_content.get("skills", [])
-            plan.experience_years = resume_content.get("experience_years")
-            
-            # 重新计算匹配度
-            print("🎯 重新计算匹配度...")
-            analysis_result = await planner_analysis.analyze_job_match(
-                plan.job_description, 
-                plan.skills, 
-                plan.experience_years or 0
-            )
-            
-            print(f"📊 匹配度计算结果:")
-            print(f"  - 技能匹配度: {analysis_result['skill_match']}%")
-            print(f"  - 经验匹配度: {analysis_result['experience_match']}%")
-            print(f"  - 整体匹配度: {analysis_result['overall_match']}%")
-            print(f"  - 差距数量: {len(analysis_result['gaps'])}")
-            print(f"  - 优势数量: {len(analysis_result['strengths'])}")
-            
-            # 详细技能分析日志
-            print(f"\n🔍 详细技能分析:")
-            print(f"  - 用户技能总数: {len(plan.skills)}")
-            print(f"  - 匹配技能: {len(analysis_result.get('strengths', []))} 项")
-            print(f"  - 缺失技能: {len(analysis_result.get('gaps', []))} 项")
-            
-            # 显示匹配的技能
-            if analysis_result.get('strengths'):
-                print(f"\n✅ 匹配的技能:")
-                for strength in analysis_result['strengths']:
-                    print(f"    - {strength['skill']} (重要性: {strength['importance']})")
-            
-            # 显示缺失的技能
-            if analysis_result.get('gaps'):
-                print(f"\n❌ 缺失的技能:")
-                for gap in analysis_result['gaps']:
-                    status_icon = "❌" if gap['status'] == 'missing' else "⚠️"
-                    print(f"    {status_icon} {gap['skill']} ({gap['priority']} priority)")
-                    if gap.get('similar_skill'):
-                        print(f"      相关技能: {gap['similar_skill']}")
-            
-            # 显示岗位没有要求的技能
-            user_skills = set(skill.lower() for skill in plan.skills)
-            matched_skills = set(strength['skill'].lower() for strength in analysis_result.get('strengths', []))
-            gap_skills = set(gap['skill'].lower() for gap in analysis_result.get('gaps', []))
-            extra_skills = user_skills - matched_skills - gap_skills
-            
-            if extra_skills:
-                print(f"\n💡 岗位没有要求的技能:")
-                for skill in extra_skills:
-                    print(f"    - {skill}")
-            
-            print(f"\n📋 技能匹配总结:")
-            print(f"  - 匹配率: {len(analysis_result.get('strengths', []))}/{len(plan.skills)} = {analysis_result['skill_match']:.1f}%")
-            print(f"  - 优势技能: {len(analysis_result.get('strengths', []))} 项")
-            print(f"  - 需要提升: {len(analysis_result.get('gaps', []))} 项")
-            print(f"  - 额外技能: {len(extra_skills)} 项")
-            
-            # 更新计划
-            plan.skill_match_score = analysis_result["skill_match"]
-            plan.experience_match_score = analysis_result["experience_match"]
-            plan.gap_analysis = analysis_result
-            
-            db_session.commit()
-            print(f"✅ 数据库更新完成")
-            
-            return {
-                "success": True, 
-                "resume_parsed": resume_content,
-                "analysis_result": analysis_result,
-                "message": "简历解析成功"
-            }
-            
+            plan.resume_path = payload["relative_path"]
+
+            # 解析简历内容（同一文件内容 + 解析器版本只解析一次）
+            print("🔍 开始解析简历内容...")
+            try:
+                parser_version = planner_analysis.resume_parser_version
+                resume_content = await repositories.get_resume_parse(db_session, payload["content_hash"], parser_version)
+                if resume_content is not None:
+                    print(f"⚡ 命中简历解析缓存: {payload['content_hash'][:12]}")
+                    await ctx.report("parse_resume", cached=True)
+                else:
+                    resume_content = await planner_analysis.parse_resume(file_path)
+                    await repositories.save_resume_parse(
+                        db_session, payload["content_hash"], parser_version, resume_content, payload["size"]
+                    )
+                    await ctx.report("parse_resume", cached=False)
+                print(f"✅ 简历解析完成: {resume_content}")
+
+                # 更新用户画像（保留旧技能与旧分析用于增量重算）
+                previous_skills = list(plan.skills or [])
+                previous_analysis = await repositories.load_plan_analysis(db_session, plan)
+                plan.skills = resume_content.get("skills", [])
+                plan.experience_years = resume_content.get("experience_years")
+
+                # 重新计算匹配度（只重算受技能增减影响的条目，匹配度变化不大时沿用详细分析）
+                print("🎯 重新计算匹配度...")
+                analysis_result, changes = await planner_analysis.reanalyze_job_match(
+                    previous_analysis,
+                    previous_skills,
+                    plan.job_description,
+                    plan.skills,
+                    plan.experience_years or 0,
+                    on_stage=lambda name, timing: ctx.report(name, ms=timing["ms"], status=timing["status"])
+                )
+                await ctx.report("match", skill_match=analysis_result["skill_match"], **changes)
+
+                print(f"📊 匹配度计算结果:")
+                print(f"  - 技能匹配度: {analysis_result['skill_match']}%")
+                print(f"  - 经验匹配度: {analysis_result['experience_match']}%")
+                print(f"  - 整体匹配度: {analysis_result['overall_match']}%")
+                print(f"  - 差距数量: {len(analysis_result['gaps'])}")
+                print(f"  - 优势数量: {len(analysis_result['strengths'])}")
+
+                # 详细技能分析日志
+                print(f"\n🔍 详细技能分析:")
+                print(f"  - 用户技能总数: {len(plan.skills)}")
+                print(f"  - 匹配技能: {len(analysis_result.get('strengths', []))} 项")
+                print(f"  - 缺失技能: {len(analysis_result.get('gaps', []))} 项")
+
+                # 显示匹配的技能
+                if analysis_result.get('strengths'):
+                    print(f"\n✅ 匹配的技能:")
+                    for strength in analysis_result['strengths']:
+                        print(f"    - {strength['skill']} (重要性: {strength['importance']})")
+
+                # 显示缺失的技能
+                if analysis_result.get('gaps'):
+                    print(f"\n❌ 缺失的技能:")
+                    for gap in analysis_result['gaps']:
+                        status_icon = "❌" if gap['status'] == 'missing' else "⚠️"
+                        print(f"    {status_icon} {gap['skill']} ({gap['priority']} priority)")
+                        if gap.get('similar_skill'):
+                            print(f"      相关技能: {gap['similar_skill']}")
+
+                # 显示岗位没有要求的技能
+                user_skills = set(skill.lower() for skill in plan.skills)
+                matched_skills = set(strength['skill'].lower() for strength in analysis_result.get('strengths', []))
+                gap_skills = set(gap['skill'].lower() for gap in analysis_result.get('gaps', []))
+                extra_skills = user_skills - matched_skills - gap_skills
+
+                if extra_skills:
+                    print(f"\n💡 岗位没有要求的技能:")
+                    for skill in extra_skills:
+                        print(f"    - {skill}")
+
+                print(f"\n📋 技能匹配总结:")
+                print(f"  - 匹配率: {len(analysis_result.get('strengths', []))}/{len(plan.skills)} = {analysis_result['skill_match']:.1f}%")
+                print(f"  - 优势技能: {len(analysis_result.get('strengths', []))} 项")
+                print(f"  - 需要提升: {len(analysis_result.get('gaps', []))} 项")
+                print(f"  - 额外技能: {len(extra_skills)} 项")
+
+                # 更新计划（增量重算只写入受影响的差距 / 优势行）
+                if changes["mode"] == "incremental":
+                    row_counts = await repositories.update_plan_skill_gaps(
+                        db_session, plan, analysis_result, changes["reanalyzed_skills"]
+                    )
+                    print(f"🧩 技能差距行更新: {row_counts}")
+                else:
+                    await repositories.save_plan_analysis(db_session, plan, analysis_result)
+
+                await db_session.commit()
+                await ctx.report("persist")
+                print(f"✅ 数据库更新完成")
+
+                return jsonable_encoder({
+                    "success": True,
+                    "resume_parsed": resume_content,
+                    "analysis_result": analysis_result,
+                    "reanalysis": changes,
+                    "message": "简历解析成功"
+                })
+
+            except ValueError as e:
+                # 简历解析失败，返回明确的错误信息（不重试）
+                error_msg = str(e)
+                print(f"❌ 简历解析失败: {error_msg}")
+                await db_session.rollback()
+                # 文件按内容寻址、可被其他计划共享（入队后也可能有同内容上传复用此路径），失败时不删除
+
+                # 返回详细的错误信息和建议
+                return {
+                    "success": False,
+                    "error": error_msg,
+                    "suggestions": [
+                        "确保PDF文件没有损坏",
+                        "尝试将PDF转换为文本文件",
+                        "检查文件编码格式",
+                        "确保PyPDF2库已正确安装: pip install PyPDF2==3.0.1",
+                        "检查PDF文件是否包含文本内容",
+                        "尝试使用其他PDF阅读器打开文件"
+                    ],
+                    "message": "简历解析失败，请检查文件格式或尝试其他方法"
+                }
+
+        except Exception as e:
+            print(f"❌ 简历上传处理失败: {e}")
+            await db_session.rollback()
+            raise
+
+@app.get("/api/tasks/{task_id}")
+async def get_task_status(task_id: str):
+    """规划任务状态（阶段进度、结果或错误）"""
+    task = await task_queue.get(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
+
+@app.get("/api/tasks/{task_id}/events")
+async def stream_task_events(task_id: str):
+    """规划任务进度 SSE：每次状态变化一条 progress 事件，结束时 succeeded / failed 事件"""
+    if await task_queue.get(task_id) is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    async def task_events():
+        async for task in task_queue.watch(task_id):
+            name = task["status"] if task["status"] in TASK_FINISHED else "progress"
+            yield f"event: {name}\ndata: {json.dumps(jsonable_encoder(task), ensure_ascii=False)}\n\n"
+    return StreamingResponse(task_events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+task_queue.register("plan_create", run_plan_create)
+task_queue.register("resume_upload", run_resume_upload)
+
+@app.post("/api/planner/rank")
+async def rank_candidates(
+    job_description: str = Form(...),
+    files: List[UploadFile] = File(...),
+    parse_with_llm: bool = Form(False),
+    limit: int = Form(20),
+    stream: bool = Form(False)
+):
+    """批量候选人排序：多份简历对同一JD
+
+    - parse_with_llm: 未缓存的简历调用LLM解析（默认用本地技能提取，不调用LLM）
+    - limit: 首页条数；后续页用 GET /api/planner/rank/{ranking_id}?offset=&limit=
+    - stream: 以 NDJSON 逐行返回进度（每完成一份简历一行），最后一行为首页结果
+
+    排序结果只保存在处理本请求的进程内存中，多 worker 部署时分页请求需路由到同一进程（会话粘滞）。
+    """
+    if len(files) > config.RANK_MAX_CANDIDATES:
+        raise HTTPException(status_code=400, detail=f"At most {config.RANK_MAX_CANDIDATES} resumes per ranking")
+    if not 1 <= limit <= config.RANK_PAGE_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {config.RANK_PAGE_MAX_LIMIT}")
+    print(f"🏷️ 开始批量候选人排序: {len(files)} 份简历")
+    
+    # 先落盘（按内容寻址去重），请求结束后上传文件对象即关闭
+    uploads = []
+    for file in files:
+        try:
+            uploads.append((file.filename, await store_upload(file), None))
         except ValueError as e:
-            # 简历解析失败，返回明确的错误信息
-            error_msg = str(e)
-            print(f"❌ 简历解析失败: {error_msg}")
-            
-            # 清理已保存的文件
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                print(f"🗑️ 已清理失败的文件: {file_path}")
-            
-            # 返回详细的错误信息和建议
-            return {
-                "success": False,
-                "error": error_msg,
-                "suggestions": [
-                    "确保PDF文件没有损坏",
-                    "尝试将PDF转换为文本文件",
-                    "检查文件编码格式",
-                    "确保PyPDF2库已正确安装: pip install PyPDF2==3.0.1",
-                    "检查PDF文件是否包含文本内容",
-                    "尝试使用其他PDF阅读器打开文件"
-                ],
-                "message": "简历解析失败，请检查文件格式或尝试其他方法"
-            }
-        
-    except Exception as e:
-        print(f"❌ 简历上传处理失败: {e}")
-        # 清理已保存的文件
-        if 'file_path' in locals() and os.path.exists(file_path):
-            os.remove(file_path)
-            print(f"🗑️ 已清理失败的文件: {file_path}")
-        
-        raise HTTPException(
-            status_code=500, 
-            detail=f"简历上传失败: {str(e)}"
-        )
+            uploads.append((file.filename, None, str(e)))
+    events = candidate_ranker.run(job_description, uploads, parse_with_llm=parse_with_llm)
+    
+    if stream:
+        async def stream_progress():
+            async for event in events:
+                if event["event"] == "ranked":
+                    event = {"event": "ranked", **candidate_ranker.page(event["ranking_id"], 0, limit)}
+                yield json.dumps(jsonable_encoder(event), ensure_ascii=False) + "\n"
+        return StreamingResponse(stream_progress(), media_type="application/x-ndjson")
+    
+    async for event in events:
+        if event["event"] == "ranked":
+            return candidate_ranker.page(event["ranking_id"], 0, limit)
+    raise HTTPException(status_code=500, detail="Ranking finished without a result")
+
+@app.get("/api/planner/rank/{ranking_id}")
+async def get_candidate_ranking(ranking_id: str, offset: int = 0, limit: int = 20):
+    """批量排序结果分页"""
+    if offset < 0 or not 1 <= limit <= config.RANK_PAGE_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"offset must be >= 0 and limit between 1 and {config.RANK_PAGE_MAX_LIMIT}")
+    page = candidate_ranker.page(ranking_id, offset, limit)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Ranking not found or expired")
+    return page
 
 @app.get("/api/planner/user/{user_id}/summary")
 async def get_user_planner_summary(
     user_id: str,
-    db_session: Session = Depends(get_db)
+    db_session: AsyncSession = Depends(get_db)
 ):
     """获取用户规划总结"""
-    progress_tracker = ProgressTracker(db_session)
-    summary = progress_tracker.get_user_progress_summary(user_id)
+    summary = await repositories.run_progress_tracker(db_session, lambda t: t.get_user_progress_summary(user_id))
     
     return summary
 
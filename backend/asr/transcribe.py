@@ -6,7 +6,6 @@ import aiofiles
 import openai
 from starlette.status import HTTP_400_BAD_REQUEST, HTTP_500_INTERNAL_SERVER_ERROR
 
-print("DEBUG: OPENAI_API_KEY =", os.getenv("OPENAI_API_KEY"))
 router = APIRouter()
 
 @router.post("/", summary="Transcribe audio file using OpenAI Whisper")
@@ -11,13 +11,14 @@ class Config:
     # Base paths
     BASE_DIR = Path(__file__).parent
     UPLOAD_DIR = BASE_DIR / "uploads"
+    RESUME_STORE_DIR = UPLOAD_DIR / "resumes" / "sha256"  # content-addressed resume uploads
     MODELS_DIR = BASE_DIR / "models"
     KNOWLEDGE_BASE_DIR = BASE_DIR / "jobs" / "job_knowledge_base"
-    
-    # Create directories if they don't exist
-    UPLOAD_DIR.mkdir(exist_ok=True)
-    MODELS_DIR.mkdir(exist_ok=True)
-    KNOWLEDGE_BASE_DIR.mkdir(parents=True, exist_ok=True)
+    ARCHIVE_DIR = BASE_DIR / "archive"  # cold-storage session segments
+    DATA_DIR = BASE_DIR / "data"  # versioned data files (skill ontology, ...)
+    SKILL_ONTOLOGY_PATH = Path(os.getenv("SKILL_ONTOLOGY_PATH", str(DATA_DIR / "skill_ontology.json")))
+    RECOMMENDATION_CATALOG_PATH = Path(os.getenv("RECOMMENDATION_CATALOG_PATH", str(DATA_DIR / "recommendation_catalog.json")))
+    EMBEDDING_CACHE_DIR = Path(os.getenv("EMBEDDING_CACHE_DIR", str(BASE_DIR / "embedding_cache")))  # float16 skill vectors
     
     # API Keys (from environment)
     WHISPER_API_KEY = os.getenv("WHISPER_API_KEY", "")
@@ -37,6 +38,45 @@ class Config:
     DEFAULT_ASR_MODEL   = os.getenv("ASR_MODEL", "whisper-1")
     LLM_MODEL         = os.getenv("LLM_MODEL", "gpt-4o-mini")    # 使用可用的模型
     DEFAULT_LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")    # 使用可用的模型
+    # Per call-site LLM models; "local/<name>" routes to the local backend (see llm/llm_backend.py)
+    LLM_FEEDBACK_MODEL   = os.getenv("LLM_FEEDBACK_MODEL", LLM_MODEL)     # interview turns / feedback
+    LLM_EXTRACTION_MODEL = os.getenv("LLM_EXTRACTION_MODEL", LLM_MODEL)   # JD / resume JSON extraction
+    LLM_ANALYSIS_MODEL   = os.getenv("LLM_ANALYSIS_MODEL", LLM_MODEL)     # detailed analysis / recommendations
+    # Sentence embeddings for semantic skill matching (see services/embedding_engine.py)
+    EMBEDDING_MODEL      = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+    EMBEDDING_TORCH_THREADS = int(os.getenv("EMBEDDING_TORCH_THREADS", "2"))  # torch intra-op threads, 0 = torch default
+    EMBEDDING_WARMUP     = os.getenv("EMBEDDING_WARMUP", "false").lower() == "true"  # load in background after startup
+    # Planner stage timeouts in seconds; a timed-out stage uses its rule-based fallback (see services/planner_pipeline.py)
+    PLANNER_EXTRACT_TIMEOUT   = float(os.getenv("PLANNER_EXTRACT_TIMEOUT", "30"))
+    PLANNER_ANALYSIS_TIMEOUT  = float(os.getenv("PLANNER_ANALYSIS_TIMEOUT", "45"))
+    PLANNER_RECOMMEND_TIMEOUT = float(os.getenv("PLANNER_RECOMMEND_TIMEOUT", "60"))
+    # Resume re-upload: detailed analysis is regenerated only when overall match moves more than this (points)
+    PLANNER_REANALYZE_THRESHOLD = float(os.getenv("PLANNER_REANALYZE_THRESHOLD", "10"))
+    # Recommendations come from the indexed catalog (see services/recommendation_catalog.py);
+    # the LLM "rerank"s / annotates them, is skipped ("off"), or writes them from scratch ("generate")
+    PLANNER_RECOMMEND_LLM   = os.getenv("PLANNER_RECOMMEND_LLM", "rerank")
+    RECOMMEND_CATALOG_LIMIT = int(os.getenv("RECOMMEND_CATALOG_LIMIT", "5"))  # entries per kind
+    # LLM recommendations reused across similar skill-gap vectors (see services/recommendation_cache.py)
+    RECOMMEND_CACHE_METRIC      = os.getenv("RECOMMEND_CACHE_METRIC", "jaccard")  # "jaccard" | "cosine"
+    RECOMMEND_CACHE_THRESHOLD   = float(os.getenv("RECOMMEND_CACHE_THRESHOLD", "0.8"))  # 1.0 = exact gap vector only
+    RECOMMEND_CACHE_MAX_ENTRIES = int(os.getenv("RECOMMEND_CACHE_MAX_ENTRIES", "2000"))  # per scope, in process
+    # Planner task queue for plan creation / resume processing (see models/task_queue.py)
+    TASK_WORKERS       = int(os.getenv("TASK_WORKERS", "2"))
+    TASK_MAX_ATTEMPTS  = int(os.getenv("TASK_MAX_ATTEMPTS", "3"))
+    TASK_RETRY_DELAY   = float(os.getenv("TASK_RETRY_DELAY", "2"))      # seconds, doubled per attempt
+    TASK_LEASE_SECONDS = float(os.getenv("TASK_LEASE_SECONDS", "300"))  # running task reclaimed after this
+    TASK_DEDUP_WINDOW  = float(os.getenv("TASK_DEDUP_WINDOW", "300"))   # seconds a finished task answers identical submissions
+    # Bulk candidate ranking, POST /api/planner/rank (see services/candidate_ranker.py)
+    RANK_MAX_CANDIDATES = int(os.getenv("RANK_MAX_CANDIDATES", "500"))
+    RANK_WORKERS        = int(os.getenv("RANK_WORKERS", "8"))   # resumes profiled concurrently
+    RANK_PAGE_MAX_LIMIT = int(os.getenv("RANK_PAGE_MAX_LIMIT", "100"))
+    RANK_RESULTS_KEPT   = int(os.getenv("RANK_RESULTS_KEPT", "32"))  # finished rankings kept for paging (per process)
+    # Local LLM backend
+    LOCAL_LLM_MODEL_PATH = os.getenv("LOCAL_LLM_MODEL_PATH", "")  # GGUF file for in-process llama.cpp
+    LOCAL_LLM_BASE_URL   = os.getenv("LOCAL_LLM_BASE_URL", "http://localhost:8080/v1")  # OpenAI-compatible sidecar
+    LOCAL_LLM_THREADS    = int(os.getenv("LOCAL_LLM_THREADS", "0"))  # 0 = llama.cpp default
+    LOCAL_LLM_CONTEXT    = int(os.getenv("LOCAL_LLM_CONTEXT", "4096"))
     DEFAULT_TTS_VOICE = os.getenv("TTS_VOICE", "alloy")
     
     # Interview settings
@@ -45,10 +85,37 @@ class Config:
     
     # Database settings (for future implementation)
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./interview_helper.db")
+    # Engine profile tuning (see models/database.py)
+    DB_POOL_SIZE    = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds, PostgreSQL only
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_CACHE_SIZE_KB   = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))  # 64MB page cache
+    SQLITE_MMAP_SIZE       = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    # Write-behind persistence of interview turns (see models/turn_writer.py)
+    TURN_WRITE_DURABILITY  = os.getenv("TURN_WRITE_DURABILITY", "enqueue")  # "enqueue" | "commit"
+    TURN_WRITE_BATCH_SIZE  = int(os.getenv("TURN_WRITE_BATCH_SIZE", "50"))
+    TURN_WRITE_MAX_DELAY_MS = int(os.getenv("TURN_WRITE_MAX_DELAY_MS", "20"))
+    # Job catalog cache: seconds between cross-worker change checks (COUNT / MAX(updated_at)); 0 = every read
+    JOB_CATALOG_CHECK_SECONDS = float(os.getenv("JOB_CATALOG_CHECK_SECONDS", "5"))
+    # GET /api/jobs/recommend
+    JOB_RECOMMEND_MAX_LIMIT = int(os.getenv("JOB_RECOMMEND_MAX_LIMIT", "50"))
+    # GET /api/sessions/{id} pagination
+    SESSION_PAGE_MAX_LIMIT = int(os.getenv("SESSION_PAGE_MAX_LIMIT", "200"))
+    # Cold-storage archival of ended sessions (see services/session_archiver.py)
+    SESSION_ARCHIVE_AFTER_DAYS     = int(os.getenv("SESSION_ARCHIVE_AFTER_DAYS", "90"))
+    SESSION_ARCHIVE_BATCH_SIZE     = int(os.getenv("SESSION_ARCHIVE_BATCH_SIZE", "200"))
+    SESSION_ARCHIVE_SEGMENT_MAX_MB = int(os.getenv("SESSION_ARCHIVE_SEGMENT_MAX_MB", "64"))
     
     # File upload settings
     MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", "10485760"))  # 10MB in bytes
     ALLOWED_EXTENSIONS = {"pdf", "txt", "docx", "doc"}
+    # Document text extraction (see services/document_extractor.py)
+    DOC_EXTRACT_WORKERS    = int(os.getenv("DOC_EXTRACT_WORKERS", "2"))  # 0 = run in a thread, no subprocesses
+    DOC_EXTRACT_TIMEOUT    = float(os.getenv("DOC_EXTRACT_TIMEOUT", "30"))  # seconds per document
+    DOC_EXTRACT_MAX_PAGES  = int(os.getenv("DOC_EXTRACT_MAX_PAGES", "50"))
+    DOC_EXTRACT_PAGE_BATCH = int(os.getenv("DOC_EXTRACT_PAGE_BATCH", "5"))  # PDF pages per worker task
     
     # Feedback scoring weights
     SCORING_WEIGHTS = {
@@ -79,6 +146,13 @@ class Config:
         ]
     }
     
+    @classmethod
+    def ensure_directories(cls):
+        """Create runtime directories; called from app startup rather than at import"""
+        cls.UPLOAD_DIR.mkdir(exist_ok=True)
+        cls.MODELS_DIR.mkdir(exist_ok=True)
+        cls.KNOWLEDGE_BASE_DIR.mkdir(parents=True, exist_ok=True)
+    
     @classmethod
     def get_env_list(cls, key: str, default: list | None = None) -> list:
         """Get list from environment variable"""
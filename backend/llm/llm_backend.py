@@ -0,0 +1,189 @@
+# llm_backend.py — Version 1.1.1
+# =============================================================================
+# Interview Helper Backend — Pluggable LLM Backends
+#
+# Overview:
+#   - Single entry point (`chat_completion`) for every chat-style LLM call in the backend.
+#   - Routes each call to a backend based on the model name configured for that call site.
+#   - Supports the hosted OpenAI API and a local CPU backend (small quantized instruct model),
+#     so cheap, high-volume calls can run offline at predictable latency.
+#   - `async_chat_completion` is the non-blocking variant for async handlers: AsyncOpenAI for
+#     the hosted API / sidecar, a worker thread for in-process llama.cpp.
+#
+# Model naming:
+#   - "gpt-4o-mini"                  → OpenAI API
+#   - "local/<name>"                 → Local backend:
+#       * in-process llama.cpp (llama-cpp-python) when LOCAL_LLM_MODEL_PATH is set
+#       * otherwise an OpenAI-compatible sidecar (llama.cpp server / Ollama / vLLM)
+#         at LOCAL_LLM_BASE_URL
+#
+# Usage:
+#   from llm.llm_backend import chat_completion, async_chat_completion
+#   text = chat_completion(config.LLM_EXTRACTION_MODEL, messages, 0.1, 1000)
+#   text = await async_chat_completion(config.LLM_ANALYSIS_MODEL, messages, 0.3, 800)  # async handlers
+#
+# Dependencies:
+#   - openai              : Hosted API and OpenAI-compatible sidecar client
+#   - llama-cpp-python    : Optional, in-process local inference
+#
+# Author: BeeBee AI Track-B
+# Version: 1.1.1
+# =============================================================================
+
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from openai import AsyncOpenAI, OpenAI
+from config import config
+
+LOCAL_MODEL_PREFIX = "local/"
+
+
+class LLMBackend:
+    """Base class for chat completion backends"""
+    name = "base"
+
+    def complete(self, model_name: str, messages: List[Dict], temperature: float, max_tokens: Optional[int]) -> str:
+        raise NotImplementedError
+
+    async def acomplete(self, model_name: str, messages: List[Dict], temperature: float, max_tokens: Optional[int]) -> str:
+        # 默认在线程中执行同步调用，不阻塞事件循环
+        return await asyncio.to_thread(self.complete, model_name, messages, temperature, max_tokens)
+
+
+class OpenAIBackend(LLMBackend):
+    """Hosted OpenAI chat completions"""
+    name = "openai"
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.client = OpenAI(api_key=api_key, base_url=base_url) if base_url else OpenAI(api_key=api_key)
+        self._async_client: Optional[AsyncOpenAI] = None
+
+    @staticmethod
+    def _request(model_name, messages, temperature, max_tokens) -> Dict:
+        kwargs = {"model": model_name, "messages": messages, "temperature": temperature}
+        if max_tokens:
+            kwargs["max_tokens"] = max_tokens
+        return kwargs
+
+    def complete(self, model_name, messages, temperature, max_tokens):
+        response = self.client.chat.completions.create(**self._request(model_name, messages, temperature, max_tokens))
+        return response.choices[0].message.content or ""
+
+    async def acomplete(self, model_name, messages, temperature, max_tokens):
+        if self._async_client is None:
+            # 首次异步调用时创建（需在事件循环内）
+            self._async_client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url) if self.base_url else AsyncOpenAI(api_key=self.api_key)
+        response = await self._async_client.chat.completions.create(**self._request(model_name, messages, temperature, max_tokens))
+        return response.choices[0].message.content or ""
+
+
+class LocalBackend(LLMBackend):
+    """Local CPU inference: in-process llama.cpp, or an OpenAI-compatible sidecar"""
+    name = "local"
+
+    def __init__(self):
+        self._llama = None
+        self._sidecar = None
+        # llama.cpp 的 Llama 实例不是线程安全的，串行化推理
+        self._lock = threading.Lock()
+
+    def _load_in_process(self):
+        if self._llama is None:
+            from llama_cpp import Llama
+            print(f"🧠 加载本地模型: {config.LOCAL_LLM_MODEL_PATH}")
+            self._llama = Llama(
+                model_path=config.LOCAL_LLM_MODEL_PATH,
+                n_ctx=config.LOCAL_LLM_CONTEXT,
+                n_threads=config.LOCAL_LLM_THREADS or None,
+                verbose=False
+            )
+        return self._llama
+
+    def complete(self, model_name, messages, temperature, max_tokens):
+        if config.LOCAL_LLM_MODEL_PATH:
+            try:
+                with self._lock:
+                    llama = self._load_in_process()
+                    response = llama.create_chat_completion(
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens
+                    )
+                return response["choices"][0]["message"]["content"] or ""
+            except ImportError as e:
+                print(f"⚠️ llama-cpp-python导入失败，改用sidecar: {e}")
+        if self._sidecar is None:
+            self._sidecar = OpenAIBackend(api_key="local", base_url=config.LOCAL_LLM_BASE_URL)
+        return self._sidecar.complete(model_name, messages, temperature, max_tokens)
+
+    async def acomplete(self, model_name, messages, temperature, max_tokens):
+        if config.LOCAL_LLM_MODEL_PATH:
+            return await super().acomplete(model_name, messages, temperature, max_tokens)
+        if self._sidecar is None:
+            self._sidecar = OpenAIBackend(api_key="local", base_url=config.LOCAL_LLM_BASE_URL)
+        return await self._sidecar.acomplete(model_name, messages, temperature, max_tokens)
+
+
+_backends: Dict[str, LLMBackend] = {}
+_backends_lock = threading.Lock()
+_stats: Dict[str, Dict[str, float]] = {}
+_stats_lock = threading.Lock()  # chat_completion also runs on executor / analysis threads
+
+
+def resolve_backend(model_name: Optional[str]) -> Tuple[LLMBackend, str]:
+    """Map a configured model name to (backend, backend-specific model name)"""
+    model_name = model_name or config.LLM_MODEL
+    if model_name.startswith(LOCAL_MODEL_PREFIX):
+        key, resolved = LocalBackend.name, model_name[len(LOCAL_MODEL_PREFIX):]
+    else:
+        key, resolved = OpenAIBackend.name, model_name
+    with _backends_lock:
+        if key not in _backends:
+            _backends[key] = LocalBackend() if key == LocalBackend.name else OpenAIBackend(config.OPENAI_API_KEY)
+        return _backends[key], resolved
+
+
+def chat_completion(model_name: Optional[str], messages: List[Dict], temperature: float = 0.7, max_tokens: Optional[int] = None) -> str:
+    """Run a chat completion on whichever backend the model name selects"""
+    backend, resolved = resolve_backend(model_name)
+    start = time.perf_counter()
+    try:
+        return backend.complete(resolved, messages, temperature, max_tokens)
+    finally:
+        _record(model_name, time.perf_counter() - start)
+
+
+async def async_chat_completion(model_name: Optional[str], messages: List[Dict], temperature: float = 0.7, max_tokens: Optional[int] = None) -> str:
+    """Non-blocking chat completion for async handlers; same routing and stats as chat_completion"""
+    backend, resolved = resolve_backend(model_name)
+    start = time.perf_counter()
+    try:
+        return await backend.acomplete(resolved, messages, temperature, max_tokens)
+    finally:
+        _record(model_name, time.perf_counter() - start)
+
+
+def _record(model_name: Optional[str], elapsed: float):
+    with _stats_lock:
+        stats = _stats.setdefault(model_name or config.LLM_MODEL, {"calls": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+        stats["calls"] += 1
+        stats["total_seconds"] += elapsed
+        stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+
+
+def get_llm_stats() -> Dict[str, Dict[str, float]]:
+    """Per-model call counts and latency, for benchmarking and the health endpoint"""
+    with _stats_lock:
+        snapshot = {model: dict(s) for model, s in _stats.items()}
+    return {
+        model: {
+            "calls": int(s["calls"]),
+            "avg_seconds": round(s["total_seconds"] / s["calls"], 4) if s["calls"] else 0.0,
+            "max_seconds": round(s["max_seconds"], 4)
+        }
+        for model, s in snapshot.items()
+    }
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, Integer, DateTime, Index
+from datetime import datetime
+from .database import Base
+
+class ArchivedSession(Base):
+    """Offset index of sessions moved to cold storage (see services/session_archiver.py)"""
+    __tablename__ = "archived_sessions"
+    __table_args__ = (
+        Index("ix_archived_sessions_user", "user_id"),
+    )
+
+    session_id = Column(String, primary_key=True)
+    user_id = Column(String, nullable=True)
+    segment = Column(String, nullable=False)   # file name under config.ARCHIVE_DIR
+    offset = Column(Integer, nullable=False)   # byte offset of the record's gzip member
+    length = Column(Integer, nullable=False)   # compressed length in bytes
+    ended_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow)
@@ -6,6 +6,8 @@
 #   - Defines SQLAlchemy ORM models for users, jobs, interview sessions, questions, and feedback templates.
 #   - Handles database schema creation and initialization with default job and feedback data.
 #   - Provides a Database utility class for session management and setup.
+#   - Picks an engine profile from DATABASE_URL (SQLite: WAL/busy timeout/mmap; PostgreSQL: tuned pool)
+#     and exposes pool and lock-wait metrics via Database.get_metrics().
 #
 # Main Models:
 #   1. User              — User accounts and interview history
@@ -13,14 +15,17 @@
 #   3. InterviewSession  — Mock interview session metadata and scoring
 #   4. Question          — Individual interview questions, user responses, and AI feedback
 #   5. FeedbackTemplate  — Templates for structured feedback generation
+#   6. SchemaVersion     — Applied schema / seed versions, so startup skips work already done
 #
 # Usage:
 #   - Instantiated and used in backend/app.py to initialize tables and provide DB sessions.
 #   - Called at startup for table creation and default data population.
+#   - Hot-path indexes are declared on the models; models/migrations.py adds them to existing SQLite files.
 #   - Accessed throughout the backend for CRUD operations on users, jobs, sessions, and questions.
 #
 # Dependencies:
-#   - SQLAlchemy         : ORM and schema management
+#   - SQLAlchemy         : ORM and schema management (sync engine + AsyncSession engine)
+#   - aiosqlite / asyncpg : Async drivers for the request handlers
 #   - Python datetime    : Timestamps
 #   - uuid               : Unique ID generation
 #
@@ -28,11 +33,17 @@
 # Version: 1.1.1
 # =============================================================================
 
-from sqlalchemy import create_engine, Column, String, Integer, Float, DateTime, Text, ForeignKey, JSON
+from sqlalchemy import create_engine, event, Column, String, Integer, Float, DateTime, Text, ForeignKey, JSON, Index
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.pool import QueuePool
 from datetime import datetime
+import threading
+import time
 import uuid
+from config import config
 
 Base = declarative_base()
 
@@ -70,6 +81,13 @@ class Job(Base):
 class InterviewSession(Base):
     """Interview practice session"""
     __tablename__ = "interview_sessions"
+    __table_args__ = (
+        # /api/stats: filter by user, newest first
+        Index("ix_interview_sessions_user_start", "user_id", "start_time"),
+        Index("ix_interview_sessions_start_time", "start_time"),
+        # Cold-storage archiver: ended before cutoff (services/session_archiver.py)
+        Index("ix_interview_sessions_end_time", "end_time"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"), nullable=True)  # Optional for anonymous users
@@ -98,6 +116,10 @@ class InterviewSession(Base):
 class Question(Base):
     """Individual question in a session"""
     __tablename__ = "questions"
+    __table_args__ = (
+        # History loading on every RAG turn: WHERE session_id = ? ORDER BY order_index
+        Index("ix_questions_session_order", "session_id", "order_index"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     session_id = Column(String, ForeignKey("interview_sessions.id"), nullable=False)
@@ -135,20 +157,184 @@ class FeedbackTemplate(Base):
     min_score = Column(Float)
     max_score = Column(Float)
 
+class SchemaVersion(Base):
+    """Applied version of each startup step (schema, seed data, backfills); see models/migrations.py"""
+    __tablename__ = "schema_versions"
+
+    component = Column(String, primary_key=True)
+    version = Column(String, nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Bump when init_default_data's jobs / feedback templates change
+SEED_VERSION = "1"
+
+# Engine profiles
+def _sqlite_profile(url) -> dict:
+    """SQLite: WAL + NORMAL sync + busy timeout so concurrent WS turns and planner writes don't fail"""
+    kwargs = {"connect_args": {"check_same_thread": False, "timeout": config.SQLITE_BUSY_TIMEOUT_MS / 1000}}
+    if url.database and url.database != ":memory:":
+        # 内存库只能用单连接，文件库使用连接池
+        kwargs.update(
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT
+        )
+    return kwargs
+
+
+def _postgresql_profile(url) -> dict:
+    """PostgreSQL: sized pool with pre-ping and recycling"""
+    return {
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": True
+    }
+
+
+ENGINE_PROFILES = {
+    "sqlite": _sqlite_profile,
+    "postgresql": _postgresql_profile,
+}
+
+# 同步URL对应的异步驱动
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+
+def to_async_url(url):
+    """sqlite:///x.db → sqlite+aiosqlite:///x.db, postgresql://… → postgresql+asyncpg://…"""
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {url.get_backend_name()}")
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}")
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # 仅对新建库生效；已有库由归档器转换后即可在线 incremental_vacuum
+    cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={config.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA cache_size=-{config.SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA mmap_size={config.SQLITE_MMAP_SIZE}")
+    cursor.close()
+
+
+class DatabaseMetrics:
+    """Pool checkout and lock-wait counters, exposed through /api/health"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.lock_errors = 0
+        self.write_statements = 0
+        self.write_seconds_total = 0.0
+        self.write_seconds_max = 0.0
+
+    def attach(self, engine):
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+        event.listen(engine, "handle_error", self._on_error)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_start"] = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # 写语句耗时包含等待写锁（busy_timeout）的时间
+        if statement.lstrip()[:6].upper() not in ("INSERT", "UPDATE", "DELETE"):
+            return
+        elapsed = time.perf_counter() - conn.info.pop("query_start", time.perf_counter())
+        with self._lock:
+            self.write_statements += 1
+            self.write_seconds_total += elapsed
+            self.write_seconds_max = max(self.write_seconds_max, elapsed)
+
+    def _on_error(self, exception_context):
+        if "database is locked" in str(exception_context.original_exception):
+            with self._lock:
+                self.lock_errors += 1
+
+    def snapshot(self, engine) -> dict:
+        pool = engine.pool
+        with self._lock:
+            return {
+                "dialect": engine.dialect.name,
+                "pool_class": type(pool).__name__,
+                "pool_size": pool.size() if isinstance(pool, QueuePool) else None,
+                "pool_overflow": pool.overflow() if isinstance(pool, QueuePool) else None,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "checkouts": self.checkouts,
+                "lock_errors": self.lock_errors,
+                "write_statements": self.write_statements,
+                "write_wait_avg_ms": round(self.write_seconds_total / self.write_statements * 1000, 2) if self.write_statements else 0.0,
+                "write_wait_max_ms": round(self.write_seconds_max * 1000, 2)
+            }
+
+
 # Database setup
 class Database:
     def __init__(self, database_url: str = "sqlite:///./interview_helper.db"):
-        self.engine = create_engine(database_url, connect_args={"check_same_thread": False})
+        url = make_url(database_url)
+        profile = ENGINE_PROFILES.get(url.get_backend_name(), lambda _: {})
+        self.engine = create_engine(database_url, **profile(url))
+        if url.get_backend_name() == "sqlite":
+            event.listen(self.engine, "connect", _apply_sqlite_pragmas)
+        # Async engine for the FastAPI handlers (see models/repositories.py)
+        self.async_engine = create_async_engine(to_async_url(url), **profile(url))
+        if url.get_backend_name() == "sqlite":
+            event.listen(self.async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+        self.metrics = DatabaseMetrics()
+        self.metrics.attach(self.engine)
+        self.metrics.attach(self.async_engine.sync_engine)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.AsyncSessionLocal = async_sessionmaker(self.async_engine, autoflush=False, expire_on_commit=False)
+    
+    def get_metrics(self) -> dict:
+        """Pool and lock-wait metrics"""
+        metrics = self.metrics.snapshot(self.engine)
+        async_pool = self.async_engine.sync_engine.pool
+        metrics["async_pool"] = {
+            "pool_class": type(async_pool).__name__,
+            "pool_size": async_pool.size() if isinstance(async_pool, QueuePool) else None,
+            "checked_out": async_pool.checkedout() if isinstance(async_pool, QueuePool) else None
+        }
+        return metrics
         
     def create_tables(self):
         """Create all tables"""
         Base.metadata.create_all(bind=self.engine)
+        # create_all 不会给已存在的表补建索引，这里补齐
+        from .migrations import apply_index_migrations
+        apply_index_migrations(self.engine)
     
     def get_session(self):
         """Get database session"""
         return self.SessionLocal()
     
+    def get_async_session(self):
+        """Get async database session"""
+        return self.AsyncSessionLocal()
+    
     def init_default_data(self):
         """Initialize with default data"""
         session = self.get_session()
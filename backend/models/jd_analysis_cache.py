@@ -0,0 +1,206 @@
+# models/jd_analysis_cache.py — Version 1.1.1
+# =============================================================================
+# Interview Helper Backend — Persistent JD Analysis Cache
+#
+# Overview:
+#   - Extracting skills / requirements from a job description is an LLM call that depends
+#     only on the JD text, yet it was repeated on every plan creation, every resume upload
+#     (same plan.job_description) and by every user targeting the same posting.
+#   - Analyses are stored in the jd_analyses table keyed by (sha256 of the normalized JD,
+#     analysis kind, model) and shared by PlannerAnalysisService,
+#     EnhancedPlannerAnalysisService and RealAIService. A small in-process LRU sits in front
+#     of the table, and concurrent requests for the same JD share one in-flight LLM call.
+#   - Callers get a deep copy, so mutating a returned analysis never touches the cache.
+#   - Only successful LLM results are stored; fallbacks (timeouts, unparsable responses)
+#     are returned but not cached, so the next request retries the model.
+#
+# Normalization:
+#   Unicode NFKC, casefold, whitespace runs collapsed — so the same posting pasted with
+#   different line breaks or capitalization hits the same entry.
+#
+# Usage:
+#   jd_analysis_cache.bind(db)                                   # app startup
+#   analysis = await jd_analysis_cache.aget_or_compute("jd_skills:v1", model, jd, compute)
+#   analysis = jd_analysis_cache.get_or_compute("jd_skills:v1", model, jd, compute_sync)
+#
+# Author: BeeBee AI Track-B
+# Version: 1.1.1
+# =============================================================================
+
+import asyncio
+import copy
+import hashlib
+import re
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from sqlalchemy import select
+from .jd_analysis_models import JDAnalysis
+
+# 分析种类：输出结构变化时提升版本号，旧条目自然失效
+JD_SKILLS_KIND = "jd_skills:v1"     # required/preferred skills + experience requirements (planner services)
+JD_PROFILE_KIND = "jd_profile:v1"   # title / skills / responsibilities / ... (RealAIService)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_jd(text: str) -> str:
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text or "").casefold()).strip()
+
+
+def jd_hash(text: str) -> str:
+    return hashlib.sha256(normalize_jd(text).encode("utf-8")).hexdigest()
+
+
+class JDAnalysisCache:
+    def __init__(self, memory_entries: int = 512):
+        self.db = None
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[Tuple[str, str, str], Dict[str, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str, str], asyncio.Future] = {}
+        self.stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "stored": 0, "shared_inflight": 0}
+
+    def bind(self, db):
+        """Attach the database; until then the cache is in-process only"""
+        self.db = db
+
+    def _remember(self, key: Tuple[str, str, str], analysis: Dict[str, Any]):
+        self._memory[key] = analysis
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _from_memory(self, key: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+        analysis = self._memory.get(key)
+        if analysis is not None:
+            self._memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+        return analysis
+
+    @staticmethod
+    def _row(key: Tuple[str, str, str], jd_text: str, analysis: Dict[str, Any]) -> JDAnalysis:
+        return JDAnalysis(jd_hash=key[0], kind=key[1], model=key[2], analysis=analysis, jd_length=len(jd_text))
+
+    @staticmethod
+    def _select(key: Tuple[str, str, str]):
+        return select(JDAnalysis.analysis).where(
+            JDAnalysis.jd_hash == key[0], JDAnalysis.kind == key[1], JDAnalysis.model == key[2]
+        )
+
+    def lookup(self, kind: str, model: str, jd_text: str) -> Optional[Dict[str, Any]]:
+        key = (jd_hash(jd_text), kind, model)
+        analysis = self._from_memory(key)
+        if analysis is not None or self.db is None:
+            return copy.deepcopy(analysis)
+        session = self.db.get_session()
+        try:
+            analysis = session.execute(self._select(key)).scalar()
+        finally:
+            session.close()
+        if analysis is not None:
+            self.stats["db_hits"] += 1
+            self._remember(key, analysis)
+        return copy.deepcopy(analysis)
+
+    def store(self, kind: str, model: str, jd_text: str, analysis: Dict[str, Any]):
+        key = (jd_hash(jd_text), kind, model)
+        self._remember(key, analysis)
+        self.stats["stored"] += 1
+        if self.db is None:
+            return
+        session = self.db.get_session()
+        try:
+            session.merge(self._row(key, jd_text, analysis))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"⚠️ JD分析缓存写入失败: {e}")
+        finally:
+            session.close()
+
+    def get_or_compute(
+        self,
+        kind: str,
+        model: str,
+        jd_text: str,
+        compute: Callable[[], Optional[Dict[str, Any]]]
+    ) -> Optional[Dict[str, Any]]:
+        """Cached analysis, or compute() and store it; compute returns None on failure (not cached)"""
+        analysis = self.lookup(kind, model, jd_text)
+        if analysis is not None:
+            return analysis
+        self.stats["misses"] += 1
+        analysis = compute()
+        if analysis is not None:
+            self.store(kind, model, jd_text, copy.deepcopy(analysis))
+        return analysis
+
+    async def alookup(self, kind: str, model: str, jd_text: str) -> Optional[Dict[str, Any]]:
+        """Async lookup only; never computes"""
+        key = (jd_hash(jd_text), kind, model)
+        analysis = self._from_memory(key)
+        if analysis is None:
+            analysis = await self._load(key)
+        return copy.deepcopy(analysis)
+
+    async def aget_or_compute(
+        self,
+        kind: str,
+        model: str,
+        jd_text: str,
+        compute: Callable[[], Awaitable[Optional[Dict[str, Any]]]]
+    ) -> Optional[Dict[str, Any]]:
+        """Async variant; concurrent callers for the same JD await a single compute()"""
+        key = (jd_hash(jd_text), kind, model)
+        analysis = self._from_memory(key)
+        if analysis is not None:
+            return copy.deepcopy(analysis)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats["shared_inflight"] += 1
+            return copy.deepcopy(await asyncio.shield(inflight))
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            analysis = await self._load(key)
+            if analysis is None:
+                self.stats["misses"] += 1
+                analysis = await compute()
+                if analysis is not None:
+                    analysis = copy.deepcopy(analysis)
+                    await self._save(key, jd_text, analysis)
+            return copy.deepcopy(analysis)
+        finally:
+            # 计算失败或被取消（阶段超时）时等待者拿到 None，各自走备用结果
+            if not future.done():
+                future.set_result(analysis)
+            self._inflight.pop(key, None)
+
+    async def _load(self, key: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+        if self.db is None:
+            return None
+        async with self.db.get_async_session() as db_session:
+            analysis = (await db_session.execute(self._select(key))).scalar()
+        if analysis is not None:
+            self.stats["db_hits"] += 1
+            self._remember(key, analysis)
+        return analysis
+
+    async def _save(self, key: Tuple[str, str, str], jd_text: str, analysis: Dict[str, Any]):
+        self._remember(key, analysis)
+        self.stats["stored"] += 1
+        if self.db is None:
+            return
+        try:
+            async with self.db.get_async_session() as db_session:
+                await db_session.merge(self._row(key, jd_text, analysis))
+                await db_session.commit()
+        except Exception as e:
+            print(f"⚠️ JD分析缓存写入失败: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "memory_entries": len(self._memory), "persistent": self.db is not None}
+
+
+jd_analysis_cache = JDAnalysisCache()
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, Integer, DateTime, JSON
+from datetime import datetime
+from .database import Base
+
+class JDAnalysis(Base):
+    """LLM analysis of a job description, keyed by normalized-JD hash (see models/jd_analysis_cache.py)"""
+    __tablename__ = "jd_analyses"
+
+    jd_hash = Column(String, primary_key=True)   # sha256 of the normalized JD text
+    kind = Column(String, primary_key=True)      # analysis schema, e.g. "jd_skills:v1"
+    model = Column(String, primary_key=True)     # LLM that produced it
+    analysis = Column(JSON, nullable=False)
+    jd_length = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
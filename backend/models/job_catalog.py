@@ -0,0 +1,121 @@
+# models/job_catalog.py — Version 1.1.1
+# =============================================================================
+# Interview Helper Backend — In-Process Job Catalog Cache
+#
+# Overview:
+#   - Job rows are read on every /api/jobs call and every RAG turn but only change when
+#     seeded or edited, so the whole catalog is kept in memory as plain dicts.
+#   - A version counter is bumped by ORM events on every Job insert/update/delete; the
+#     next read after a bump reloads the catalog (one SELECT).
+#   - ORM events only fire in the process that wrote. With several uvicorn workers, each
+#     worker also compares a cheap fingerprint of the jobs table (COUNT(*), MAX(updated_at))
+#     with the one it loaded, at most every JOB_CATALOG_CHECK_SECONDS, and bumps its version
+#     when another worker (or a direct DB edit that sets updated_at) changed the table.
+#     Consumers keyed on the version (e.g. the job recommendation index) follow along.
+#   - ETags are content hashes (catalog-wide for /api/jobs, per job for /api/jobs/{id}),
+#     so every worker process serving the same data hands out the same ETag.
+#
+# Usage:
+#   jobs, etag = await job_catalog.list_jobs(db_session, category)
+#   job = await job_catalog.get_job(db_session, job_id)      # dict or None; do not mutate
+#
+# Author: BeeBee AI Track-B
+# Version: 1.1.1
+# =============================================================================
+
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import config
+from .database import Job
+
+JOB_FIELDS = (
+    "id", "title", "category", "description", "skills",
+    "experience_level", "common_questions", "evaluation_criteria"
+)
+
+
+def _etag(payload: Any) -> str:
+    digest = hashlib.sha1(json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+    return f'"{digest.hexdigest()[:20]}"'
+
+
+class JobCatalog:
+    def __init__(self):
+        self.version = 0
+        self._loaded_version: Optional[int] = None
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._job_etags: Dict[str, str] = {}
+        self._etag = ""
+        self._lock = asyncio.Lock()
+        self._fingerprint: Optional[Tuple] = None
+        self._checked_at = 0.0
+        self.stats = {"hits": 0, "loads": 0, "external_changes": 0}
+
+    def invalidate(self, *_):
+        """Bump the version; wired to Job ORM write events below"""
+        self.version += 1
+
+    @staticmethod
+    async def _read_fingerprint(db_session: AsyncSession) -> Tuple:
+        return tuple((await db_session.execute(select(func.count(Job.id), func.max(Job.updated_at)))).one())
+
+    async def _check_external_changes(self, db_session: AsyncSession):
+        """Bump the version if the jobs table changed outside this process"""
+        now = time.monotonic()
+        if self._fingerprint is None or now - self._checked_at < config.JOB_CATALOG_CHECK_SECONDS:
+            return
+        self._checked_at = now
+        if await self._read_fingerprint(db_session) != self._fingerprint:
+            self.stats["external_changes"] += 1
+            self.invalidate()
+
+    async def _ensure_loaded(self, db_session: AsyncSession):
+        await self._check_external_changes(db_session)
+        if self._loaded_version == self.version:
+            self.stats["hits"] += 1
+            return
+        async with self._lock:
+            if self._loaded_version == self.version:
+                return
+            version = self.version
+            # 指纹先于数据读取：加载期间的外部写入会在下次检查时被发现
+            fingerprint = await self._read_fingerprint(db_session)
+            result = await db_session.execute(select(*(getattr(Job, name) for name in JOB_FIELDS)))
+            jobs = {row.id: dict(zip(JOB_FIELDS, row)) for row in result.all()}
+            self._jobs = jobs
+            self._job_etags = {job_id: _etag(job) for job_id, job in jobs.items()}
+            self._etag = _etag(sorted(self._job_etags.items()))
+            # 加载期间若有写入，version 已变，下次读取会再次加载
+            self._loaded_version = version
+            self._fingerprint = fingerprint
+            self._checked_at = time.monotonic()
+            self.stats["loads"] += 1
+
+    async def list_jobs(self, db_session: AsyncSession, category: Optional[str] = None) -> Tuple[List[Dict[str, Any]], str]:
+        """(jobs, catalog ETag)"""
+        await self._ensure_loaded(db_session)
+        jobs = [job for job in self._jobs.values() if not category or job["category"] == category]
+        return jobs, self._etag
+
+    async def get_job(self, db_session: AsyncSession, job_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not job_id:
+            return None
+        await self._ensure_loaded(db_session)
+        return self._jobs.get(job_id)
+
+    def job_etag(self, job_id: str) -> Optional[str]:
+        return self._job_etags.get(job_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "version": self.version, "jobs": len(self._jobs)}
+
+
+job_catalog = JobCatalog()
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(Job, _event_name, job_catalog.invalidate)
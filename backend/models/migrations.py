@@ -0,0 +1,234 @@
+# models/migrations.py — Version 1.1.1
+# =============================================================================
+# Interview Helper Backend — Lightweight Schema Migrations
+#
+# Overview:
+#   - Base.metadata.create_all only creates missing tables; it never adds indexes
+#     to tables that already exist in an older SQLite file.
+#   - apply_index_migrations() creates every index declared on the ORM models that
+#     the database does not have yet (CREATE INDEX IF NOT EXISTS semantics).
+#   - explain_hot_queries() runs EXPLAIN QUERY PLAN for the hot-path queries and
+#     reports whether each one is served by an index or falls back to a table scan.
+#     The checked SQL is compiled (literal binds) from the same statement builders the
+#     repositories / stats service / progress tracker execute, so it cannot drift.
+#   - run_startup_steps() records each startup step (schema, seed data, backfills) in
+#     schema_versions and skips steps whose version is already applied, so a warm restart
+#     costs a single SELECT instead of create_all + reflection + COUNT(*).
+#     The schema version is a fingerprint of Base.metadata, so any model change re-runs it.
+#
+# Hot queries covered:
+#   1. RAG turn history      — repositories.session_history_stmt
+#   2. /api/stats            — stats_service.recent_sessions_stmt(user_id) (joins jobs)
+#   3. /api/stats (all)      — stats_service.recent_sessions_stmt(None)
+#   4. /api/stats fallback   — stats_service.totals_stmt / top_role_fallback_stmt (GROUP BY)
+#   5. Plan progress         — progress_tracker.progress_logs_stmt
+#   6. Plan gaps/strengths   — repositories.plan_skill_gaps_stmt
+#   7. User planner summary  — progress_tracker.user_plans_stmt
+#
+# Usage:
+#   python -m models.migrations [database_url]   # apply indexes and print query plans
+#   timings = run_startup_steps(db)               # app startup
+#
+# Author: BeeBee AI Track-B
+# Version: 1.1.1
+# =============================================================================
+
+import hashlib
+import time
+from typing import Callable, Dict, List, Tuple
+from sqlalchemy import inspect, select, text
+from .database import Base, SchemaVersion, SEED_VERSION
+from . import planner_models, stats_models, archive_models, jd_analysis_models, resume_models, task_models, recommendation_cache_models  # noqa: F401  注册规划/统计/归档/JD分析/简历解析/任务/推荐缓存表到 Base.metadata
+
+
+
+def _hot_query_statements() -> Dict[str, object]:
+    """The SQLAlchemy statements the app actually sends on its hot paths (bound with sample IDs)"""
+    from .repositories import session_history_stmt, plan_skill_gaps_stmt
+    from services.stats_service import recent_sessions_stmt, totals_stmt, top_role_fallback_stmt
+    from services.progress_tracker import progress_logs_stmt, user_plans_stmt
+    return {
+        "session_history": session_history_stmt("x"),
+        "user_stats": recent_sessions_stmt("x"),
+        "recent_sessions": recent_sessions_stmt(None),
+        "stats_totals_fallback": totals_stmt("x"),
+        "top_role_fallback": top_role_fallback_stmt("x"),
+        "plan_progress": progress_logs_stmt("x", "course"),
+        "plan_skill_gaps": plan_skill_gaps_stmt("x"),
+        "user_plans": user_plans_stmt("x"),
+    }
+
+
+# Sorting aggregated rows needs a temp B-tree no matter the index; only rollup-less scopes run these
+TEMP_SORT_EXPECTED = {"top_role_fallback"}
+
+
+def hot_queries(engine) -> Dict[str, str]:
+    """Hot-path statements compiled for the engine's dialect with literal binds"""
+    return {
+        name: str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+        for name, stmt in _hot_query_statements().items()
+    }
+
+
+def apply_index_migrations(engine) -> List[str]:
+    """Create declared indexes missing from existing tables; returns the names created"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_indexes = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing_indexes:
+                continue
+            index.create(bind=engine, checkfirst=True)
+            created.append(index.name)
+    if created:
+        print(f">>> 已补建索引: {', '.join(created)}")
+    return created
+
+
+def schema_fingerprint() -> str:
+    """Short hash of every table, column and index declared on Base.metadata"""
+    parts = []
+    for table in Base.metadata.sorted_tables:
+        columns = ",".join(f"{c.name}:{c.type}" for c in table.columns)
+        indexes = ",".join(sorted(ix.name for ix in table.indexes))
+        parts.append(f"{table.name}({columns})[{indexes}]")
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def _apply_schema(db):
+    db.create_tables()
+
+
+def _apply_seed(db):
+    db.init_default_data()
+
+
+def _apply_stats_rollups(db):
+    from services.stats_service import ensure_stats_rollups
+    session = db.get_session()
+    try:
+        ensure_stats_rollups(session)
+    finally:
+        session.close()
+
+
+def _apply_plan_children(db):
+    """Move legacy plan blobs (gaps/strengths, recommended_*) into plan_skill_gaps / plan_recommendations"""
+    from .planner_models import InterviewPlan, split_gap_analysis, build_recommendation_rows
+    session = db.get_session()
+    try:
+        moved = 0
+        for plan in session.query(InterviewPlan).yield_per(200):
+            analysis = plan.gap_analysis or {}
+            has_gap_lists = any(key in analysis for key in ("gaps", "strengths"))
+            has_legacy_recs = any([plan.recommended_courses, plan.recommended_projects, plan.recommended_practice])
+            if not (has_gap_lists or has_legacy_recs):
+                continue
+            if has_gap_lists:
+                plan.gap_analysis, rows = split_gap_analysis(plan.id, analysis)
+                session.add_all(rows)
+            if has_legacy_recs:
+                session.add_all(build_recommendation_rows(plan.id, {
+                    "courses": plan.recommended_courses,
+                    "projects": plan.recommended_projects,
+                    "practice": plan.recommended_practice
+                }))
+                plan.recommended_courses = plan.recommended_projects = plan.recommended_practice = None
+            moved += 1
+        session.commit()
+        if moved:
+            print(f">>> 已迁移 {moved} 个规划的差距/推荐到子表")
+    finally:
+        session.close()
+
+
+# (component, version, apply) — run in order; a step runs only when its recorded version differs
+STARTUP_STEPS: List[Tuple[str, Callable[[], str], Callable]] = [
+    ("schema", schema_fingerprint, _apply_schema),
+    ("seed", lambda: SEED_VERSION, _apply_seed),
+    ("stats_rollups", lambda: "1", _apply_stats_rollups),
+    ("plan_children", lambda: "1", _apply_plan_children),
+]
+
+
+def _applied_versions(db) -> Dict[str, str]:
+    if not inspect(db.engine).has_table(SchemaVersion.__tablename__):
+        return {}
+    session = db.get_session()
+    try:
+        return dict(session.execute(select(SchemaVersion.component, SchemaVersion.version)).all())
+    finally:
+        session.close()
+
+
+def run_startup_steps(db) -> Dict[str, Dict]:
+    """Apply pending startup steps; returns {component: {"status", "version", "ms"}}"""
+    applied = _applied_versions(db)
+    report = {}
+    for component, version_fn, apply in STARTUP_STEPS:
+        version = version_fn()
+        if applied.get(component) == version:
+            report[component] = {"status": "skipped", "version": version, "ms": 0.0}
+            continue
+        started = time.perf_counter()
+        apply(db)
+        session = db.get_session()
+        try:
+            session.merge(SchemaVersion(component=component, version=version))
+            session.commit()
+        finally:
+            session.close()
+        report[component] = {
+            "status": "applied",
+            "version": version,
+            "ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+        print(f">>> 启动步骤已应用: {component} -> {version}")
+    return report
+
+
+def explain_hot_queries(engine) -> Dict[str, Dict]:
+    """EXPLAIN QUERY PLAN each hot query (SQLite); flags table scans and temp sorts"""
+    if engine.dialect.name != "sqlite":
+        return {}
+    report = {}
+    with engine.connect() as conn:
+        for name, sql in hot_queries(engine).items():
+            rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+            details = [row[-1] for row in rows]
+            uses_index = any("USING INDEX" in d or "USING COVERING INDEX" in d for d in details)
+            # 物化子查询（SCAN anon_1）不算全表扫描
+            table_scan = any(
+                d.startswith("SCAN") and "USING" not in d and d.split()[1] in Base.metadata.tables
+                for d in details
+            )
+            temp_sort = any("TEMP B-TREE" in d for d in details)
+            report[name] = {
+                "plan": details,
+                "uses_index": uses_index,
+                "table_scan": table_scan,
+                "temp_sort": temp_sort,
+                "ok": uses_index and not table_scan and (not temp_sort or name in TEMP_SORT_EXPECTED),
+            }
+    return report
+
+
+if __name__ == "__main__":
+    import sys
+    from sqlalchemy import create_engine
+
+    url = sys.argv[1] if len(sys.argv) > 1 else "sqlite:///./interview_helper.db"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    apply_index_migrations(engine)
+    failed = False
+    for name, result in explain_hot_queries(engine).items():
+        status = "✅" if result["ok"] else "❌"
+        failed = failed or not result["ok"]
+        print(f"{status} {name}: {' | '.join(result['plan'])}")
+    sys.exit(1 if failed else 0)
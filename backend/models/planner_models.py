@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, Text, ForeignKey, JSON, Boolean
+from sqlalchemy import Column, String, Integer, Float, DateTime, Text, ForeignKey, JSON, Boolean, Index, update
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 import uuid
 from .database import Base
 
@@ -9,7 +10,7 @@ class InterviewPlan(Base):
     __tablename__ = "interview_plans"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String, ForeignKey("users.id"), nullable=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=True, index=True)
     
     # Plan details
     job_title = Column(String, nullable=False)
@@ -25,16 +26,16 @@ class InterviewPlan(Base):
     # Analysis results
     skill_match_score = Column(Float, nullable=True)
     experience_match_score = Column(Float, nullable=True)
-    gap_analysis = Column(JSON)  # Detailed gap analysis
+    gap_analysis = Column(JSON)  # Analysis summary; gaps/strengths live in plan_skill_gaps
     
-    # Recommendations
+    # Recommendations (legacy blobs, moved to plan_recommendations by the plan_children startup step)
     recommended_courses = Column(JSON)
     recommended_projects = Column(JSON)
     recommended_practice = Column(JSON)
     
     # Progress tracking
-    courses_progress = Column(JSON)  # {course_id: progress_percentage}
-    projects_progress = Column(JSON)  # {project_id: progress_percentage}
+    courses_progress = Column(JSON)  # legacy; per-item progress lives on plan_recommendations
+    projects_progress = Column(JSON)  # legacy
     interviews_completed = Column(Integer, default=0)
     
     # Achievements
@@ -47,10 +48,71 @@ class InterviewPlan(Base):
     # Relationships
     user = relationship("User", back_populates="plans")
     progress_logs = relationship("ProgressLog", back_populates="plan")
+    # Lazy: only loaded when accessed; async handlers query them via models/repositories.py
+    skill_gaps = relationship("PlanSkillGap", back_populates="plan", order_by="PlanSkillGap.position")
+    recommendations = relationship("PlanRecommendation", back_populates="plan", order_by="PlanRecommendation.position")
+
+class PlanSkillGap(Base):
+    """One skill gap or strength from analyze_job_match"""
+    __tablename__ = "plan_skill_gaps"
+    __table_args__ = (
+        Index("ix_plan_skill_gaps_plan_kind", "plan_id", "kind", "position"),
+    )
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    plan_id = Column(String, ForeignKey("interview_plans.id"), nullable=False)
+    kind = Column(String, nullable=False)  # gap, strength
+    position = Column(Integer, default=0)
+    
+    skill = Column(String, nullable=False)
+    status = Column(String, nullable=True)  # missing, partial (gaps only)
+    priority = Column(String, nullable=True)  # high, medium, low
+    importance = Column(String, nullable=True)
+    category = Column(String, nullable=True)
+    data = Column(JSON)  # The full item as returned by the analysis service
+    
+    # Relationships
+    plan = relationship("InterviewPlan", back_populates="skill_gaps")
+
+class PlanRecommendation(Base):
+    """One recommended course, project or practice item, with its progress"""
+    __tablename__ = "plan_recommendations"
+    __table_args__ = (
+        Index("ix_plan_recommendations_plan_kind", "plan_id", "kind", "position"),
+        Index("ix_plan_recommendations_plan_item", "plan_id", "item_id"),
+    )
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    plan_id = Column(String, ForeignKey("interview_plans.id"), nullable=False)
+    kind = Column(String, nullable=False)  # course, project, practice
+    position = Column(Integer, default=0)
+    
+    item_id = Column(String, nullable=True)  # The recommendation's own id, e.g. "course_1"
+    title = Column(String, nullable=True)
+    data = Column(JSON)  # The full item as returned by the analysis service
+    
+    # Progress
+    progress_percentage = Column(Float, default=0.0)
+    completed = Column(Boolean, default=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    plan = relationship("InterviewPlan", back_populates="recommendations")
+
+# Plan response keys ↔ plan_recommendations.kind
+RECOMMENDATION_KINDS = {
+    "recommended_courses": "course",
+    "recommended_projects": "project",
+    "recommended_practice": "practice",
+}
 
 class ProgressLog(Base):
     """Progress tracking for plans"""
     __tablename__ = "progress_logs"
+    __table_args__ = (
+        # ProgressTracker.calculate_plan_progress: WHERE plan_id = ? AND activity_type = ?
+        Index("ix_progress_logs_plan_activity", "plan_id", "activity_type"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     plan_id = Column(String, ForeignKey("interview_plans.id"), nullable=False)
@@ -98,4 +160,92 @@ class UserAchievement(Base):
     # Relationships
     user = relationship("User")
     achievement = relationship("Achievement")
-    plan = relationship("InterviewPlan") 
\ No newline at end of file
+    plan = relationship("InterviewPlan")
+
+
+# Keys of analyze_job_match's result stored as plan_skill_gaps rows rather than in gap_analysis
+SKILL_GAP_KINDS = {"gaps": "gap", "strengths": "strength"}
+
+
+def gap_row_values(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values of one gap / strength item (everything but plan_id, kind, position)"""
+    return {
+        "skill": str(item.get("skill", "")),
+        "status": item.get("status"),
+        "priority": item.get("priority"),
+        "importance": item.get("importance"),
+        "category": item.get("category"),
+        "data": item
+    }
+
+
+def _gap_positions(analysis: Dict[str, Any]) -> Dict[str, List[int]]:
+    """Position of each gap / strength = index of its JD skill in jd_requirements.required_skills
+
+    Stable when an entry moves between gaps and strengths, so an incremental re-analysis only
+    touches the rows it changes. Analyses without JD requirements keep plain list order.
+    """
+    jd_indexes: Dict[str, List[int]] = {}
+    for index, jd_skill in enumerate((analysis.get("jd_requirements") or {}).get("required_skills") or []):
+        if isinstance(jd_skill, dict):
+            jd_indexes.setdefault(str(jd_skill.get("skill", "")), []).append(index)
+    positions: Dict[str, List[int]] = {}
+    for key in SKILL_GAP_KINDS:
+        items = analysis.get(key) or []
+        found = [jd_indexes[name].pop(0) if jd_indexes.get(name) else None
+                 for name in (str(item.get("skill", "")) for item in items)]
+        positions[key] = found if None not in found else list(range(len(items)))
+    return positions
+
+
+def split_gap_analysis(plan_id: str, analysis: Dict[str, Any]) -> Tuple[Dict[str, Any], List[PlanSkillGap]]:
+    """analyze_job_match result → (summary blob without gaps/strengths, PlanSkillGap rows)"""
+    analysis = analysis or {}
+    summary = {key: value for key, value in analysis.items() if key not in SKILL_GAP_KINDS}
+    positions = _gap_positions(analysis)
+    rows = []
+    for key, kind in SKILL_GAP_KINDS.items():
+        for position, item in zip(positions[key], analysis.get(key) or []):
+            rows.append(PlanSkillGap(plan_id=plan_id, kind=kind, position=position, **gap_row_values(item)))
+    return summary, rows
+
+
+def join_gap_analysis(summary: Optional[Dict[str, Any]], rows) -> Dict[str, Any]:
+    """Inverse of split_gap_analysis; rows (anything with .kind / .data) ordered by position"""
+    analysis = dict(summary or {})
+    for key, kind in SKILL_GAP_KINDS.items():
+        analysis[key] = [row.data for row in rows if row.kind == kind]
+    return analysis
+
+
+def build_recommendation_rows(plan_id: str, recommendations: Dict[str, List[Dict[str, Any]]]) -> List[PlanRecommendation]:
+    """generate_recommendations result ({"courses": [...], ...}) → PlanRecommendation rows"""
+    rows = []
+    for key, kind in (("courses", "course"), ("projects", "project"), ("practice", "practice")):
+        for position, item in enumerate((recommendations or {}).get(key) or []):
+            rows.append(PlanRecommendation(
+                plan_id=plan_id,
+                kind=kind,
+                position=position,
+                item_id=str(item["id"]) if isinstance(item, dict) and item.get("id") is not None else None,
+                title=(item.get("name") or item.get("type")) if isinstance(item, dict) else str(item),
+                data=item
+            ))
+    return rows
+
+
+def recommendation_progress_update(plan_id: str, item_id: str, progress_percentage: float, completed: bool):
+    """UPDATE of the single plan_recommendations row a progress report refers to"""
+    return (
+        update(PlanRecommendation)
+        .where(PlanRecommendation.plan_id == plan_id, PlanRecommendation.item_id == item_id)
+        .values(progress_percentage=progress_percentage, completed=completed, updated_at=datetime.utcnow())
+    )
+
+
+def group_recommendations(rows) -> Dict[str, List[Dict[str, Any]]]:
+    """Rows (anything with .kind / .data) → {"recommended_courses": [...], ...}, ordered by position"""
+    return {
+        key: [row.data for row in rows if row.kind == kind]
+        for key, kind in RECOMMENDATION_KINDS.items()
+    }
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, DateTime, JSON, Index
+from datetime import datetime
+from .database import Base
+
+class CachedRecommendation(Base):
+    """Generated plan recommendations per canonical skill-gap vector (see services/recommendation_cache.py)"""
+    __tablename__ = "recommendation_cache"
+    __table_args__ = (
+        # Warm-up load: newest entries of one scope
+        Index("ix_recommendation_cache_scope_created", "scope", "created_at"),
+    )
+
+    gap_key = Column(String, primary_key=True)  # sha256 of the sorted (skill, priority) pairs
+    scope = Column(String, primary_key=True)    # recommendation mode : model : catalog version
+    gaps = Column(JSON, nullable=False)         # [[canonical skill, priority], ...]
+    recommendations = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,357 @@
+# models/repositories.py — Version 1.1.1
+# =============================================================================
+# Interview Helper Backend — Async Data Access Layer
+#
+# Overview:
+#   - Repository functions over SQLAlchemy 2.0 AsyncSession, used by every FastAPI handler
+#     so DB I/O no longer blocks the event loop and overlaps with LLM / TTS I/O.
+#   - Relationships the handlers need (e.g. InterviewSession.job) are loaded eagerly,
+#     since lazy loading is not available on AsyncSession.
+#
+# Groups:
+#   1. Jobs           — list_jobs, get_job
+#   2. Sessions       — get_interview_session, create_interview_session, end_interview_session, get_statistics
+#   3. Questions      — list_questions, list_question_page, stream_questions (keyset + projection),
+#                       load_session_history, add_question
+#   4. Archive        — get_archived_session, archived_question_page (read-through to cold storage)
+#   5. Plans          — get_plan, create_plan, save/load_plan_analysis, save/load_plan_recommendations
+#                       (child tables plan_skill_gaps / plan_recommendations);
+#                       update_plan_skill_gaps writes only the rows an incremental re-analysis changed
+#   6. Progress logs  — run_progress_tracker (bridges the sync ProgressTracker via run_sync)
+#   7. Resumes        — get_resume_parse, save_resume_parse (parse cache by content hash)
+#
+# Usage:
+#   async with db.get_async_session() as db_session:
+#       session = await repositories.get_interview_session(db_session, session_id)
+#
+# Author: BeeBee AI Track-B
+# Version: 1.1.1
+# =============================================================================
+
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select, delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from starlette.concurrency import run_in_threadpool
+from .database import Job, InterviewSession, Question
+from .planner_models import (
+    InterviewPlan, PlanSkillGap, PlanRecommendation,
+    split_gap_analysis, join_gap_analysis, gap_row_values, build_recommendation_rows, group_recommendations
+)
+from .archive_models import ArchivedSession
+from .resume_models import ResumeParse
+from services.stats_service import StatsService
+from services.session_archiver import read_archived_record
+
+
+# ===== Jobs =====
+
+async def list_jobs(db_session: AsyncSession, category: Optional[str] = None) -> List[Job]:
+    stmt = select(Job)
+    if category:
+        stmt = stmt.where(Job.category == category)
+    result = await db_session.execute(stmt)
+    return list(result.scalars().all())
+
+
+async def get_job(db_session: AsyncSession, job_id: str) -> Optional[Job]:
+    return await db_session.get(Job, job_id)
+
+
+# ===== Sessions =====
+
+async def get_interview_session(
+    db_session: AsyncSession,
+    session_id: str,
+    with_job: bool = True
+) -> Optional[InterviewSession]:
+    """Fetch a session, with its job eagerly loaded unless the caller uses the job catalog"""
+    stmt = select(InterviewSession).where(InterviewSession.id == session_id)
+    if with_job:
+        stmt = stmt.options(selectinload(InterviewSession.job))
+    result = await db_session.execute(stmt)
+    return result.scalars().first()
+
+
+async def create_interview_session(
+    db_session: AsyncSession,
+    job_id: str,
+    user_id: Optional[str],
+    interview_type: str,
+    first_question: str
+) -> InterviewSession:
+    """Create a session and its opening question in one transaction"""
+    session = InterviewSession(user_id=user_id, job_id=job_id, interview_type=interview_type)
+    db_session.add(session)
+    await db_session.flush()
+    db_session.add(Question(
+        session_id=session.id,
+        question_text=first_question,
+        question_type="behavioral",
+        order_index=0
+    ))
+    await StatsService(db_session).record_session_started(session)
+    await db_session.commit()
+    return session
+
+
+async def end_interview_session(db_session: AsyncSession, session: InterviewSession) -> int:
+    """Set final score, end time and duration; returns the number of questions asked"""
+    previous_score, previous_duration = session.overall_score, session.duration_seconds
+    result = await db_session.execute(select(Question.score).where(Question.session_id == session.id))
+    all_scores = list(result.scalars().all())
+    scores = [score for score in all_scores if score is not None]
+    if scores:
+        session.overall_score = sum(scores) / len(scores)
+    end_time = datetime.utcnow()
+    session.end_time = end_time
+    session.duration_seconds = int((end_time - session.start_time).total_seconds()) if isinstance(session.start_time, datetime) else 0
+    # 统计汇总与会话结束在同一事务中更新
+    await StatsService(db_session).record_session_ended(session, previous_score, previous_duration)
+    await db_session.commit()
+    return len(all_scores)
+
+
+async def get_statistics(db_session: AsyncSession, user_id: Optional[str] = None) -> Dict[str, Any]:
+    return await StatsService(db_session).get_statistics(user_id)
+
+
+# ===== Questions =====
+
+async def list_questions(db_session: AsyncSession, session_id: str) -> List[Question]:
+    result = await db_session.execute(
+        select(Question).where(Question.session_id == session_id).order_by(Question.order_index)
+    )
+    return list(result.scalars().all())
+
+
+# Transcript fields exposed by GET /api/sessions/{id}, mapped to their columns
+QUESTION_FIELDS = {
+    "id": Question.id,
+    "question": Question.question_text,
+    "user_response": Question.user_response_text,
+    "score": Question.score,
+    "feedback": Question.ai_feedback,
+    "improvements": Question.improvements,
+    "asked_at": Question.asked_at,
+    "answered_at": Question.answered_at,
+}
+
+
+def _question_page_stmt(session_id: str, fields: List[str], after: Optional[int], limit: Optional[int]):
+    """Keyset on (session_id, order_index), selecting only the requested columns"""
+    stmt = (
+        select(Question.order_index, *(QUESTION_FIELDS[name] for name in fields))
+        .where(Question.session_id == session_id)
+        .order_by(Question.order_index)
+    )
+    if after is not None:
+        stmt = stmt.where(Question.order_index > after)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def _question_row(fields: List[str], row) -> Dict[str, Any]:
+    return {"order_index": row[0], **dict(zip(fields, row[1:]))}
+
+
+async def list_question_page(
+    db_session: AsyncSession,
+    session_id: str,
+    fields: List[str],
+    after: Optional[int] = None,
+    limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """One page of a session transcript, as dicts keyed by field name plus order_index"""
+    result = await db_session.execute(_question_page_stmt(session_id, fields, after, limit))
+    return [_question_row(fields, row) for row in result.all()]
+
+
+async def stream_questions(
+    db_session: AsyncSession,
+    session_id: str,
+    fields: List[str],
+    after: Optional[int] = None,
+    limit: Optional[int] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """Like list_question_page, but yields rows as the cursor fetches them"""
+    result = await db_session.stream(_question_page_stmt(session_id, fields, after, limit))
+    async for row in result:
+        yield _question_row(fields, row)
+
+
+# ===== Archive =====
+
+async def get_archived_session(db_session: AsyncSession, session_id: str) -> Optional[Dict[str, Any]]:
+    """Archived session record (columns, job, questions) via the offset index, or None"""
+    entry = await db_session.get(ArchivedSession, session_id)
+    if entry is None:
+        return None
+    return await run_in_threadpool(read_archived_record, entry.segment, entry.offset, entry.length)
+
+
+def archived_question_page(
+    record: Dict[str, Any],
+    fields: List[str],
+    after: Optional[int] = None,
+    limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Same shape as list_question_page, served from an archived record"""
+    rows = [q for q in record["questions"] if after is None or (q["order_index"] or 0) > after]
+    rows = rows[:limit] if limit is not None else rows
+    return [
+        {"order_index": q["order_index"], **{name: q[QUESTION_FIELDS[name].key] for name in fields}}
+        for q in rows
+    ]
+
+
+def session_history_stmt(session_id: str):
+    return (
+        select(Question.question_text, Question.user_response_text, Question.asked_at)
+        .where(Question.session_id == session_id)
+        .order_by(Question.order_index)
+    )
+
+
+async def load_session_history(db_session: AsyncSession, session_id: str) -> List[Dict[str, Any]]:
+    """Conversation history for the RAG prompt, selecting only the columns it needs"""
+    result = await db_session.execute(session_history_stmt(session_id))
+    return [
+        {
+            "question": question_text,
+            "user_response": user_response_text,
+            "timestamp": asked_at.isoformat()
+        }
+        for question_text, user_response_text, asked_at in result.all()
+    ]
+
+
+async def add_question(db_session: AsyncSession, **fields) -> Question:
+    question = Question(**fields)
+    db_session.add(question)
+    await db_session.commit()
+    return question
+
+
+# ===== Plans =====
+
+async def get_plan(db_session: AsyncSession, plan_id: str) -> Optional[InterviewPlan]:
+    return await db_session.get(InterviewPlan, plan_id)
+
+
+async def create_plan(db_session: AsyncSession, **fields) -> InterviewPlan:
+    plan = InterviewPlan(**fields)
+    db_session.add(plan)
+    await db_session.commit()
+    return plan
+
+
+async def save_plan_analysis(db_session: AsyncSession, plan: InterviewPlan, analysis: Dict[str, Any]):
+    """Store an analyze_job_match result: scores + summary on the plan, gaps/strengths as rows; caller commits"""
+    summary, rows = split_gap_analysis(plan.id, analysis)
+    plan.skill_match_score = analysis["skill_match"]
+    plan.experience_match_score = analysis["experience_match"]
+    plan.gap_analysis = summary
+    await db_session.execute(delete(PlanSkillGap).where(PlanSkillGap.plan_id == plan.id))
+    db_session.add_all(rows)
+
+
+def plan_skill_gaps_stmt(plan_id: str):
+    return (
+        select(PlanSkillGap.kind, PlanSkillGap.data)
+        .where(PlanSkillGap.plan_id == plan_id)
+        .order_by(PlanSkillGap.kind, PlanSkillGap.position)
+    )
+
+
+async def update_plan_skill_gaps(
+    db_session: AsyncSession,
+    plan: InterviewPlan,
+    analysis: Dict[str, Any],
+    skills: Iterable[str]
+) -> Dict[str, int]:
+    """Store an incremental re-analysis: scores + summary on the plan, and only the plan_skill_gaps
+    rows of the re-analyzed JD `skills` (plus any row whose position moved); caller commits"""
+    summary, rows = split_gap_analysis(plan.id, analysis)
+    plan.skill_match_score = analysis["skill_match"]
+    plan.experience_match_score = analysis["experience_match"]
+    plan.gap_analysis = summary
+
+    skills = set(skills)
+    existing: Dict[Tuple[str, str], List[Tuple[str, int]]] = {}
+    result = await db_session.execute(
+        select(PlanSkillGap.id, PlanSkillGap.kind, PlanSkillGap.skill, PlanSkillGap.position)
+        .where(PlanSkillGap.plan_id == plan.id)
+        .order_by(PlanSkillGap.kind, PlanSkillGap.position)
+    )
+    for row_id, kind, skill, position in result.all():
+        existing.setdefault((kind, skill), []).append((row_id, position))
+
+    counts = {"inserted": 0, "updated": 0, "deleted": 0}
+    for row in rows:
+        matches = existing.get((row.kind, row.skill))
+        if not matches:
+            db_session.add(row)
+            counts["inserted"] += 1
+            continue
+        row_id, position = matches.pop(0)
+        if row.skill in skills or position != row.position:
+            await db_session.execute(
+                update(PlanSkillGap).where(PlanSkillGap.id == row_id)
+                .values(position=row.position, **gap_row_values(row.data))
+            )
+            counts["updated"] += 1
+    # 条目在 gap / strength 间移动，或JD技能已不在分析中
+    stale = [row_id for matches in existing.values() for row_id, _ in matches]
+    if stale:
+        await db_session.execute(delete(PlanSkillGap).where(PlanSkillGap.id.in_(stale)))
+        counts["deleted"] = len(stale)
+    return counts
+
+
+async def load_plan_analysis(db_session: AsyncSession, plan: InterviewPlan) -> Dict[str, Any]:
+    result = await db_session.execute(plan_skill_gaps_stmt(plan.id))
+    return join_gap_analysis(plan.gap_analysis, result.all())
+
+
+async def save_plan_recommendations(db_session: AsyncSession, plan: InterviewPlan, recommendations: Dict[str, List[Dict[str, Any]]]):
+    """Replace the plan's recommendation rows; caller commits"""
+    await db_session.execute(delete(PlanRecommendation).where(PlanRecommendation.plan_id == plan.id))
+    db_session.add_all(build_recommendation_rows(plan.id, recommendations))
+
+
+async def load_plan_recommendations(db_session: AsyncSession, plan_id: str) -> Dict[str, List[Dict[str, Any]]]:
+    result = await db_session.execute(
+        select(PlanRecommendation.kind, PlanRecommendation.data)
+        .where(PlanRecommendation.plan_id == plan_id)
+        .order_by(PlanRecommendation.kind, PlanRecommendation.position)
+    )
+    return group_recommendations(result.all())
+
+
+# ===== Progress logs =====
+
+async def run_progress_tracker(db_session: AsyncSession, fn: Callable) -> Any:
+    """Run a ProgressTracker method on the async session's sync facade
+
+    fn receives a ProgressTracker bound to the underlying sync Session, e.g.
+    ``await run_progress_tracker(db_session, lambda t: t.calculate_plan_progress(plan))``
+    """
+    from services.progress_tracker import ProgressTracker
+    return await db_session.run_sync(lambda sync_session: fn(ProgressTracker(sync_session)))
+
+
+# ===== Resumes =====
+
+async def get_resume_parse(db_session: AsyncSession, content_hash: str, parser_version: str) -> Optional[Dict[str, Any]]:
+    parse = await db_session.get(ResumeParse, (content_hash, parser_version))
+    return parse.parsed if parse else None
+
+
+async def save_resume_parse(db_session: AsyncSession, content_hash: str, parser_version: str, parsed: Dict[str, Any], size_bytes: Optional[int] = None):
+    """Cache a parsed profile; caller commits"""
+    await db_session.merge(ResumeParse(
+        content_hash=content_hash, parser_version=parser_version, parsed=parsed, size_bytes=size_bytes
+    ))
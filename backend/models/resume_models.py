@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, Integer, DateTime, JSON
+from datetime import datetime
+from .database import Base
+
+class ResumeParse(Base):
+    """Parsed resume profile per (file content hash, parser version); see services/resume_store.py"""
+    __tablename__ = "resume_parses"
+
+    content_hash = Column(String, primary_key=True)    # sha256 of the uploaded file bytes
+    parser_version = Column(String, primary_key=True)  # prompt version + extraction model
+    parsed = Column(JSON, nullable=False)
+    size_bytes = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
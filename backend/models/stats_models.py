@@ -0,0 +1,26 @@
+from sqlalchemy import Column, String, Integer, Float, DateTime
+from datetime import datetime
+from .database import Base
+
+# 全局统计行的 scope（不区分用户）
+ALL_USERS_SCOPE = "*"
+
+class UserStatsRollup(Base):
+    """Per-user interview statistics, maintained incrementally on session start/end"""
+    __tablename__ = "user_stats_rollups"
+
+    scope = Column(String, primary_key=True)  # user_id, or "*" for all users
+    total_sessions = Column(Integer, default=0, nullable=False)
+    scored_sessions = Column(Integer, default=0, nullable=False)
+    score_sum = Column(Float, default=0.0, nullable=False)
+    total_practice_time = Column(Integer, default=0, nullable=False)  # seconds
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class UserRoleStatsRollup(Base):
+    """Per-user session count by job, for most_practiced_role"""
+    __tablename__ = "user_role_stats_rollups"
+
+    scope = Column(String, primary_key=True)
+    job_id = Column(String, primary_key=True)
+    session_count = Column(Integer, default=0, nullable=False)
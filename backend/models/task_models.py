@@ -0,0 +1,39 @@
+from sqlalchemy import Column, String, Integer, DateTime, Text, JSON, Index
+from datetime import datetime
+import uuid
+from .database import Base
+
+# 任务状态
+TASK_QUEUED = "queued"
+TASK_RUNNING = "running"
+TASK_SUCCEEDED = "succeeded"
+TASK_FAILED = "failed"
+TASK_FINISHED = (TASK_SUCCEEDED, TASK_FAILED)
+
+class PlannerTask(Base):
+    """Queued planner work (plan creation / resume processing); see models/task_queue.py"""
+    __tablename__ = "planner_tasks"
+    __table_args__ = (
+        # Worker claim: oldest queued task that is due
+        Index("ix_planner_tasks_status_available", "status", "available_at"),
+        Index("ix_planner_tasks_dedup", "dedup_key", "created_at"),
+    )
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    kind = Column(String, nullable=False)            # handler name, e.g. "plan_create"
+    dedup_key = Column(String, nullable=True)        # identical submissions share a task
+    payload = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, default=TASK_QUEUED)
+    stage = Column(String, nullable=True)            # last reported stage
+    progress = Column(JSON, default=list)            # [{"stage", "at", ...detail}]
+    checkpoint = Column(JSON, default=dict)          # handler state kept across retries
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+
+    available_at = Column(DateTime, default=datetime.utcnow)  # retry backoff: not claimed before
+    lease_until = Column(DateTime, nullable=True)             # running task is reclaimed after this
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,327 @@
+# models/task_queue.py — Version 1.1.1
+# =============================================================================
+# Interview Helper Backend — Persistent Planner Task Queue
+#
+# Overview:
+#   - POST /api/planner/create and /api/planner/{id}/upload-resume used to hold the HTTP
+#     request open through document extraction and several LLM calls. They now insert a
+#     row into planner_tasks and return its ID; a bounded pool of worker coroutines runs
+#     the registered handler for each task.
+#   - The queue lives in the database (SQLite by default), so queued work survives a
+#     restart. Workers claim a task with a conditional UPDATE, which is atomic across
+#     processes; a claimed task holds a lease that is renewed while its handler runs and
+#     is reclaimed by any worker once it expires (crashed or killed process).
+#   - Handlers report stages (ctx.report) — stored on the row and pushed to in-process
+#     watchers, which back the status endpoint and its SSE stream. ctx.save_checkpoint()
+#     keeps state across retries (e.g. the plan already created).
+#   - A failing handler is retried with exponential backoff up to max_attempts;
+#     PermanentTaskError fails the task at once.
+#   - Submissions with the same dedup key share one task while it is queued / running and
+#     for config.TASK_DEDUP_WINDOW seconds after it succeeded.
+#
+# Usage:
+#   task_queue.register("plan_create", handler)       # async handler(payload, ctx) -> result
+#   await task_queue.start()                           # app startup
+#   task, deduplicated = await task_queue.submit("plan_create", payload, dedup_key)
+#   async for snapshot in task_queue.watch(task_id): ...
+#   await task_queue.stop()                            # app shutdown
+#
+# Author: BeeBee AI Track-B
+# Version: 1.1.1
+# =============================================================================
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from sqlalchemy import and_, or_, select, update
+from .task_models import PlannerTask, TASK_QUEUED, TASK_RUNNING, TASK_SUCCEEDED, TASK_FAILED, TASK_FINISHED
+
+TASK_FIELDS = (
+    "id", "kind", "status", "stage", "progress", "result", "error", "attempts",
+    "max_attempts", "created_at", "updated_at", "finished_at"
+)
+
+
+class PermanentTaskError(Exception):
+    """Handler failure that retrying cannot fix"""
+
+
+def _snapshot(task: PlannerTask) -> Dict[str, Any]:
+    return {name: getattr(task, name) for name in TASK_FIELDS}
+
+
+class TaskContext:
+    """Passed to handlers: progress reporting and retry checkpoints"""
+
+    def __init__(self, queue: "TaskQueue", task: PlannerTask):
+        self.queue = queue
+        self.task_id = task.id
+        self.attempt = task.attempts
+        self.max_attempts = task.max_attempts
+        self.checkpoint: Dict[str, Any] = dict(task.checkpoint or {})
+
+    @property
+    def last_attempt(self) -> bool:
+        return self.attempt >= self.max_attempts
+
+    async def report(self, stage: str, **detail):
+        await self.queue._update(self.task_id, stage=stage, event={"stage": stage, **detail})
+
+    async def save_checkpoint(self, **values):
+        self.checkpoint.update(values)
+        await self.queue._update(self.task_id, checkpoint=dict(self.checkpoint))
+
+
+class TaskQueue:
+    def __init__(
+        self,
+        db,
+        workers: int = 2,
+        max_attempts: int = 3,
+        retry_delay: float = 2.0,
+        lease_seconds: float = 300.0,
+        poll_interval: float = 1.0,
+        dedup_window: float = 300.0
+    ):
+        self.db = db
+        self.workers = max(1, workers)
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.lease = timedelta(seconds=lease_seconds)
+        self.poll_interval = poll_interval
+        self.dedup_window = timedelta(seconds=dedup_window)
+        self._handlers: Dict[str, Callable[[Dict[str, Any], TaskContext], Awaitable[Any]]] = {}
+        self._worker_tasks: List[asyncio.Task] = []
+        self._active: Set[str] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._changed: Dict[str, asyncio.Event] = {}
+        self._submit_lock: Optional[asyncio.Lock] = None
+        self.stats = {"submitted": 0, "deduplicated": 0, "succeeded": 0, "failed": 0, "retried": 0, "reclaimed": 0}
+
+    def register(self, kind: str, handler: Callable[[Dict[str, Any], TaskContext], Awaitable[Any]]):
+        self._handlers[kind] = handler
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._worker_tasks)
+
+    async def start(self):
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._submit_lock = asyncio.Lock()
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        print(f">>> Task queue started ({self.workers} workers, kinds={sorted(self._handlers)})")
+
+    async def stop(self):
+        """Cancel the workers; tasks they were running go back to the queue"""
+        interrupted = list(self._active)  # 取消后 worker 会把任务移出 _active
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        if interrupted:
+            async with self.db.get_async_session() as db_session:
+                await db_session.execute(
+                    update(PlannerTask)
+                    .where(PlannerTask.id.in_(interrupted), PlannerTask.status == TASK_RUNNING)
+                    .values(status=TASK_QUEUED, lease_until=None, available_at=datetime.utcnow())
+                )
+                await db_session.commit()
+        print(f">>> Task queue stopped: {self.stats}")
+
+    # ----- submission / status -----
+
+    async def submit(self, kind: str, payload: Dict[str, Any], dedup_key: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
+        """Queue a task; returns (task snapshot, True if an identical submission was reused)"""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown task kind: {kind}")
+        lock = self._submit_lock or asyncio.Lock()
+        async with lock, self.db.get_async_session() as db_session:
+            if dedup_key:
+                existing = (await db_session.execute(
+                    select(PlannerTask)
+                    .where(
+                        PlannerTask.dedup_key == dedup_key,
+                        or_(
+                            PlannerTask.status.in_((TASK_QUEUED, TASK_RUNNING)),
+                            and_(PlannerTask.status == TASK_SUCCEEDED,
+                                 PlannerTask.finished_at >= datetime.utcnow() - self.dedup_window)
+                        )
+                    )
+                    .order_by(PlannerTask.created_at.desc())
+                    .limit(1)
+                )).scalar()
+                if existing is not None:
+                    self.stats["deduplicated"] += 1
+                    return _snapshot(existing), True
+            task = PlannerTask(
+                kind=kind, dedup_key=dedup_key, payload=payload, status=TASK_QUEUED,
+                progress=[{"stage": TASK_QUEUED, "at": datetime.utcnow().isoformat()}],
+                checkpoint={}, max_attempts=self.max_attempts, available_at=datetime.utcnow()
+            )
+            db_session.add(task)
+            await db_session.commit()
+            snapshot = _snapshot(task)
+        self.stats["submitted"] += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return snapshot, False
+
+    async def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        async with self.db.get_async_session() as db_session:
+            task = await db_session.get(PlannerTask, task_id)
+            return _snapshot(task) if task else None
+
+    async def watch(self, task_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the task on every change until it finishes (polls for other processes' workers)"""
+        last = None
+        while True:
+            changed = self._changed.setdefault(task_id, asyncio.Event())
+            snapshot = await self.get(task_id)
+            if snapshot is None:
+                return
+            marker = (snapshot["status"], snapshot["attempts"], len(snapshot["progress"] or []))
+            if marker != last:
+                last = marker
+                yield snapshot
+            if snapshot["status"] in TASK_FINISHED:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _notify(self, task_id: str):
+        changed = self._changed.pop(task_id, None)
+        if changed is not None:
+            changed.set()
+
+    async def _update(self, task_id: str, stage: Optional[str] = None, event: Optional[Dict[str, Any]] = None, **values):
+        """Record progress / checkpoint on the row and renew the lease"""
+        async with self.db.get_async_session() as db_session:
+            task = await db_session.get(PlannerTask, task_id)
+            if task is None:
+                return
+            now = datetime.utcnow()
+            if stage is not None:
+                task.stage = stage
+            if event is not None:
+                task.progress = list(task.progress or []) + [{**event, "at": now.isoformat()}]
+            for name, value in values.items():
+                setattr(task, name, value)
+            if task.status == TASK_RUNNING:
+                task.lease_until = now + self.lease
+            await db_session.commit()
+        self._notify(task_id)
+
+    # ----- workers -----
+
+    async def _claim(self) -> Optional[PlannerTask]:
+        """Atomically take the oldest due task (or one whose lease expired)"""
+        while True:
+            now = datetime.utcnow()
+            claimable = or_(
+                and_(PlannerTask.status == TASK_QUEUED, PlannerTask.available_at <= now),
+                and_(PlannerTask.status == TASK_RUNNING, PlannerTask.lease_until < now)
+            )
+            async with self.db.get_async_session() as db_session:
+                task_id = (await db_session.execute(
+                    select(PlannerTask.id)
+                    .where(claimable, PlannerTask.kind.in_(list(self._handlers)))
+                    .order_by(PlannerTask.available_at)
+                    .limit(1)
+                )).scalar()
+                if task_id is None:
+                    return None
+                claimed = await db_session.execute(
+                    update(PlannerTask)
+                    .where(PlannerTask.id == task_id, claimable)
+                    .values(status=TASK_RUNNING, attempts=PlannerTask.attempts + 1, lease_until=now + self.lease)
+                    .execution_options(synchronize_session=False)
+                )
+                await db_session.commit()
+                if claimed.rowcount != 1:
+                    continue  # 其他 worker / 进程抢先领取
+                return await db_session.get(PlannerTask, task_id)
+
+    async def _worker(self):
+        while True:
+            try:
+                task = await self._claim()
+            except Exception as e:
+                print(f"❌ 任务领取失败: {e}")
+                task = None
+            if task is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._active.add(task.id)
+            heartbeat = asyncio.create_task(self._heartbeat(task.id))
+            try:
+                await self._execute(task)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 记账失败（如数据库锁定）不应结束 worker；任务租约过期后会被重新领取
+                print(f"❌ 任务执行记账失败 {task.id}: {e}")
+            finally:
+                heartbeat.cancel()
+                self._active.discard(task.id)
+
+    async def _heartbeat(self, task_id: str):
+        """Renew the lease while the handler runs, so only a dead process loses its tasks"""
+        interval = self.lease.total_seconds() / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with self.db.get_async_session() as db_session:
+                    await db_session.execute(
+                        update(PlannerTask)
+                        .where(PlannerTask.id == task_id, PlannerTask.status == TASK_RUNNING)
+                        .values(lease_until=datetime.utcnow() + self.lease)
+                    )
+                    await db_session.commit()
+            except Exception as e:
+                print(f"⚠️ 任务租约续期失败: {e}")
+
+    async def _execute(self, task: PlannerTask):
+        if task.progress and task.progress[-1].get("stage") not in (TASK_QUEUED, "retry"):
+            self.stats["reclaimed"] += 1  # 租约过期后被重新领取
+        ctx = TaskContext(self, task)
+        await ctx.report(TASK_RUNNING, attempt=task.attempts)
+        try:
+            if task.attempts > task.max_attempts:
+                raise PermanentTaskError("任务多次中断，超过最大尝试次数")
+            result = await self._handlers[task.kind](task.payload, ctx)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            retry = not isinstance(e, PermanentTaskError) and task.attempts < task.max_attempts
+            print(f"❌ 任务 {task.kind} {task.id} 第 {task.attempts} 次执行失败: {e}")
+            if retry:
+                delay = self.retry_delay * 2 ** (task.attempts - 1)
+                self.stats["retried"] += 1
+                await self._update(
+                    task.id, stage="retry", event={"stage": "retry", "error": str(e), "delay_s": delay},
+                    status=TASK_QUEUED, error=str(e), lease_until=None,
+                    available_at=datetime.utcnow() + timedelta(seconds=delay)
+                )
+            else:
+                self.stats["failed"] += 1
+                await self._update(
+                    task.id, stage=TASK_FAILED, event={"stage": TASK_FAILED, "error": str(e)},
+                    status=TASK_FAILED, error=str(e), lease_until=None, finished_at=datetime.utcnow()
+                )
+            return
+        self.stats["succeeded"] += 1
+        await self._update(
+            task.id, stage=TASK_SUCCEEDED, event={"stage": TASK_SUCCEEDED},
+            status=TASK_SUCCEEDED, result=result, error=None, lease_until=None, finished_at=datetime.utcnow()
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "running": self.running, "workers": self.workers, "active": len(self._active)}
@@ -0,0 +1,201 @@
+# models/turn_writer.py — Version 1.1.1
+# =============================================================================
+# Interview Helper Backend — Write-Behind Turn Persistence
+#
+# Overview:
+#   - The RAG handlers no longer INSERT + COMMIT each interview turn on the request path.
+#     Turns are enqueued with their session_id / order_index and a single writer task
+#     flushes them in batched transactions (one commit, one fsync, per batch).
+#   - Turns that are queued but not yet committed stay visible to the same process:
+#     history() merges them into the committed history so the next turn's prompt and
+#     order_index are correct, and wait_for_session() lets readers (GET session, end
+#     session) see every turn before they query the database.
+#
+# Durability modes (config.TURN_WRITE_DURABILITY):
+#   - "enqueue" : the handler responds as soon as the turn is queued; turns still in the
+#                 queue are lost if the process is killed (a clean shutdown drains them).
+#   - "commit"  : the handler waits until the batch holding its turn has committed;
+#                 still batched, so concurrent turns share one commit.
+#
+# Usage:
+#   await turn_writer.start()                                  # app startup
+#   await turn_writer.enqueue(session_id=..., order_index=..., question_text=..., ...)
+#   history = await turn_writer.history(db_session, session_id)
+#   await turn_writer.stop()                                   # app shutdown, drains the queue
+#
+# Author: BeeBee AI Track-B
+# Version: 1.1.1
+# =============================================================================
+
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import Question
+from . import repositories
+
+DURABILITY_MODES = ("enqueue", "commit")
+
+
+class PendingTurn:
+    """A turn waiting in the write-behind queue"""
+
+    def __init__(self, fields: Dict[str, Any]):
+        self.fields = fields
+        self.session_id = fields["session_id"]
+        self.order_index = fields["order_index"]
+        self.committed = asyncio.get_running_loop().create_future()
+
+    def as_history(self) -> Dict[str, Any]:
+        # 与 repositories.load_session_history 返回格式一致
+        return {
+            "question": self.fields.get("question_text"),
+            "user_response": self.fields.get("user_response_text"),
+            "timestamp": self.fields["asked_at"].isoformat()
+        }
+
+
+class TurnWriter:
+    """Single-writer, batched persistence of interview turns"""
+
+    def __init__(
+        self,
+        db,
+        durability: str = "enqueue",
+        batch_size: int = 50,
+        max_delay_ms: int = 20,
+        max_retries: int = 3
+    ):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown turn write durability mode: {durability}")
+        self.db = db
+        self.durability = durability
+        self.batch_size = batch_size
+        self.max_delay = max_delay_ms / 1000
+        self.max_retries = max_retries
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Dict[str, List[PendingTurn]] = {}
+        self.stats = {"enqueued": 0, "committed": 0, "failed": 0, "batches": 0, "max_batch": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+        print(f">>> Turn writer started (durability={self.durability}, batch_size={self.batch_size})")
+
+    async def stop(self):
+        """Drain the queue, commit what is left, then stop the writer task"""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        print(f">>> Turn writer drained: {self.stats}")
+
+    async def enqueue(self, **fields) -> Optional[Question]:
+        """Queue a turn (Question columns, session_id and order_index required)
+
+        When the writer is not running (e.g. scripts without the startup event) the turn
+        is written directly, as before.
+        """
+        if not self.running:
+            async with self.db.get_async_session() as db_session:
+                return await repositories.add_question(db_session, **fields)
+        fields.setdefault("asked_at", fields.get("answered_at") or datetime.utcnow())
+        turn = PendingTurn(fields)
+        self._pending.setdefault(turn.session_id, []).append(turn)
+        self.stats["enqueued"] += 1
+        await self._queue.put(turn)
+        if self.durability == "commit":
+            # shield：请求被取消（客户端断开）时不取消写入任务共享的 future
+            await asyncio.shield(turn.committed)
+        return None
+
+    async def history(self, db_session: AsyncSession, session_id: str) -> List[Dict[str, Any]]:
+        """Committed history plus turns still queued for this session"""
+        # 先取队列快照再查库：期间提交的轮次会同时出现在两边，按 order_index 去重
+        pending = list(self._pending.get(session_id, []))
+        committed = await repositories.load_session_history(db_session, session_id)
+        return committed + [
+            turn.as_history() for turn in pending if turn.order_index >= len(committed)
+        ]
+
+    async def wait_for_session(self, session_id: str):
+        """Block until every queued turn of this session is committed (or failed)"""
+        pending = list(self._pending.get(session_id, []))
+        if pending:
+            await asyncio.gather(*(asyncio.shield(turn.committed) for turn in pending), return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "running": self.running,
+            "durability": self.durability,
+            "queued": self._queue.qsize() if self._queue is not None else 0
+        }
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            # 攒批：等待 max_delay 收集并发轮次，直到 batch_size
+            deadline = asyncio.get_running_loop().time() + self.max_delay
+            while len(batch) < self.batch_size:
+                timeout = deadline - asyncio.get_running_loop().time()
+                try:
+                    turn = self._queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(self._queue.get(), timeout)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if turn is None:
+                    stopping = True
+                    break
+                batch.append(turn)
+            await self._flush(batch)
+        # stop() 之后仍可能有残留（哨兵之后入队的轮次）
+        while not self._queue.empty():
+            leftover = [turn for turn in (self._queue.get_nowait() for _ in range(self._queue.qsize())) if turn is not None]
+            if leftover:
+                await self._flush(leftover)
+
+    async def _flush(self, batch: List[PendingTurn]):
+        error = None
+        for attempt in range(self.max_retries):
+            try:
+                async with self.db.get_async_session() as db_session:
+                    db_session.add_all([Question(**turn.fields) for turn in batch])
+                    await db_session.commit()
+                error = None
+                break
+            except Exception as e:
+                error = e
+                print(f"❌ Turn batch write failed (attempt {attempt + 1}/{self.max_retries}): {e}")
+                await asyncio.sleep(0.1 * 2 ** attempt)
+        for turn in batch:
+            # 防御：future 已完成（如被取消）时再 set 会抛 InvalidStateError 并终止写入任务
+            if not turn.committed.done():
+                if error is None:
+                    turn.committed.set_result(True)
+                else:
+                    turn.committed.set_exception(error)
+                    # enqueue 模式下无人等待该 future，避免 "exception was never retrieved"
+                    turn.committed.exception()
+            session_turns = self._pending.get(turn.session_id, [])
+            if turn in session_turns:
+                session_turns.remove(turn)
+            if not session_turns:
+                self._pending.pop(turn.session_id, None)
+        if error is None:
+            self.stats["committed"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+        else:
+            self.stats["failed"] += len(batch)
@@ -19,7 +19,7 @@
 #   - Called in the /api/rag and /api/jd_advice endpoints to process user input and generate AI-driven interview content.
 #
 # Dependencies:
-#   - OpenAI API          : Large-language-model Q&A
+#   - llm.llm_backend     : Pluggable LLM backends (OpenAI API / local CPU model)
 #   - Python dataclasses  : Context management
 #   - numpy, re, json     : Feedback analysis and parsing
 #
@@ -33,19 +33,8 @@ from dataclasses import dataclass
 import numpy as np
 from pathlib import Path
 import re
-from openai import OpenAI
 from config import config
-
-client = OpenAI(api_key=config.OPENAI_API_KEY)
-
-def chat_completion(model_name, messages, temperature, max_tokens):
-    response = client.chat.completions.create(
-        model=model_name,
-        messages=messages,
-        temperature=temperature,
-        max_tokens=max_tokens
-    )
-    return response.choices[0].message.content
+from llm.llm_backend import chat_completion
 
 
 @dataclass
@@ -119,7 +108,7 @@ class FeedbackAnalyzer:
 
 class RAGPipeline:
     """Main RAG pipeline for interview processing"""
-    def generate_gpt_advice(self, prompt: str, model: str = "gpt-4o-mini") -> str:
+    def generate_gpt_advice(self, prompt: str, model: Optional[str] = None) -> str:
         model_name = model or config.LLM_MODEL    # 优先用传参，否则用配置中的模型
         messages = [
             {"role": "system", "content": "你是一名专业的AI面试教练，善于根据岗位描述为候选人提供详细的面试准备建议。"},
@@ -221,8 +210,8 @@ class RAGPipeline:
                 f"历史对话：\n{history_text}"
                 f"候选人最新输入：{user_input}"
             )
-        # 调用GPT-4o-mini
-        model_name = "gpt-4o-mini"
+        # 调用LLM（模型由 config.LLM_FEEDBACK_MODEL 选择，可为本地模型）
+        model_name = config.LLM_FEEDBACK_MODEL
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
@@ -0,0 +1,274 @@
+# candidate_ranker.py — Version 1.1.1
+# =============================================================================
+# Interview Helper Backend — Bulk Candidate Ranking (many resumes × one JD)
+#
+# Overview:
+#   - analyze_job_match scores one user against one JD per request; ranking N resumes for a
+#     posting meant N full request chains. The ranker instead:
+#       1. extracts the JD requirements once (through the shared JD analysis cache),
+#       2. profiles every resume in a bounded worker pool — resume parse cache first, then
+#          parse_resume (parse_with_llm=True) or the local ontology extractor over the text
+#          from the document process pool,
+#       3. scores all candidates at once: similarities are computed per distinct skill term
+#          (not per candidate), and each candidate's best match per JD skill is a single
+#          np.maximum.reduceat over the gathered rows.
+#   - Match rules are those of PlannerAnalysisService.analyze_skill_gaps: exact name →
+#     strong; ontology similarity > 0.6 or a jd_skill_mappings hit → partial; else missing.
+#   - fit_score (rank key) = importance-weighted coverage, partial matches count half.
+#   - run() yields a progress event per finished candidate and then the ranking; finished
+#     rankings are kept in memory (config.RANK_RESULTS_KEPT) for page() requests.
+#   - That store is per process: with several uvicorn workers, GET /api/planner/rank/{id}
+#     only finds a ranking on the worker that produced it (404 elsewhere), so deployments
+#     that page through rankings need sticky routing or a single worker.
+#
+# Usage:
+#   async for event in candidate_ranker.run(job_description, uploads): ...
+#   candidate_ranker.page(ranking_id, offset=0, limit=20)
+#
+# Author: BeeBee AI Track-B
+# Version: 1.1.1
+# =============================================================================
+
+import asyncio
+import re
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from config import config
+from models import repositories
+from services.document_extractor import document_extractor
+from services.resume_store import StoredUpload
+
+IMPORTANCE_WEIGHTS = {"high": 3.0, "medium": 2.0, "low": 1.0}
+PARTIAL_THRESHOLD = 0.6  # 与 analyze_skill_gaps 的相似度阈值一致
+PARTIAL_CREDIT = 0.5
+
+_YEARS = re.compile(r"(\d{1,2})\s*\+?\s*(?:years?|yrs?|年)", re.IGNORECASE)
+
+
+def estimate_experience_years(text: str) -> int:
+    """Largest plausible "N years / N年" mention in a resume (0 if none)"""
+    years = [int(match) for match in _YEARS.findall(text or "")]
+    years = [value for value in years if value <= 50]
+    return max(years) if years else 0
+
+
+def _reduce_max(table: np.ndarray, rows_per_candidate: Sequence[Sequence[int]]) -> np.ndarray:
+    """Per candidate, element-wise max of its rows of table (candidates without rows → 0)"""
+    table = np.vstack([table, np.zeros((1, table.shape[1]), dtype=table.dtype)])
+    sentinel = table.shape[0] - 1
+    flat: List[int] = []
+    offsets: List[int] = []
+    for rows in rows_per_candidate:
+        offsets.append(len(flat))
+        flat.extend(rows or [sentinel])
+    return np.maximum.reduceat(table[flat], offsets, axis=0)
+
+
+def match_matrix(ontology, jd_skills: List[Dict[str, Any]], candidate_skills: List[List[str]]) -> Dict[str, np.ndarray]:
+    """strong / partial boolean matrices (candidates × JD skills) for all candidates at once"""
+    jd_names = [skill["skill"] for skill in jd_skills]
+    jd_lower = [name.lower() for name in jd_names]
+    shape = (len(candidate_skills), len(jd_names))
+    if not candidate_skills or not jd_names:
+        return {"strong": np.zeros(shape, dtype=bool), "partial": np.zeros(shape, dtype=bool)}
+
+    # 原始技能名与标准化技能（小写 + 本体隐含技能）两套词表，各自只计算一次
+    raw_vocab: Dict[str, int] = {}
+    norm_vocab: Dict[str, int] = {}
+    raw_rows: List[List[int]] = []
+    norm_rows: List[List[int]] = []
+    for skills in candidate_skills:
+        raw_rows.append(sorted({raw_vocab.setdefault(skill, len(raw_vocab)) for skill in skills}))
+        terms = set()
+        for skill in skills:
+            terms.add(skill.lower())
+            terms.update(ontology.expand_user_skill(skill))
+        norm_rows.append(sorted(norm_vocab.setdefault(term, len(norm_vocab)) for term in terms))
+
+    raw_terms = list(raw_vocab)
+    norm_terms = list(norm_vocab)
+    exact = np.array([[term == name for name in jd_names] for term in raw_terms], dtype=np.float32).reshape(-1, len(jd_names))
+    raw_similarity = np.array(
+        [[ontology.similarity(name, term) for name in jd_names] for term in raw_terms], dtype=np.float32
+    ).reshape(-1, len(jd_names))
+    norm_similarity = np.array(
+        [[ontology.similarity(lower, term) for lower in jd_lower] for term in norm_terms], dtype=np.float32
+    ).reshape(-1, len(jd_names))
+    mapped = np.array(
+        [[term in ontology.jd_skill_mappings.get(name, ()) for name in jd_names] for term in norm_terms], dtype=np.float32
+    ).reshape(-1, len(jd_names))
+
+    strong = _reduce_max(exact, raw_rows) > 0
+    similarity = np.maximum(_reduce_max(raw_similarity, raw_rows), _reduce_max(norm_similarity, norm_rows))
+    partial = ~strong & ((similarity > PARTIAL_THRESHOLD) | (_reduce_max(mapped, norm_rows) > 0))
+    return {"strong": strong, "partial": partial}
+
+
+class CandidateRanker:
+    def __init__(self, planner, db, workers: int = 8, results_kept: int = 32):
+        self.planner = planner
+        self.db = db
+        self.workers = max(1, workers)
+        self.results_kept = results_kept
+        self._rankings: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.stats = {"rankings": 0, "candidates": 0, "errors": 0, "cache": 0, "llm": 0, "local": 0}
+
+    # ----- candidate profiles -----
+
+    async def _profile(self, filename: str, stored: StoredUpload, parse_with_llm: bool) -> Dict[str, Any]:
+        parser_version = self.planner.resume_parser_version
+        async with self.db.get_async_session() as db_session:
+            parsed = await repositories.get_resume_parse(db_session, stored.content_hash, parser_version)
+        if parsed is not None:
+            source = "cache"
+        elif parse_with_llm:
+            parsed = await self.planner.parse_resume(str(stored.path))
+            async with self.db.get_async_session() as db_session:
+                await repositories.save_resume_parse(db_session, stored.content_hash, parser_version, parsed, stored.size)
+                await db_session.commit()
+            source = "llm"
+        else:
+            # 不调用LLM：进程池提取文本 + 技能本体自动机；技能保留简历原文写法（同义词组不展开），
+            # 否则 "SQL" 会按精确匹配拿到 MySQL / PostgreSQL 的满分
+            text = await document_extractor.extract_text(stored.path)
+            parsed = {
+                "skills": self.planner.skill_extractor.skill_names(text),
+                "experience_years": estimate_experience_years(text)
+            }
+            source = "local"
+        return {
+            "filename": filename,
+            "content_hash": stored.content_hash,
+            "skills": list(parsed.get("skills") or []),
+            "experience_years": parsed.get("experience_years") or 0,
+            "source": source
+        }
+
+    # ----- ranking -----
+
+    def _score(self, jd_analysis: Dict[str, Any], profiles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        jd_skills = jd_analysis.get("required_skills", [])
+        names = [skill["skill"] for skill in jd_skills]
+        matrices = match_matrix(self.planner.ontology, jd_skills, [profile["skills"] for profile in profiles])
+        strong, partial = matrices["strong"], matrices["partial"]
+        weights = np.array([IMPORTANCE_WEIGHTS.get(skill.get("importance"), 2.0) for skill in jd_skills], dtype=np.float32)
+
+        skill_match = strong.sum(axis=1) / len(names) * 100 if names else np.zeros(len(profiles))
+        coverage = strong + PARTIAL_CREDIT * partial
+        fit_score = coverage @ weights / weights.sum() * 100 if names else np.zeros(len(profiles))
+
+        requirements = jd_analysis.get("experience_requirements", [])
+        candidates = []
+        for i, profile in enumerate(profiles):
+            experience_match = self.planner._calculate_experience_match(requirements, profile["experience_years"])
+            candidates.append({
+                **profile,
+                "fit_score": round(float(fit_score[i]), 1),
+                "skill_match": round(float(skill_match[i]), 1),
+                "experience_match": round(experience_match, 1),
+                "overall_match": round((float(skill_match[i]) + experience_match) / 2, 1),
+                "strengths": [names[j] for j in np.flatnonzero(strong[i])],
+                "partial": [names[j] for j in np.flatnonzero(partial[i])],
+                "missing": [names[j] for j in np.flatnonzero(~strong[i] & ~partial[i])]
+            })
+        candidates.sort(key=lambda c: (c["fit_score"], c["overall_match"]), reverse=True)
+        return candidates
+
+    async def run(
+        self,
+        job_description: str,
+        uploads: List[Tuple[str, Optional[StoredUpload], Optional[str]]],
+        parse_with_llm: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Rank uploads of (filename, stored upload or None, store error)
+
+        Yields {"event": "progress", ...} as each candidate finishes, then
+        {"event": "ranked", "ranking_id": ...}.
+        """
+        started = time.perf_counter()
+        jd_analysis = await self.planner.extract_skills_from_jd_async(job_description)
+        jd_ms = (time.perf_counter() - started) * 1000
+
+        semaphore = asyncio.Semaphore(self.workers)
+
+        async def profile(filename, stored, error):
+            if stored is None:
+                return {"filename": filename, "error": error}
+            async with semaphore:
+                try:
+                    return await self._profile(filename, stored, parse_with_llm)
+                except Exception as e:
+                    print(f"⚠️ 候选人简历处理失败 {filename}: {e}")
+                    return {"filename": filename, "content_hash": stored.content_hash, "error": str(e)}
+
+        profiles, failed = [], []
+        tasks = [asyncio.ensure_future(profile(*upload)) for upload in uploads]
+        try:
+            for done, task in enumerate(asyncio.as_completed(tasks), start=1):
+                result = await task
+                (failed if "error" in result else profiles).append(result)
+                yield {
+                    "event": "progress",
+                    "done": done,
+                    "total": len(tasks),
+                    "filename": result["filename"],
+                    "status": "error" if "error" in result else "ok"
+                }
+        finally:
+            for task in tasks:
+                task.cancel()
+        profiles_ms = (time.perf_counter() - started) * 1000 - jd_ms
+
+        scoring_started = time.perf_counter()
+        candidates = self._score(jd_analysis, profiles)
+        for rank, candidate in enumerate(candidates, start=1):
+            candidate["rank"] = rank
+        scoring_ms = (time.perf_counter() - scoring_started) * 1000
+
+        ranking_id = str(uuid.uuid4())
+        self._rankings[ranking_id] = {
+            "ranking_id": ranking_id,
+            "created_at": datetime.utcnow().isoformat(),
+            "jd_requirements": jd_analysis,
+            "total": len(candidates),
+            "candidates": candidates,
+            "failed": failed,
+            "timings": {
+                "jd_ms": round(jd_ms, 2),
+                "profiles_ms": round(profiles_ms, 2),
+                "scoring_ms": round(scoring_ms, 2),
+                "total_ms": round((time.perf_counter() - started) * 1000, 2)
+            }
+        }
+        while len(self._rankings) > self.results_kept:
+            self._rankings.popitem(last=False)
+
+        self.stats["rankings"] += 1
+        self.stats["candidates"] += len(candidates)
+        self.stats["errors"] += len(failed)
+        for candidate in candidates:
+            self.stats[candidate["source"]] += 1
+        print(f"🏁 候选人排序完成: {len(candidates)} 人, 失败 {len(failed)} 份 "
+              f"({self._rankings[ranking_id]['timings']['total_ms']}ms)")
+        yield {"event": "ranked", "ranking_id": ranking_id}
+
+    def page(self, ranking_id: str, offset: int = 0, limit: int = 20) -> Optional[Dict[str, Any]]:
+        """One page of a finished ranking (None if unknown or evicted)"""
+        ranking = self._rankings.get(ranking_id)
+        if ranking is None:
+            return None
+        next_offset = offset + limit if offset + limit < ranking["total"] else None
+        return {
+            **{key: value for key, value in ranking.items() if key != "candidates"},
+            "offset": offset,
+            "limit": limit,
+            "next_offset": next_offset,
+            "candidates": ranking["candidates"][offset:offset + limit]
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "kept": len(self._rankings), "workers": self.workers}
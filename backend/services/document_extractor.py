@@ -0,0 +1,209 @@
+# document_extractor.py — Version 1.1.1
+# =============================================================================
+# Interview Helper Backend — Document Text Extraction (process pool)
+#
+# Overview:
+#   - One extraction path for PDF / DOCX / plain-text uploads, replacing the three copies
+#     in PlannerAnalysisService, RealAIService and /api/upload-job-desc.
+#   - Parsing runs in a spawn-context process pool, so a large PDF no longer holds the
+#     event loop (or the GIL) while other requests wait.
+#   - PDFs are split into page batches that run on the pool in parallel; iter_pages()
+#     yields pages in order as soon as their batch is done.
+#   - Limits per document: config.DOC_EXTRACT_MAX_PAGES pages (the rest are skipped and
+#     reported as truncated) and config.DOC_EXTRACT_TIMEOUT seconds overall. A batch that
+#     is already running when the deadline passes finishes in its worker; batches not yet
+#     started are cancelled.
+#   - Workers are spawned rather than forked from the (multi-threaded) server process and
+#     live for the life of the app. Spawned workers import the launching script's main
+#     module once, so standalone scripts need the usual `if __name__ == "__main__"` guard
+#     (or DOC_EXTRACT_WORKERS=0 to parse in a thread instead).
+#
+# Usage:
+#   async for page in document_extractor.iter_pages(path): ...
+#   document = await document_extractor.extract(path)   # .text, .page_count, .truncated
+#   text = await document_extractor.extract_text(path)
+#
+# Author: BeeBee AI Track-B
+# Version: 1.1.1
+# =============================================================================
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from config import config
+
+PDF_SUFFIXES = {".pdf"}
+DOCX_SUFFIXES = {".docx", ".doc"}
+TEXT_ENCODINGS = ("utf-8", "gbk", "gb2312", "latin-1")
+
+
+class DocumentExtractionError(Exception):
+    """Unsupported, unreadable or timed-out document"""
+
+
+# ----- 子进程中执行的函数（模块级，可被 pickle） -----
+
+def _pdf_page_count(path: str) -> int:
+    import PyPDF2
+    return len(PyPDF2.PdfReader(path).pages)
+
+
+def _pdf_pages(path: str, start: int, stop: int) -> List[str]:
+    import PyPDF2
+    reader = PyPDF2.PdfReader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _docx_pages(path: str) -> List[str]:
+    import docx
+    return ["\n".join(paragraph.text for paragraph in docx.Document(path).paragraphs)]
+
+
+def _text_pages(path: str) -> List[str]:
+    data = Path(path).read_bytes()
+    for encoding in TEXT_ENCODINGS:
+        try:
+            return [data.decode(encoding)]
+        except UnicodeDecodeError:
+            continue
+    raise DocumentExtractionError("所有编码都失败")
+
+
+class ExtractedDocument:
+    def __init__(self, pages: List[str], total_pages: int, elapsed_ms: float):
+        self.pages = pages
+        self.total_pages = total_pages
+        self.elapsed_ms = elapsed_ms
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.pages)
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    @property
+    def truncated(self) -> bool:
+        return self.total_pages > len(self.pages)
+
+
+class DocumentExtractor:
+    def __init__(
+        self,
+        max_workers: int = 2,
+        timeout: float = 30.0,
+        max_pages: int = 50,
+        page_batch: int = 5
+    ):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.page_batch = max(1, page_batch)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.stats = {"documents": 0, "pages": 0, "truncated": 0, "timeouts": 0, "errors": 0, "total_ms": 0.0}
+
+    def _executor(self) -> Optional[ProcessPoolExecutor]:
+        # max_workers=0 时在线程中执行（不启动子进程）
+        if self._pool is None and self.max_workers > 0:
+            self._pool = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _submit(self, fn: Callable, *args) -> asyncio.Future:
+        return asyncio.get_running_loop().run_in_executor(self._executor(), fn, *args)
+
+    async def _await(self, future: asyncio.Future, deadline: float):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise asyncio.TimeoutError()
+        return await asyncio.wait_for(future, remaining)
+
+    async def iter_pages(
+        self,
+        path,
+        max_pages: Optional[int] = None,
+        timeout: Optional[float] = None,
+        meta: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """Yield page texts in order as they are extracted (DOCX / text files: one page)
+
+        meta, if given, receives "total_pages" (before the page limit) once it is known.
+        """
+        meta = meta if meta is not None else {}
+        path = str(path)
+        suffix = Path(path).suffix.lower()
+        max_pages = max_pages or self.max_pages
+        deadline = time.monotonic() + (timeout or self.timeout)
+        futures: List[asyncio.Future] = []
+        try:
+            if suffix in PDF_SUFFIXES:
+                total = await self._await(self._submit(_pdf_page_count, path), deadline)
+                meta["total_pages"] = total
+                stop = min(total, max_pages)
+                futures = [
+                    self._submit(_pdf_pages, path, start, min(start + self.page_batch, stop))
+                    for start in range(0, stop, self.page_batch)
+                ]
+            elif suffix in DOCX_SUFFIXES:
+                meta["total_pages"] = 1
+                futures = [self._submit(_docx_pages, path)]
+            else:
+                # 其余按文本文件处理（与原逻辑一致：依次尝试多种编码）
+                meta["total_pages"] = 1
+                futures = [self._submit(_text_pages, path)]
+            for future in futures:
+                for page in await self._await(future, deadline):
+                    yield page
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise DocumentExtractionError(f"文档解析超时 ({timeout or self.timeout}s): {path}")
+        except DocumentExtractionError:
+            self.stats["errors"] += 1
+            raise
+        except Exception as e:
+            self.stats["errors"] += 1
+            raise DocumentExtractionError(f"文档解析失败: {e}") from e
+        finally:
+            for future in futures:
+                future.cancel()
+
+    async def extract(self, path, max_pages: Optional[int] = None, timeout: Optional[float] = None) -> ExtractedDocument:
+        started = time.perf_counter()
+        meta: Dict[str, Any] = {}
+        pages = [page async for page in self.iter_pages(path, max_pages, timeout, meta)]
+        document = ExtractedDocument(pages, meta.get("total_pages", len(pages)), round((time.perf_counter() - started) * 1000, 2))
+        self.stats["documents"] += 1
+        self.stats["pages"] += document.page_count
+        self.stats["total_ms"] += document.elapsed_ms
+        if document.truncated:
+            self.stats["truncated"] += 1
+            print(f"⚠️ 文档共 {document.total_pages} 页，仅提取前 {document.page_count} 页: {path}")
+        return document
+
+    async def extract_text(self, path, max_pages: Optional[int] = None, timeout: Optional[float] = None) -> str:
+        return (await self.extract(path, max_pages, timeout)).text
+
+    def get_stats(self) -> Dict[str, Any]:
+        documents = self.stats["documents"]
+        return {
+            **{key: value for key, value in self.stats.items() if key != "total_ms"},
+            "avg_ms": round(self.stats["total_ms"] / documents, 2) if documents else 0.0,
+            "workers": self.max_workers,
+            "pool_started": self._pool is not None
+        }
+
+
+document_extractor = DocumentExtractor(
+    max_workers=config.DOC_EXTRACT_WORKERS,
+    timeout=config.DOC_EXTRACT_TIMEOUT,
+    max_pages=config.DOC_EXTRACT_MAX_PAGES,
+    page_batch=config.DOC_EXTRACT_PAGE_BATCH
+)
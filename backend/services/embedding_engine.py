@@ -0,0 +1,143 @@
+# embedding_engine.py — Version 1.1.1
+# =============================================================================
+# Interview Helper Backend — Batched, Cached Skill Embeddings
+#
+# Overview:
+#   - EnhancedPlannerAnalysisService used to call model.encode([a, b]) once per
+#     JD-skill × user-skill pair. The engine instead encodes all unique texts that are
+#     not cached yet in one batched encode() call.
+#   - Vectors are L2-normalized and persisted as float16 rows in a memory-mapped file
+#     (one directory per model), so skill names seen by any earlier analysis — in this or
+#     another process — are never re-encoded. Cosine similarity is a plain dot product.
+#   - best_matches() scores a whole query set against a candidate set with one matrix
+#     product and a row-wise argmax.
+#   - Without an explicit model the shared instance from services.model_registry is used,
+#     fetched only when some text is not cached yet — analyses over known skills never
+#     load the model at all.
+#
+# On-disk layout (config.EMBEDDING_CACHE_DIR/<model>/):
+#   meta.json     model name and vector dimension
+#   vectors.f16   float16 rows, dim columns, append-only
+#   keys.jsonl    one ["text", row] line per cached text
+#   .lock         flock-ed while appending; other processes' rows are picked up then
+#
+# Usage:
+#   engine = EmbeddingEngine("all-MiniLM-L6-v2")              # model from the registry, on demand
+#   vectors = engine.encode(["Python", "Django"])             # (n, dim) float32, unit rows
+#   best, scores = engine.best_matches(jd_skills, user_skills)
+#
+# Author: BeeBee AI Track-B
+# Version: 1.1.1
+# =============================================================================
+
+import fcntl
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from config import config
+from services.model_registry import embedding_models
+
+
+class EmbeddingEngine:
+    def __init__(self, model_name: str, model=None, cache_dir: Optional[Path] = None, batch_size: Optional[int] = None):
+        self._model = model
+        self.model_name = model_name
+        self.batch_size = batch_size or config.EMBEDDING_BATCH_SIZE
+        self.cache_dir = Path(cache_dir or config.EMBEDDING_CACHE_DIR) / re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+        self._keys_path = self.cache_dir / "keys.jsonl"
+        self._vectors_path = self.cache_dir / "vectors.f16"
+        self._meta_path = self.cache_dir / "meta.json"
+        self._lock = threading.Lock()
+        self._index: Dict[str, int] = {}
+        self._vectors: Optional[np.ndarray] = None  # memmap, float16 (rows, dim)
+        self._keys_offset = 0
+        self.dim: Optional[int] = None
+        self.stats = {"hits": 0, "encoded": 0, "encode_calls": 0}
+        self._load()
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = embedding_models.get(self.model_name)
+        return self._model
+
+    # ----- persistent cache -----
+
+    def _load(self):
+        """Pick up rows appended since the last load (by this or another process)"""
+        if self.dim is None and self._meta_path.exists():
+            self.dim = json.loads(self._meta_path.read_text())["dim"]
+        if not self._keys_path.exists() or self.dim is None:
+            return
+        with open(self._keys_path, "rb") as f:
+            f.seek(self._keys_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # 另一个进程正在写入的半行
+                text, row = json.loads(line)
+                self._index.setdefault(text, row)
+                self._keys_offset += len(line)
+        rows = self._vectors_path.stat().st_size // (2 * self.dim) if self._vectors_path.exists() else 0
+        if rows and (self._vectors is None or self._vectors.shape[0] != rows):
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float16, mode="r", shape=(rows, self.dim))
+
+    def _append(self, texts: List[str], vectors: np.ndarray):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_dir / ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if not self._meta_path.exists():
+                self._meta_path.write_text(json.dumps({"model": self.model_name, "dim": int(vectors.shape[1])}))
+            self._load()
+            new = [(text, vector) for text, vector in zip(texts, vectors) if text not in self._index]
+            if new:
+                # 键行记录自己的行号：向量写入后、键写入前崩溃只会留下无人引用的行
+                first_row = self._vectors_path.stat().st_size // (2 * self.dim) if self._vectors_path.exists() else 0
+                with open(self._vectors_path, "ab") as f:
+                    np.asarray([vector for _, vector in new], dtype=np.float16).tofile(f)
+                with open(self._keys_path, "ab") as f:
+                    f.write("".join(
+                        json.dumps([text, first_row + i], ensure_ascii=False) + "\n" for i, (text, _) in enumerate(new)
+                    ).encode("utf-8"))
+                self._load()
+
+    # ----- encoding -----
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Unit-normalized float32 vectors for texts; uncached texts are encoded in one batch"""
+        texts = list(texts)
+        with self._lock:
+            missing = list(dict.fromkeys(text for text in texts if text not in self._index))
+            if missing:
+                self._load()
+                missing = [text for text in missing if text not in self._index]
+            if missing:
+                encoded = np.asarray(self.model.encode(missing, batch_size=self.batch_size), dtype=np.float32)
+                norms = np.linalg.norm(encoded, axis=1, keepdims=True)
+                encoded = encoded / np.where(norms == 0, 1.0, norms)
+                self._append(missing, encoded)
+                self.stats["encode_calls"] += 1
+                self.stats["encoded"] += len(missing)
+            self.stats["hits"] += len(texts) - len(missing)
+            if not texts:
+                return np.zeros((0, self.dim or 0), dtype=np.float32)
+            rows = [self._index[text] for text in texts]
+            return np.asarray(self._vectors[rows], dtype=np.float32)
+
+    def similarity(self, text1: str, text2: str) -> float:
+        vectors = self.encode([text1, text2])
+        return float(vectors[0] @ vectors[1])
+
+    def best_matches(self, queries: Sequence[str], candidates: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """For each query: index of the most similar candidate and its cosine similarity"""
+        if not queries or not candidates:
+            return np.zeros(len(queries), dtype=np.int64), np.zeros(len(queries), dtype=np.float32)
+        vectors = self.encode(list(queries) + list(candidates))
+        scores = vectors[:len(queries)] @ vectors[len(queries):].T
+        best = scores.argmax(axis=1)
+        return best, scores[np.arange(len(queries)), best]
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "cached": len(self._index), "dim": self.dim or 0}
@@ -1,30 +1,30 @@
-import openai
 from typing import Dict, List, Any, Optional
 import json
 import re
-from sentence_transformers import SentenceTransformer
 import numpy as np
 from datetime import datetime
+from config import config
+from llm.llm_backend import chat_completion
+from services.skill_ontology import get_skill_ontology
+from services.skill_extractor import get_skill_extractor
+from services.embedding_engine import EmbeddingEngine
+from models.jd_analysis_cache import jd_analysis_cache, JD_SKILLS_KIND
 
 class EnhancedPlannerAnalysisService:
     def __init__(self, openai_api_key: str):
-        self.client = openai.OpenAI(api_key=openai_api_key)
-        # 初始化语义嵌入模型
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        
-        # 预定义的技能分类
-        self.skill_categories = {
-            "programming": ["Python", "Java", "JavaScript", "C++", "Go", "Rust", "TypeScript"],
-            "frontend": ["React", "Vue", "Angular", "HTML", "CSS", "JavaScript", "TypeScript"],
-            "backend": ["Node.js", "Django", "Flask", "Spring", "Express", "FastAPI"],
-            "database": ["MySQL", "PostgreSQL", "MongoDB", "Redis", "Elasticsearch"],
-            "cloud": ["AWS", "Azure", "GCP", "Docker", "Kubernetes", "Terraform"],
-            "mobile": ["React Native", "Flutter", "iOS", "Android", "Swift", "Kotlin"],
-            "ai_ml": ["TensorFlow", "PyTorch", "Scikit-learn", "Pandas", "NumPy"],
-            "devops": ["Jenkins", "GitLab CI", "GitHub Actions", "Ansible", "Docker"],
-            "soft_skills": ["项目管理", "团队协作", "沟通能力", "领导力", "问题解决"]
-        }
+        self.openai_api_key = openai_api_key
+        # 语义嵌入模型由进程级注册表按需加载并共享；技能向量批量编码并缓存到磁盘
+        self.embeddings = EmbeddingEngine(config.EMBEDDING_MODEL)
+        
+        # 技能分类与 PlannerAnalysisService 共用 data/skill_ontology.json
+        self.ontology = get_skill_ontology()
+        self.skill_categories = self.ontology.categories
+        self.skill_extractor = get_skill_extractor()
     
+    @property
+    def embedding_model(self):
+        return self.embeddings.model
+
     def extract_skills_from_jd(self, job_description: str) -> List[Dict[str, Any]]:
         """从JD中提取技能要求"""
         prompt = f"""
@@ -50,30 +50,34 @@ class EnhancedPlannerAnalysisService:
         }}
         """
         
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2
-            )
-            
-            result = json.loads(response.choices[0].message.content)
-            return result
-        except Exception as e:
-            print(f"提取技能失败: {e}")
-            return self._fallback_skill_extraction(job_description)
+        def compute():
+            try:
+                response = chat_completion(
+                    config.LLM_EXTRACTION_MODEL,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.2
+                )
+                result = json.loads(response)
+                # 与 PlannerAnalysisService._parse_jd_skills 相同：没有必需技能视为失败，不写入共享缓存
+                if not isinstance(result, dict) or not isinstance(result.get("required_skills"), list) or not result["required_skills"]:
+                    print("提取技能失败: 响应中没有 required_skills")
+                    return None
+                return result
+            except Exception as e:
+                print(f"提取技能失败: {e}")
+                return None
+        
+        # 与 PlannerAnalysisService 共用同一JD分析缓存
+        result = jd_analysis_cache.get_or_compute(JD_SKILLS_KIND, config.LLM_EXTRACTION_MODEL, job_description, compute)
+        return result if result is not None else self._fallback_skill_extraction(job_description)
     
     def _fallback_skill_extraction(self, job_description: str) -> Dict[str, Any]:
         """备用技能提取方法"""
-        skills = []
-        for category, skill_list in self.skill_categories.items():
-            for skill in skill_list:
-                if skill.lower() in job_description.lower():
-                    skills.append({
-                        "skill": skill,
-                        "importance": "medium",
-                        "category": category
-                    })
+        # 单次扫描（Aho–Corasick），按词边界匹配技能名及同义别名
+        skills = [
+            {"skill": hit["skill"], "importance": "medium", "category": hit["category"]}
+            for hit in self.skill_extractor.category_skills(job_description)
+        ]
         
         return {
             "required_skills": skills[:5],
@@ -86,11 +90,7 @@ class EnhancedPlannerAnalysisService:
     def calculate_semantic_similarity(self, text1: str, text2: str) -> float:
         """计算语义相似度"""
         try:
-            embeddings = self.embedding_model.encode([text1, text2])
-            similarity = np.dot(embeddings[0], embeddings[1]) / (
-                np.linalg.norm(embeddings[0]) * np.linalg.norm(embeddings[1])
-            )
-            return float(similarity)
+            return self.embeddings.similarity(text1, text2)
         except Exception as e:
             print(f"计算相似度失败: {e}")
             return 0.5
@@ -105,6 +105,18 @@ class EnhancedPlannerAnalysisService:
         strengths = []
         missing_skills = []
         
+        # 未直接命中的JD技能与全部用户技能一次性批量编码，矩阵乘 + 按行 argmax 取最相似技能
+        unmatched = [jd_skill["skill"] for jd_skill in jd_skills if jd_skill["skill"] not in user_skills]
+        best_match = {}
+        try:
+            best, scores = self.embeddings.best_matches(unmatched, user_skills)
+            best_match = {
+                skill: (user_skills[index], float(score))
+                for skill, index, score in zip(unmatched, best, scores) if score > 0
+            }
+        except Exception as e:
+            print(f"计算相似度失败: {e}")
+        
         # 分析每个JD技能
         for jd_skill in jd_skills:
             skill_name = jd_skill["skill"]
@@ -119,15 +131,8 @@ class EnhancedPlannerAnalysisService:
                     "status": "strong"
                 })
             else:
-                # 计算语义相似度，看是否有相似技能
-                max_similarity = 0
-                similar_skill = None
-                
-                for user_skill in user_skills:
-                    similarity = self.calculate_semantic_similarity(skill_name, user_skill)
-                    if similarity > max_similarity:
-                        max_similarity = similarity
-                        similar_skill = user_skill
+                # 语义相似度，看是否有相似技能
+                similar_skill, max_similarity = best_match.get(skill_name, (None, 0))
                 
                 if max_similarity > 0.7:  # 相似度阈值
                     gaps.append({
@@ -263,13 +268,13 @@ class EnhancedPlannerAnalysisService:
         """
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
+            response = chat_completion(
+                config.LLM_ANALYSIS_MODEL,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3
             )
             
-            result = json.loads(response.choices[0].message.content)
+            result = json.loads(response)
             return result
         except Exception as e:
             print(f"生成详细分析失败: {e}")
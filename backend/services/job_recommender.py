@@ -0,0 +1,168 @@
+# job_recommender.py — Version 1.1.1
+# =============================================================================
+# Interview Helper Backend — Job Recommendation Index
+#
+# Overview:
+#   - Answers "which of our jobs fit this profile best?" for GET /api/jobs/recommend.
+#   - Every Job row becomes a sparse row over canonical skill terms (ontology synonym ID,
+#     else the lowercased name), built from Job.skills plus the cached JD skill analysis of
+#     the job's description when one exists (required skills weighted by importance,
+#     preferred skills lower). Rows are normalized to sum to 1.
+#   - The matrix is kept in COO form (row, col, weight) — scoring a profile against every
+#     job is one sparse matrix-vector product: np.bincount(rows, weights * q[cols]).
+#   - The user vector q is 1.0 for the user's own skills and PARTIAL_CREDIT for skills the
+#     ontology treats as similar or implied, so a job's score is the weighted share of its
+#     skills the user covers.
+#   - The index is rebuilt when the job catalog version changes (Job insert/update/delete)
+#     or new JD analyses have been cached since the last build.
+#
+# Usage:
+#   results = await job_recommendation_index.recommend(db_session, plan.skills, limit=10)
+#
+# Author: BeeBee AI Track-B
+# Version: 1.1.1
+# =============================================================================
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import config
+from models.job_catalog import job_catalog
+from models.jd_analysis_cache import jd_analysis_cache, JD_SKILLS_KIND
+from services.skill_ontology import get_skill_ontology
+
+JOB_SKILL_WEIGHT = 1.0  # Job.skills 列表中的技能
+IMPORTANCE_WEIGHTS = {"high": 1.0, "medium": 0.7, "low": 0.4}
+PREFERRED_WEIGHT = 0.3
+PARTIAL_CREDIT = 0.5
+
+
+class JobRecommendationIndex:
+    def __init__(self, ontology=None):
+        self.ontology = ontology or get_skill_ontology()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._lock = asyncio.Lock()
+        self._jobs: List[Dict[str, Any]] = []
+        self._vocab: Dict[str, int] = {}
+        self._job_terms: List[List[Tuple[int, str]]] = []  # per job: (col, display name)
+        self._rows = np.zeros(0, dtype=np.int64)
+        self._cols = np.zeros(0, dtype=np.int64)
+        self._weights = np.zeros(0, dtype=np.float32)
+        self.stats = {"builds": 0, "queries": 0, "last_build_ms": 0.0}
+
+    def term(self, skill: str) -> str:
+        return self.ontology.canonical_id(skill) or skill.strip().lower()
+
+    async def _ensure_built(self, db_session: AsyncSession):
+        jobs, _ = await job_catalog.list_jobs(db_session)
+        # 职位变更（catalog version）或有新的 JD 分析入缓存时重建
+        signature = (job_catalog.version, jd_analysis_cache.stats["stored"])
+        if signature == self._signature:
+            return
+        async with self._lock:
+            if signature == self._signature:
+                return
+            await self._build(jobs)
+            self._signature = signature
+
+    async def _build(self, jobs: List[Dict[str, Any]]):
+        started = time.perf_counter()
+        vocab: Dict[str, int] = {}
+        job_terms: List[List[Tuple[int, str]]] = []
+        rows, cols, weights = [], [], []
+        for row, job in enumerate(jobs):
+            terms: Dict[str, Tuple[float, str]] = {}
+
+            def add(skill, weight):
+                if not isinstance(skill, str) or not skill.strip():
+                    return
+                key = self.term(skill)
+                if key not in terms or terms[key][0] < weight:
+                    terms[key] = (weight, skill)
+
+            for skill in job["skills"] if isinstance(job["skills"], list) else []:
+                add(skill, JOB_SKILL_WEIGHT)
+            if job["description"]:
+                analysis = await jd_analysis_cache.alookup(JD_SKILLS_KIND, config.LLM_EXTRACTION_MODEL, job["description"])
+                if analysis:
+                    for skill in analysis.get("required_skills", []):
+                        add(skill.get("skill"), IMPORTANCE_WEIGHTS.get(skill.get("importance"), 0.7))
+                    for skill in analysis.get("preferred_skills", []):
+                        add(skill.get("skill"), PREFERRED_WEIGHT)
+
+            total = sum(weight for weight, _ in terms.values())
+            entries = []
+            for key, (weight, display) in terms.items():
+                col = vocab.setdefault(key, len(vocab))
+                rows.append(row)
+                cols.append(col)
+                weights.append(weight / total)
+                entries.append((col, display))
+            job_terms.append(entries)
+
+        self._jobs = jobs
+        self._vocab = vocab
+        self._job_terms = job_terms
+        self._rows = np.asarray(rows, dtype=np.int64)
+        self._cols = np.asarray(cols, dtype=np.int64)
+        self._weights = np.asarray(weights, dtype=np.float32)
+        self.stats["builds"] += 1
+        self.stats["last_build_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        print(f"🗂️ 职位推荐索引已重建: {len(jobs)} 个职位, {len(vocab)} 个技能词 ({self.stats['last_build_ms']}ms)")
+
+    def _user_vector(self, skills: List[str]) -> np.ndarray:
+        query = np.zeros(len(self._vocab), dtype=np.float32)
+
+        def credit(skill, value):
+            col = self._vocab.get(self.term(skill))
+            if col is not None:
+                query[col] = max(query[col], value)
+
+        for skill in skills:
+            credit(skill, 1.0)
+            for related in self.ontology.similar_skills.get(skill, []) + self.ontology.expand_user_skill(skill):
+                credit(related, PARTIAL_CREDIT)
+        return query
+
+    async def recommend(
+        self,
+        db_session: AsyncSession,
+        skills: List[str],
+        limit: int = 10,
+        category: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Top jobs for a skill list, best first"""
+        await self._ensure_built(db_session)
+        self.stats["queries"] += 1
+        if not self._jobs:
+            return []
+        query = self._user_vector(skills or [])
+        scores = np.bincount(self._rows, weights=self._weights * query[self._cols], minlength=len(self._jobs))
+        candidates = np.arange(len(self._jobs))
+        if category:
+            candidates = candidates[[job["category"] == category for job in self._jobs]]
+        order = candidates[np.argsort(-scores[candidates], kind="stable")][:limit]
+
+        results = []
+        for row in order:
+            job = self._jobs[row]
+            terms = self._job_terms[row]
+            results.append({
+                "job_id": job["id"],
+                "title": job["title"],
+                "category": job["category"],
+                "experience_level": job["experience_level"],
+                "score": round(float(scores[row]) * 100, 1),
+                "matched_skills": [name for col, name in terms if query[col] >= 1.0],
+                "related_skills": [name for col, name in terms if 0 < query[col] < 1.0],
+                "missing_skills": [name for col, name in terms if query[col] == 0]
+            })
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "jobs": len(self._jobs), "terms": len(self._vocab), "nonzeros": int(self._rows.size)}
+
+
+job_recommendation_index = JobRecommendationIndex()
@@ -0,0 +1,103 @@
+# model_registry.py — Version 1.1.1
+# =============================================================================
+# Interview Helper Backend — Process-Wide Embedding Model Registry
+#
+# Overview:
+#   - Every EnhancedPlannerAnalysisService used to load its own SentenceTransformer in the
+#     constructor. Models now live in one registry per process: loaded on first use (or
+#     warmed up in a background thread after startup) and shared by every caller.
+#   - torch intra-op threads are pinned to config.EMBEDDING_TORCH_THREADS before the first
+#     load, so encode() does not oversubscribe the CPU next to uvicorn workers.
+#   - Load time and resident memory (RSS before / after) are recorded per model and shown
+#     in /api/health.
+#   - Separate worker processes each hold one copy; within a process there is only one.
+#
+# Usage:
+#   model = embedding_models.get()                 # config.EMBEDDING_MODEL, loads on first call
+#   embedding_models.warm_up()                     # background load + one encode
+#
+# Author: BeeBee AI Track-B
+# Version: 1.1.1
+# =============================================================================
+
+import resource
+import threading
+import time
+from typing import Any, Dict, Optional
+from config import config
+
+
+def _rss_mb() -> float:
+    """Current resident set size in MB (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * resource.getpagesize() / (1024 * 1024), 1)
+    except (OSError, ValueError, IndexError):
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+class EmbeddingModelRegistry:
+    def __init__(self):
+        self._models: Dict[str, Any] = {}
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._threads_pinned = False
+        self.stats: Dict[str, Dict[str, Any]] = {}
+
+    def _pin_threads(self):
+        if self._threads_pinned or config.EMBEDDING_TORCH_THREADS <= 0:
+            return
+        import torch
+        torch.set_num_threads(config.EMBEDDING_TORCH_THREADS)
+        self._threads_pinned = True
+
+    def get(self, name: Optional[str] = None):
+        """Shared model instance; the first caller loads it, concurrent callers wait"""
+        name = name or config.EMBEDDING_MODEL
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._lock:
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+        with load_lock:
+            if name in self._models:
+                return self._models[name]
+            from sentence_transformers import SentenceTransformer
+            self._pin_threads()
+            rss_before = _rss_mb()
+            started = time.perf_counter()
+            model = SentenceTransformer(name)
+            self.stats[name] = {
+                "load_ms": round((time.perf_counter() - started) * 1000, 2),
+                "rss_before_mb": rss_before,
+                "rss_after_mb": _rss_mb(),
+                "torch_threads": config.EMBEDDING_TORCH_THREADS or None
+            }
+            self._models[name] = model
+            print(f"🧠 嵌入模型已加载: {name} ({self.stats[name]['load_ms']}ms, "
+                  f"RSS {rss_before} -> {self.stats[name]['rss_after_mb']} MB)")
+            return model
+
+    def warm_up(self, name: Optional[str] = None) -> threading.Thread:
+        """Load the model and run one encode in a daemon thread"""
+        def run():
+            try:
+                started = time.perf_counter()
+                self.get(name).encode(["warm up"])
+                self.stats[name or config.EMBEDDING_MODEL]["warmup_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            except Exception as e:
+                print(f"⚠️ 嵌入模型预热失败: {e}")
+
+        thread = threading.Thread(target=run, name="embedding-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def is_loaded(self, name: Optional[str] = None) -> bool:
+        return (name or config.EMBEDDING_MODEL) in self._models
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"loaded": list(self._models), "models": dict(self.stats), "rss_mb": _rss_mb()}
+
+
+embedding_models = EmbeddingModelRegistry()
@@ -1,49 +1,33 @@
-import openai
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Callable, Awaitable
 import json
 import os
 import re
 from datetime import datetime
+from config import config
+from llm.llm_backend import chat_completion, async_chat_completion
+from services.skill_ontology import get_skill_ontology
+from services.recommendation_catalog import get_recommendation_catalog, KINDS as RECOMMENDATION_KINDS
+from services.recommendation_cache import recommendation_cache
+from services.skill_extractor import get_skill_extractor
+from services.planner_pipeline import Stage, run_stages, format_timings
+from models.jd_analysis_cache import jd_analysis_cache, JD_SKILLS_KIND
+from services.document_extractor import document_extractor, DocumentExtractionError
 
 class PlannerAnalysisService:
+    # parse_resume 的提示词/输出结构变化时提升，简历解析缓存随之失效
+    RESUME_PARSER_VERSION = "1"
+    
     def __init__(self, openai_api_key: str):
-        self.client = openai.OpenAI(api_key=openai_api_key)
-        
-        # 预定义的技能分类
-        self.skill_categories = {
-            "programming": ["Python", "Java", "JavaScript", "C++", "Go", "Rust", "TypeScript"],
-            "frontend": ["React", "Vue", "Angular", "HTML", "CSS", "JavaScript", "TypeScript"],
-            "backend": ["Node.js", "Django", "Flask", "Spring", "Express", "FastAPI"],
-            "database": ["MySQL", "PostgreSQL", "MongoDB", "Redis", "Elasticsearch"],
-            "cloud": ["AWS", "Azure", "GCP", "Docker", "Kubernetes", "Terraform"],
-            "mobile": ["React Native", "Flutter", "iOS", "Android", "Swift", "Kotlin"],
-            "ai_ml": ["TensorFlow", "PyTorch", "Scikit-learn", "Pandas", "NumPy"],
-            "devops": ["Jenkins", "GitLab CI", "GitHub Actions", "Ansible", "Docker"],
-            "soft_skills": ["项目管理", "团队协作", "沟通能力", "领导力", "问题解决"]
-        }
+        # LLM调用统一经由 llm.llm_backend，按 config 中各调用点的模型路由
+        self.openai_api_key = openai_api_key
         
-        # 技能相似度映射
-        self.skill_similarity_map = {
-            "React": ["Vue", "Angular", "JavaScript"],
-            "Vue": ["React", "Angular", "JavaScript"],
-            "Angular": ["React", "Vue", "JavaScript"],
-            "JavaScript": ["TypeScript", "React", "Vue"],
-            "TypeScript": ["JavaScript", "React", "Vue"],
-            "Python": ["Java", "C++", "Go"],
-            "Java": ["Python", "C++", "Go"],
-            "C++": ["Python", "Java", "Go"],
-            "MySQL": ["PostgreSQL", "MongoDB", "Redis"],
-            "PostgreSQL": ["MySQL", "MongoDB", "Redis"],
-            "MongoDB": ["MySQL", "PostgreSQL", "Redis"],
-            "AWS": ["Azure", "GCP", "Docker"],
-            "Azure": ["AWS", "GCP", "Docker"],
-            "GCP": ["AWS", "Azure", "Docker"],
-            "Docker": ["Kubernetes", "AWS", "Azure"],
-            "Kubernetes": ["Docker", "AWS", "Azure"],
-            "项目管理": ["团队协作", "沟通能力", "领导力"],
-            "团队协作": ["项目管理", "沟通能力", "领导力"],
-            "沟通能力": ["项目管理", "团队协作", "领导力"]
-        }
+        # 技能本体（分类 / 相似技能 / 同义词）从 data/skill_ontology.json 编译一次
+        self.ontology = get_skill_ontology()
+        self.skill_categories = self.ontology.categories
+        self.skill_similarity_map = self.ontology.similar_skills
+        self.skill_extractor = get_skill_extractor()
+        # 课程 / 项目 / 练习推荐目录，按规范技能与难度建索引
+        self.recommendation_catalog = get_recommendation_catalog()
     
     def _extract_json_from_response(self, response_text: str) -> Dict[str, Any]:
         """从API响应中提取JSON"""
@@ -69,8 +53,7 @@ class PlannerAnalysisService:
                 "experience_requirements": []
             }
     
-    def extract_skills_from_jd(self, job_description: str) -> List[Dict[str, Any]]:
-        """从JD中提取技能要求"""
+    def _jd_skill_messages(self, job_description: str) -> List[Dict[str, str]]:
         prompt = f"""
         请从以下职位描述中提取所有技能要求，并按重要性分类。
         
@@ -93,38 +76,59 @@ class PlannerAnalysisService:
             ]
         }}
         """
+        return [
+            {"role": "system", "content": "你是一个专业的技能分析助手。请严格按照JSON格式返回结果，不要添加任何解释或额外内容。"},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _parse_jd_skills(self, response: str) -> Optional[Dict[str, Any]]:
+        """解析JD技能响应；没有任何必需技能时视为失败（不写入缓存，走备用提取）"""
+        response_text = response.strip()
+        print(f"API响应: {response_text[:200]}...")  # 调试用
+        result = self._extract_json_from_response(response_text)
+        return result if result.get("required_skills") else None
+    
+    def extract_skills_from_jd(self, job_description: str) -> List[Dict[str, Any]]:
+        """从JD中提取技能要求（按规范化JD哈希缓存，跨计划/用户复用）"""
+        def compute():
+            try:
+                return self._parse_jd_skills(chat_completion(
+                    config.LLM_EXTRACTION_MODEL,
+                    messages=self._jd_skill_messages(job_description),
+                    temperature=0.1,
+                    max_tokens=1000
+                ))
+            except Exception as e:
+                print(f"提取技能失败: {e}")
+                return None
         
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "你是一个专业的技能分析助手。请严格按照JSON格式返回结果，不要添加任何解释或额外内容。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                max_tokens=1000
-            )
-            
-            response_text = response.choices[0].message.content.strip()
-            print(f"API响应: {response_text[:200]}...")  # 调试用
-            
-            result = self._extract_json_from_response(response_text)
-            return result
-        except Exception as e:
-            print(f"提取技能失败: {e}")
-            return self._fallback_skill_extraction(job_description)
+        result = jd_analysis_cache.get_or_compute(JD_SKILLS_KIND, config.LLM_EXTRACTION_MODEL, job_description, compute)
+        return result if result is not None else self._fallback_skill_extraction(job_description)
+    
+    async def extract_skills_from_jd_async(self, job_description: str) -> Dict[str, Any]:
+        """从JD中提取技能要求（异步客户端，不阻塞事件循环）"""
+        async def compute():
+            try:
+                return self._parse_jd_skills(await async_chat_completion(
+                    config.LLM_EXTRACTION_MODEL,
+                    messages=self._jd_skill_messages(job_description),
+                    temperature=0.1,
+                    max_tokens=1000
+                ))
+            except Exception as e:
+                print(f"提取技能失败: {e}")
+                return None
+        
+        result = await jd_analysis_cache.aget_or_compute(JD_SKILLS_KIND, config.LLM_EXTRACTION_MODEL, job_description, compute)
+        return result if result is not None else self._fallback_skill_extraction(job_description)
     
     def _fallback_skill_extraction(self, job_description: str) -> Dict[str, Any]:
         """备用技能提取方法"""
-        skills = []
-        for category, skill_list in self.skill_categories.items():
-            for skill in skill_list:
-                if skill.lower() in job_description.lower():
-                    skills.append({
-                        "skill": skill,
-                        "importance": "medium",
-                        "category": category
-                    })
+        # 单次扫描（Aho–Corasick），按词边界匹配技能名及同义别名
+        skills = [
+            {"skill": hit["skill"], "importance": "medium", "category": hit["category"]}
+            for hit in self.skill_extractor.category_skills(job_description)
+        ]
         
         return {
             "required_skills": skills[:5],
@@ -135,73 +139,9 @@ class PlannerAnalysisService:
         }
     
     def calculate_semantic_similarity(self, text1: str, text2: str) -> float:
-        """计算语义相似度 - 增强版"""
+        """计算语义相似度 - 基于编译后的技能本体（查表 + 缓存）"""
         try:
-            # 完全匹配
-            if text1.lower() == text2.lower():
-                return 1.0
-            
-            # 检查相似技能映射
-            if text1 in self.skill_similarity_map:
-                if text2 in self.skill_similarity_map[text1]:
-                    return 0.9
-            
-            if text2 in self.skill_similarity_map:
-                if text1 in self.skill_similarity_map[text2]:
-                    return 0.9
-            
-            # 部分匹配（包含关系）
-            if text1.lower() in text2.lower() or text2.lower() in text1.lower():
-                return 0.8
-            
-            # 同义词匹配
-            synonyms = {
-                "机器学习": ["machine learning", "ml", "ai", "artificial intelligence"],
-                "machine learning": ["机器学习", "ml", "ai", "artificial intelligence"],
-                "python": ["python", "py"],
-                "java": ["java", "jvm"],
-                "scala": ["scala", "sc"],
-                "sql": ["sql", "database", "mysql", "postgresql"],
-                "spark": ["apache spark", "spark", "spark streaming"],
-                "kafka": ["apache kafka", "kafka"],
-                "tensorflow": ["tensorflow", "tf"],
-                "pytorch": ["pytorch", "torch"],
-                "scikit-learn": ["scikit-learn", "sklearn", "scikit learn"],
-                "docker": ["docker", "container"],
-                "kubernetes": ["kubernetes", "k8s"],
-                "aws": ["aws", "amazon web services", "amazon"],
-                "distributed systems": ["分布式系统", "distributed", "microservices"],
-                "分布式系统": ["distributed systems", "distributed", "microservices"],
-                "大数据处理": ["big data", "data processing", "etl", "batch processing"],
-                "big data": ["大数据处理", "data processing", "etl", "batch processing"],
-                "a/b testing": ["ab testing", "ab test", "experiment", "实验"],
-                "实验": ["a/b testing", "ab testing", "experiment"],
-                "编程规范": ["coding standards", "code standards", "best practices"],
-                "coding standards": ["编程规范", "code standards", "best practices"],
-                "设计模式": ["design patterns", "patterns"],
-                "design patterns": ["设计模式", "patterns"],
-                "统计方法": ["statistics", "statistical methods", "statistical analysis"],
-                "statistics": ["统计方法", "statistical methods", "statistical analysis"]
-            }
-            
-            # 检查同义词
-            for skill, synonym_list in synonyms.items():
-                if text1.lower() in [skill.lower()] + [s.lower() for s in synonym_list]:
-                    if text2.lower() in [skill.lower()] + [s.lower() for s in synonym_list]:
-                        return 0.85
-            
-            # 同类别技能
-            for category, skills in self.skill_categories.items():
-                if text1 in skills and text2 in skills:
-                    return 0.6
-            
-            # 关键词匹配
-            keywords1 = set(text1.lower().split())
-            keywords2 = set(text2.lower().split())
-            if keywords1 & keywords2:  # 有交集
-                return 0.4
-            
-            return 0.1  # 默认低相似度
+            return self.ontology.similarity(text1, text2)
         except Exception as e:
             print(f"计算相似度失败: {e}")
             return 0.5
@@ -216,31 +156,12 @@ class PlannerAnalysisService:
         strengths = []
         missing_skills = []
         
-        # 创建用户技能的标准化版本
+        # 创建用户技能的标准化版本（附加本体中的隐含技能）
         normalized_user_skills = []
         for skill in user_skills:
             normalized_user_skills.append(skill.lower())
-            # 添加技能的同义词
-            if skill.lower() in ["tensorflow", "tf"]:
-                normalized_user_skills.extend(["machine learning", "ml", "ai"])
-            elif skill.lower() in ["pytorch", "torch"]:
-                normalized_user_skills.extend(["machine learning", "ml", "ai"])
-            elif skill.lower() in ["scikit-learn", "sklearn"]:
-                normalized_user_skills.extend(["machine learning", "ml", "ai"])
-            elif skill.lower() in ["apache spark", "spark"]:
-                normalized_user_skills.extend(["big data", "data processing", "etl"])
-            elif skill.lower() in ["kafka"]:
-                normalized_user_skills.extend(["big data", "data processing", "streaming"])
-            elif skill.lower() in ["hadoop"]:
-                normalized_user_skills.extend(["big data", "data processing", "distributed"])
-            elif skill.lower() in ["docker", "kubernetes", "k8s"]:
-                normalized_user_skills.extend(["distributed systems", "microservices"])
-            elif skill.lower() in ["aws", "amazon web services"]:
-                normalized_user_skills.extend(["cloud", "distributed systems"])
-            elif skill.lower() in ["design patterns", "patterns"]:
-                normalized_user_skills.extend(["coding standards", "best practices"])
-            elif skill.lower() in ["code review", "tdd"]:
-                normalized_user_skills.extend(["coding standards", "best practices"])
+            normalized_user_skills.extend(self.ontology.expand_user_skill(skill))
+        normalized_user_skill_set = set(normalized_user_skills)
         
         # 分析每个JD技能
         for jd_skill in jd_skills:
@@ -275,34 +196,10 @@ class PlannerAnalysisService:
                         max_similarity = similarity
                         similar_skill = user_skill
                 
-                # 特殊技能映射检查
-                skill_mappings = {
-                    "机器学习算法": ["tensorflow", "pytorch", "scikit-learn", "mlflow", "machine learning", "ml", "ai", "深度学习", "神经网络", "machine learning"],
-                    "统计方法": ["statistics", "statistical", "data analysis", "analytics", "统计", "数据分析", "statistics"],
-                    "分布式系统": ["distributed", "microservices", "docker", "kubernetes", "k8s", "scaling", "分布式", "微服务", "distributed systems"],
-                    "大数据处理": ["spark", "kafka", "hadoop", "big data", "etl", "data processing", "大数据", "数据处理", "data pipelines"],
-                    "a/b测试": ["ab testing", "experiment", "testing", "实验", "a/b test", "a/b testing"],
-                    "实验设计": ["experiment", "testing", "ab testing", "实验", "实验设计"],
-                    "编程规范": ["coding standards", "code review", "tdd", "best practices", "design patterns", "编程规范", "代码规范"],
-                    "设计模式": ["design patterns", "patterns", "architecture", "coding standards", "设计模式", "架构模式"],
-                    "software development": ["python", "java", "scala", "programming", "coding", "软件开发", "编程", "software development"],
-                    "machine learning": ["tensorflow", "pytorch", "scikit-learn", "ml", "ai", "机器学习", "深度学习", "machine learning"],
-                    "data pipelines": ["spark", "kafka", "hadoop", "etl", "data processing", "数据管道", "数据处理", "data pipelines"],
-                    "distributed systems": ["docker", "kubernetes", "microservices", "分布式", "微服务", "distributed systems"],
-                    "coding standards": ["code review", "tdd", "best practices", "编程规范", "代码规范"],
-                    "design patterns": ["patterns", "architecture", "设计模式", "架构模式"],
-                    "a/b testing": ["experiment", "testing", "实验", "ab test", "a/b testing"],
-                    "statistics": ["statistical", "data analysis", "analytics", "统计", "数据分析", "statistics"],
-                    "information retrieval": ["search", "elasticsearch", "solr", "信息检索", "搜索", "information retrieval"],
-                    "natural language processing": ["nlp", "text processing", "language model", "自然语言处理", "文本处理"],
-                    "system design": ["architecture", "design", "系统设计", "架构设计", "system design"],
-                    "programming languages": ["python", "java", "scala", "programming", "编程语言", "programming languages"]
-                }
-                
                 # 检查特殊映射
-                if skill_name in skill_mappings:
-                    for mapped_skill in skill_mappings[skill_name]:
-                        if mapped_skill in normalized_user_skills:
+                if skill_name in self.ontology.jd_skill_mappings:
+                    for mapped_skill in self.ontology.jd_skill_mappings[skill_name]:
+                        if mapped_skill in normalized_user_skill_set:
                             max_similarity = 0.8
                             similar_skill = mapped_skill
                             break
@@ -342,44 +239,218 @@ class PlannerAnalysisService:
         experience_years: int
     ) -> Dict[str, Any]:
         """分析JD与用户能力的匹配度 - 增强版"""
+        analysis_result, _, _ = await self.plan_job_match(
+            job_description, user_skills, experience_years, with_recommendations=False
+        )
+        return analysis_result
+    
+    async def reanalyze_job_match(
+        self,
+        previous: Dict[str, Any],
+        previous_skills: List[str],
+        job_description: str,
+        user_skills: List[str],
+        experience_years: int,
+        on_stage: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """技能变化后的增量重新分析
+        
+        只重算受新增/移除技能影响的JD技能条目，分数与本地派生字段随之更新；详细分析（LLM）仅在
+        整体匹配度变化超过 PLANNER_REANALYZE_THRESHOLD 时重新生成。旧分析不完整时退回全量分析。
+        返回 (analysis_result, 变更摘要)
+        """
+        jd_analysis = (previous or {}).get("jd_requirements") or {}
+        required = jd_analysis.get("required_skills")
+        if not required or "gaps" not in previous or "strengths" not in previous:
+            analysis_result = await self.analyze_job_match(job_description, user_skills, experience_years)
+            return analysis_result, {"mode": "full", "narrative_regenerated": True}
+        
+        old_skills = set(previous_skills or [])
+        added = [skill for skill in user_skills if skill not in old_skills]
+        removed = [skill for skill in old_skills if skill not in set(user_skills)]
+        removed_terms = set(removed) | {skill.lower() for skill in removed}
+        for skill in removed:
+            removed_terms.update(self.ontology.expand_user_skill(skill))
+        
+        # 旧条目按技能名取用；新增技能只可能改变它能匹配上的条目，移除技能只影响由它匹配的条目
+        previous_entries: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in previous["strengths"] + previous["gaps"]:
+            previous_entries.setdefault(entry["skill"], []).append(entry)
+        
+        def affected(jd_skill: Dict[str, Any], entry: Optional[Dict[str, Any]]) -> bool:
+            if entry is None:
+                return True
+            if entry["status"] == "strong":
+                return jd_skill["skill"] in removed_terms
+            if entry.get("similar_skill") in removed_terms:
+                return True
+            return bool(added) and not self.analyze_skill_gaps([jd_skill], added)["missing_skills"]
+        
+        gaps, strengths, missing_skills, reanalyzed = [], [], [], []
+        for jd_skill in required:
+            pending = previous_entries.get(jd_skill["skill"])
+            entry = pending.pop(0) if pending else None
+            if affected(jd_skill, entry):
+                fresh = self.analyze_skill_gaps([jd_skill], user_skills)
+                entry = (fresh["strengths"] or fresh["gaps"])[0]
+                reanalyzed.append(jd_skill["skill"])
+            if entry["status"] == "strong":
+                strengths.append(entry)
+            else:
+                gaps.append(entry)
+                if entry["status"] == "missing":
+                    missing_skills.append(entry["skill"])
+        skill_analysis = {
+            "gaps": gaps,
+            "strengths": strengths,
+            "missing_skills": missing_skills,
+            "gap_count": len(gaps),
+            "strength_count": len(strengths)
+        }
+        
+        skill_match_percentage = len(strengths) / len(required) * 100
+        experience_match_percentage = self._calculate_experience_match(
+            jd_analysis.get("experience_requirements", []), experience_years
+        )
+        overall_match = round((skill_match_percentage + experience_match_percentage) / 2, 1)
+        match_delta = round(overall_match - (previous.get("overall_match") or 0), 1)
+        
+        detailed_analysis = previous.get("detailed_analysis")
+        regenerate = not detailed_analysis or abs(match_delta) > config.PLANNER_REANALYZE_THRESHOLD
+        if regenerate:
+            results, timings = await run_stages([
+                Stage(
+                    "detailed_analysis",
+                    lambda r: self._generate_detailed_analysis(
+                        job_description, user_skills, experience_years, skill_analysis, jd_analysis
+                    ),
+                    timeout=config.PLANNER_ANALYSIS_TIMEOUT,
+                    fallback=lambda r: self._fallback_detailed_analysis(skill_analysis)
+                )
+            ], on_stage)
+            detailed_analysis = results["detailed_analysis"]
+            print(f"⏱️ 增量分析阶段耗时: {format_timings(timings)}")
+        
+        analysis_result = {
+            "skill_match": round(skill_match_percentage, 1),
+            "experience_match": round(experience_match_percentage, 1),
+            "overall_match": overall_match,
+            "gaps": gaps,
+            "strengths": strengths,
+            "missing_skills": missing_skills,
+            "jd_requirements": jd_analysis,
+            "detailed_analysis": detailed_analysis,
+            "improvement_priorities": self._generate_improvement_priorities(skill_analysis),
+            "timeline_estimate": self._estimate_improvement_timeline(skill_analysis),
+            "confidence_score": self._calculate_confidence_score(skill_analysis, experience_years)
+        }
+        changes = {
+            "mode": "incremental",
+            "added_skills": added,
+            "removed_skills": removed,
+            "reanalyzed_skills": reanalyzed,
+            "match_delta": match_delta,
+            "narrative_regenerated": regenerate
+        }
+        print(f"♻️ 增量重新分析: +{len(added)} / -{len(removed)} 项技能, 重算 {len(reanalyzed)}/{len(required)} 个JD技能, "
+              f"整体匹配度变化 {match_delta:+}{', 重新生成详细分析' if regenerate else ''}")
+        return analysis_result, changes
+    
+    async def plan_job_match(
+        self,
+        job_description: str,
+        user_skills: List[str],
+        experience_years: int,
+        with_recommendations: bool = True,
+        on_stage: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, List[Dict[str, Any]]]], Dict[str, Any]]:
+        """匹配分析 + 推荐，按依赖关系并发执行各LLM阶段
         
-        # 1. 提取JD技能要求
-        jd_analysis = self.extract_skills_from_jd(job_description)
+        返回 (analysis_result, recommendations 或 None, 各阶段耗时)；on_stage 在每个阶段完成时回调
+        """
+        stages = [
+            # 1. 提取JD技能要求
+            Stage(
+                "extract_skills",
+                lambda r: self.extract_skills_from_jd_async(job_description),
+                timeout=config.PLANNER_EXTRACT_TIMEOUT,
+                fallback=lambda r: self._fallback_skill_extraction(job_description)
+            ),
+            # 2-4. 技能差距与匹配度（本地计算）
+            Stage(
+                "match",
+                lambda r: self._match_requirements(r["extract_skills"], user_skills, experience_years),
+                deps=("extract_skills",)
+            ),
+            # 5. 详细分析报告（与推荐并发）
+            Stage(
+                "detailed_analysis",
+                lambda r: self._generate_detailed_analysis(
+                    job_description, user_skills, experience_years,
+                    r["match"]["skill_analysis"], r["extract_skills"]
+                ),
+                deps=("match",),
+                timeout=config.PLANNER_ANALYSIS_TIMEOUT,
+                fallback=lambda r: self._fallback_detailed_analysis(r["match"]["skill_analysis"])
+            )
+        ]
+        if with_recommendations:
+            # 推荐只依赖匹配结果，不等待详细分析
+            stages.append(Stage(
+                "recommendations",
+                lambda r: self.generate_recommendations(r["match"]["result"]),
+                deps=("match",),
+                timeout=config.PLANNER_RECOMMEND_TIMEOUT,
+                fallback=lambda r: self._generate_smart_fallback_recommendations(r["match"]["result"])
+            ))
+        
+        results, timings = await run_stages(stages, on_stage)
+        print(f"⏱️ 规划阶段耗时: {format_timings(timings)}")
         
-        # 2. 分析技能差距
+        match = results["match"]["result"]
+        analysis_result = {
+            **{key: match[key] for key in ("skill_match", "experience_match", "overall_match", "gaps",
+                                           "strengths", "missing_skills", "jd_requirements")},
+            "detailed_analysis": results["detailed_analysis"],
+            **{key: match[key] for key in ("improvement_priorities", "timeline_estimate", "confidence_score")}
+        }
+        return analysis_result, results.get("recommendations"), timings
+    
+    async def _match_requirements(
+        self,
+        jd_analysis: Dict[str, Any],
+        user_skills: List[str],
+        experience_years: int
+    ) -> Dict[str, Any]:
+        """技能差距、匹配度与经验匹配（不含LLM调用）"""
         skill_analysis = self.analyze_skill_gaps(
             jd_analysis["required_skills"], 
             user_skills
         )
         
-        # 3. 计算匹配度
         total_skills = len(jd_analysis["required_skills"])
         matched_skills = len(skill_analysis["strengths"])
         skill_match_percentage = (matched_skills / total_skills * 100) if total_skills > 0 else 0
         
-        # 4. 经验匹配分析
         experience_requirements = jd_analysis.get("experience_requirements", [])
         experience_match_percentage = self._calculate_experience_match(
             experience_requirements, experience_years
         )
         
-        # 5. 生成详细分析报告
-        detailed_analysis = await self._generate_detailed_analysis(
-            job_description, user_skills, experience_years, skill_analysis, jd_analysis
-        )
-        
         return {
-            "skill_match": round(skill_match_percentage, 1),
-            "experience_match": round(experience_match_percentage, 1),
-            "overall_match": round((skill_match_percentage + experience_match_percentage) / 2, 1),
-            "gaps": skill_analysis["gaps"],
-            "strengths": skill_analysis["strengths"],
-            "missing_skills": skill_analysis["missing_skills"],
-            "jd_requirements": jd_analysis,
-            "detailed_analysis": detailed_analysis,
-            "improvement_priorities": self._generate_improvement_priorities(skill_analysis),
-            "timeline_estimate": self._estimate_improvement_timeline(skill_analysis),
-            "confidence_score": self._calculate_confidence_score(skill_analysis, experience_years)
+            "skill_analysis": skill_analysis,
+            "result": {
+                "skill_match": round(skill_match_percentage, 1),
+                "experience_match": round(experience_match_percentage, 1),
+                "overall_match": round((skill_match_percentage + experience_match_percentage) / 2, 1),
+                "gaps": skill_analysis["gaps"],
+                "strengths": skill_analysis["strengths"],
+                "missing_skills": skill_analysis["missing_skills"],
+                "jd_requirements": jd_analysis,
+                "improvement_priorities": self._generate_improvement_priorities(skill_analysis),
+                "timeline_estimate": self._estimate_improvement_timeline(skill_analysis),
+                "confidence_score": self._calculate_confidence_score(skill_analysis, experience_years)
+            }
         }
     
     def _calculate_experience_match(
@@ -432,8 +503,8 @@ class PlannerAnalysisService:
         """
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
+            response = await async_chat_completion(
+                config.LLM_ANALYSIS_MODEL,
                 messages=[
                     {"role": "system", "content": "你是一个专业的职业分析助手。请严格按照JSON格式返回结果，不要添加任何解释或额外内容。"},
                     {"role": "user", "content": prompt}
@@ -442,7 +513,7 @@ class PlannerAnalysisService:
                 max_tokens=800
             )
             
-            response_text = response.choices[0].message.content.strip()
+            response_text = response.strip()
             print(f"详细分析API响应: {response_text[:200]}...")  # 调试用
             
             result = self._extract_json_from_response(response_text)
@@ -594,8 +665,35 @@ class PlannerAnalysisService:
         self, 
         analysis_result: Dict[str, Any]
     ) -> Dict[str, List[Dict[str, Any]]]:
-        """生成个性化推荐 - 基于真实技能差距分析"""
+        """生成个性化推荐 - 基于真实技能差距分析
         
+        推荐项先从索引目录中按差距排序选出；PLANNER_RECOMMEND_LLM=rerank 时LLM只负责重排与注释，
+        off 时不调用LLM，generate 时由LLM从头生成（旧行为）。
+        LLM结果按规范化的技能差距向量缓存，差距相近的规划直接复用
+        """
+        mode = config.PLANNER_RECOMMEND_LLM
+        catalog_result = self._generate_smart_fallback_recommendations(analysis_result)
+        if mode == "off" or (mode == "rerank" and not any(catalog_result[kind] for kind in RECOMMENDATION_KINDS)):
+            return catalog_result
+        
+        gaps = analysis_result.get('gaps', [])
+        scope = recommendation_cache.scope(mode, config.LLM_ANALYSIS_MODEL, self.recommendation_catalog.version)
+        cached = await recommendation_cache.lookup(scope, gaps)
+        if cached is not None:
+            return cached
+        
+        if mode == "rerank":
+            result = await self._rerank_recommendations(analysis_result, catalog_result)
+        else:
+            result = await self._generate_llm_recommendations(analysis_result)
+        if result is None:
+            # 返回基于技能差距的智能默认推荐（不缓存，下次重试LLM）
+            return catalog_result
+        await recommendation_cache.store(scope, gaps, result)
+        return result
+    
+    async def _generate_llm_recommendations(self, analysis_result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """LLM从头生成推荐；失败返回 None"""
         # 提取关键信息
         gaps = analysis_result.get('gaps', [])
         strengths = analysis_result.get('strengths', [])
@@ -686,8 +784,8 @@ class PlannerAnalysisService:
         """
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
+            response = await async_chat_completion(
+                config.LLM_ANALYSIS_MODEL,
                 messages=[
                     {"role": "system", "content": "你是一个专业的职业发展顾问和技能提升专家。请基于用户的技能差距分析，生成具体、可执行的个性化推荐。确保推荐内容针对性强、实用性强。"},
                     {"role": "user", "content": prompt}
@@ -696,7 +794,7 @@ class PlannerAnalysisService:
                 max_tokens=1500
             )
             
-            response_text = response.choices[0].message.content.strip()
+            response_text = response.strip()
             print(f"🔍 AI推荐生成响应: {response_text[:300]}...")
             
             result = self._extract_json_from_response(response_text)
@@ -724,95 +822,94 @@ class PlannerAnalysisService:
             
         except Exception as e:
             print(f"❌ AI推荐生成失败: {e}")
-            # 返回基于技能差距的智能默认推荐
-            return self._generate_smart_fallback_recommendations(analysis_result)
+            return None
     
-    def _generate_smart_fallback_recommendations(self, analysis_result: Dict[str, Any]) -> Dict[str, Any]:
-        """生成智能的备用推荐"""
-        gaps = analysis_result.get('gaps', [])
-        skill_match = analysis_result.get('skill_match', 0)
-        
-        # 基于技能差距生成推荐
-        courses = []
-        projects = []
-        practice = []
-        
-        # 课程推荐
-        if any('machine learning' in gap['skill'].lower() for gap in gaps):
-            courses.append({
-                "id": "course_ml",
-                "name": "机器学习基础 - Coursera",
-                "platform": "Coursera",
-                "difficulty": "中级",
-                "duration": "8周",
-                "url": "https://www.coursera.org/learn/machine-learning",
-                "description": "吴恩达教授的经典机器学习课程",
-                "target_skill": "Machine Learning",
-                "priority": "high"
-            })
-        
-        if any('python' in gap['skill'].lower() for gap in gaps):
-            courses.append({
-                "id": "course_python",
-                "name": "Python编程基础 - Codecademy",
-                "platform": "Codecademy",
-                "difficulty": "初级",
-                "duration": "3周",
-                "url": "https://www.codecademy.com/learn/learn-python-3",
-                "description": "从零开始学习Python编程",
-                "target_skill": "Python",
-                "priority": "high"
-            })
+    async def _rerank_recommendations(
+        self,
+        analysis_result: Dict[str, Any],
+        recommendations: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """LLM只对目录候选重排并补充推荐理由 / 学习路径；失败返回 None"""
+        candidates = {
+            kind: [
+                {"id": item["id"], "name": item.get("name") or item.get("type"),
+                 "difficulty": item.get("difficulty"), "matched_gaps": item["matched_gaps"]}
+                for item in recommendations[kind]
+            ]
+            for kind in RECOMMENDATION_KINDS
+        }
+        gaps = [
+            {"skill": gap["skill"], "priority": gap.get("priority"), "status": gap.get("status")}
+            for gap in analysis_result.get('gaps', [])
+        ]
+        prompt = f"""
+        用户与目标岗位的匹配度：技能 {analysis_result.get('skill_match', 0)}%，经验 {analysis_result.get('experience_match', 0)}%。
+        技能差距：{json.dumps(gaps, ensure_ascii=False)}
         
-        if any('system design' in gap['skill'].lower() for gap in gaps):
-            courses.append({
-                "id": "course_system_design",
-                "name": "系统设计面试准备 - Educative",
-                "platform": "Educative",
-                "difficulty": "高级",
-                "duration": "6周",
-                "url": "https://www.educative.io/courses/grokking-the-system-design-interview",
-                "description": "专门针对系统设计面试的课程",
-                "target_skill": "System Design",
-                "priority": "high"
-            })
+        候选推荐（已按技能差距筛选）：
+        {json.dumps(candidates, ensure_ascii=False)}
         
-        # 项目推荐
-        if skill_match < 50:
-            projects.append({
-                "id": "project_basic",
-                "name": "全栈Web应用开发",
-                "tech_stack": ["React", "Node.js", "MongoDB"],
-                "difficulty": "中级",
-                "duration": "4-6周",
-                "description": "开发一个完整的Web应用，涵盖前后端开发",
-                "learning_objectives": ["掌握全栈开发", "学习数据库设计", "理解API开发"],
-                "target_skills": ["React", "Node.js", "MongoDB"]
-            })
+        请按对该用户的价值对每类候选重新排序，并为每项写一句推荐理由。只能使用候选中的id。
+        请严格按照以下JSON格式返回，不要添加任何其他内容：
+        {{
+            "courses": [{{"id": "候选id", "reason": "推荐理由"}}],
+            "projects": [{{"id": "候选id", "reason": "推荐理由"}}],
+            "practice": [{{"id": "候选id", "reason": "推荐理由"}}],
+            "learning_path": {{
+                "short_term": ["短期目标"],
+                "medium_term": ["中期目标"],
+                "long_term": ["长期目标"]
+            }},
+            "timeline": {{
+                "estimated_weeks": 数字,
+                "milestones": ["里程碑"]
+            }}
+        }}
+        """
+        try:
+            response = await async_chat_completion(
+                config.LLM_ANALYSIS_MODEL,
+                messages=[
+                    {"role": "system", "content": "你是一个专业的职业发展顾问。请基于用户的技能差距，对给定的学习资源进行排序并说明理由。"},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.2,
+                max_tokens=800
+            )
+            ranking = self._extract_json_from_response(response.strip())
+        except Exception as e:
+            print(f"❌ AI推荐重排失败，使用目录排序: {e}")
+            return None
+        if not any(isinstance(ranking.get(kind), list) for kind in RECOMMENDATION_KINDS):
+            print("❌ AI推荐重排响应无法解析，使用目录排序")
+            return None
         
-        # 练习推荐
-        practice.append({
-            "id": "practice_coding",
-            "type": "编程练习",
-            "frequency": "每周3次",
-            "focus": "算法和数据结构",
-            "description": "在LeetCode上练习编程题，重点练习目标岗位相关的算法",
-            "target_skills": ["算法", "数据结构", "编程"]
-        })
-        
-        practice.append({
-            "id": "practice_interview",
-            "type": "模拟面试",
-            "frequency": "每周1次",
-            "focus": "技术面试和系统设计",
-            "description": "模拟真实面试环境，练习技术问题回答",
-            "target_skills": ["面试技巧", "技术表达", "系统设计"]
-        })
+        result = dict(recommendations)
+        for kind in RECOMMENDATION_KINDS:
+            by_id = {item["id"]: item for item in recommendations[kind]}
+            ordered = []
+            for entry in ranking.get(kind) or []:
+                item = by_id.pop(entry.get("id"), None) if isinstance(entry, dict) else None
+                if item is not None:
+                    ordered.append({**item, "reason": entry.get("reason") or item["reason"]})
+            # LLM遗漏的候选保持目录顺序排在后面
+            result[kind] = ordered + list(by_id.values())
+        if isinstance(ranking.get("learning_path"), dict):
+            result["learning_path"] = ranking["learning_path"]
+        if isinstance(ranking.get("timeline"), dict):
+            result["timeline"] = ranking["timeline"]
+        print(f"✅ 目录推荐已由AI重排: {', '.join(f'{kind} {len(result[kind])}' for kind in RECOMMENDATION_KINDS)}")
+        return result
+    
+    def _generate_smart_fallback_recommendations(self, analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+        """生成智能的备用推荐（索引目录按技能差距排序，不调用LLM）"""
+        recommendations = self.recommendation_catalog.recommend(
+            analysis_result.get('gaps', []),
+            analysis_result.get('skill_match', 0)
+        )
         
         return {
-            "courses": courses,
-            "projects": projects,
-            "practice": practice,
+            **recommendations,
             "learning_path": {
                 "short_term": ["掌握基础编程技能", "学习核心算法"],
                 "medium_term": ["完成实战项目", "提升系统设计能力"],
@@ -824,6 +921,11 @@ class PlannerAnalysisService:
             }
         }
     
+    @property
+    def resume_parser_version(self) -> str:
+        """Key for the resume parse cache: parser version + extraction model"""
+        return f"{self.RESUME_PARSER_VERSION}:{config.LLM_EXTRACTION_MODEL}"
+    
     async def parse_resume(self, resume_path: str) -> Dict[str, Any]:
         """解析简历内容 - 简化版，直接让GPT分析"""
         try:
@@ -899,8 +1001,8 @@ class PlannerAnalysisService:
             5. 提供详细的分析说明
             """
             
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
+            response = await async_chat_completion(
+                config.LLM_EXTRACTION_MODEL,
                 messages=[
                     {"role": "system", "content": "你是一个专业的简历分析专家。请仔细分析简历内容，提取准确的信息，并提供详细的技能分析。"},
                     {"role": "user", "content": prompt}
@@ -909,14 +1011,15 @@ class PlannerAnalysisService:
                 max_tokens=1500
             )
             
-            response_text = response.choices[0].message.content.strip()
+            response_text = response.strip()
             print(f"🔍 GPT分析响应: {response_text[:300]}...")
             
             result = self._extract_json_from_response(response_text)
             
             # 确保返回的数据结构正确
             if not result.get("skills"):
-                result["skills"] = []
+                # 模型未给出技能时，退回本体自动机的非LLM提取
+                result["skills"] = self.skill_extractor.skill_names(resume_content)
             if not result.get("experience_years"):
                 result["experience_years"] = 0
             if not result.get("education"):
@@ -956,48 +1059,16 @@ class PlannerAnalysisService:
             raise ValueError(error_msg)
     
     async def _extract_resume_text(self, resume_path: str) -> str:
-        """提取简历文本内容"""
+        """提取简历文本内容（进程池解析，逐页返回）"""
         try:
-            file_extension = resume_path.lower().split('.')[-1]
-            
-            if file_extension == 'pdf':
-                print("📄 检测到PDF文件，提取文本...")
-                try:
-                    import PyPDF2
-                    resume_content = ""
-                    with open(resume_path, 'rb') as file:
-                        pdf_reader = PyPDF2.PdfReader(file)
-                        print(f"✅ PDF文件读取成功，页数: {len(pdf_reader.pages)}")
-                        for i, page in enumerate(pdf_reader.pages):
-                            page_text = page.extract_text()
-                            resume_content += page_text + "\n"
-                            print(f"✅ 第{i+1}页提取成功，长度: {len(page_text)} 字符")
-                    print(f"✅ PDF文本提取成功，总长度: {len(resume_content)} 字符")
-                    return resume_content
-                except ImportError as e:
-                    print(f"⚠️ PyPDF2导入失败: {e}")
-                    return None
-                except Exception as e:
-                    print(f"❌ PDF解析失败: {e}")
-                    return None
-            else:
-                # 对于文本文件，尝试多种编码
-                encodings = ['utf-8', 'gbk', 'gb2312', 'latin-1']
-                
-                for encoding in encodings:
-                    try:
-                        with open(resume_path, 'r', encoding=encoding) as f:
-                            resume_content = f.read()
-                        print(f"✅ 使用 {encoding} 编码成功读取文件")
-                        return resume_content
-                    except UnicodeDecodeError:
-                        print(f"⚠️ {encoding} 编码失败，尝试下一个...")
-                        continue
-                
-                print("❌ 所有编码都失败")
-                return None
-                
-        except Exception as e:
+            pages = []
+            async for page_text in document_extractor.iter_pages(resume_path):
+                pages.append(page_text)
+                print(f"✅ 第{len(pages)}页提取成功，长度: {len(page_text)} 字符")
+            resume_content = "\n".join(pages)
+            print(f"✅ 文本提取成功，总长度: {len(resume_content)} 字符")
+            return resume_content
+        except DocumentExtractionError as e:
             print(f"❌ 文本提取失败: {e}")
             return None
     
@@ -0,0 +1,138 @@
+# planner_pipeline.py — Version 1.1.1
+# =============================================================================
+# Interview Helper Backend — Planner Stage DAG
+#
+# Overview:
+#   - Plan creation is a handful of LLM calls with data dependencies between them:
+#
+#         extract_skills ──► match ──┬──► detailed_analysis
+#                                    └──► recommendations
+#
+#     Each stage starts as soon as its dependencies finish, so independent stages (the
+#     detailed report and the recommendations) run concurrently on the async LLM client.
+#   - Every stage has its own timeout and a fallback; a slow or failing LLM call degrades
+#     that stage to its rule-based result instead of failing the whole plan.
+#   - Per-stage latency and status are returned with the results and aggregated per
+#     process for /api/health.
+#
+# Usage:
+#   results, timings = await run_stages([
+#       Stage("a", lambda r: fetch_a()),
+#       Stage("b", lambda r: use(r["a"]), deps=("a",), timeout=30, fallback=lambda r: default),
+#   ])
+#
+# Author: BeeBee AI Track-B
+# Version: 1.1.1
+# =============================================================================
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+_stage_stats: Dict[str, Dict[str, float]] = {}
+
+
+class Stage:
+    """One node of the DAG: run(results) is awaited once every dep has a result"""
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[Dict[str, Any]], Awaitable[Any]],
+        deps: Sequence[str] = (),
+        timeout: Optional[float] = None,
+        fallback: Optional[Callable[[Dict[str, Any]], Any]] = None
+    ):
+        self.name = name
+        self.run = run
+        self.deps = tuple(deps)
+        self.timeout = timeout
+        self.fallback = fallback
+
+
+async def _run_stage(
+    stage: Stage,
+    results: Dict[str, Any],
+    timings: Dict[str, Dict[str, Any]],
+    origin: float,
+    on_stage: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None
+):
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        value = await asyncio.wait_for(stage.run(results), stage.timeout) if stage.timeout else await stage.run(results)
+    except Exception as e:
+        if stage.fallback is None:
+            raise
+        status = "timeout" if isinstance(e, asyncio.TimeoutError) else "fallback"
+        print(f"⚠️ 阶段 {stage.name} {status}，使用备用结果: {e!r}")
+        value = stage.fallback(results)
+    finished = time.perf_counter()
+    results[stage.name] = value
+    timings[stage.name] = {
+        "start_ms": round((started - origin) * 1000, 2),
+        "ms": round((finished - started) * 1000, 2),
+        "status": status
+    }
+    stats = _stage_stats.setdefault(stage.name, {"runs": 0, "total_ms": 0.0, "max_ms": 0.0, "timeouts": 0, "fallbacks": 0})
+    stats["runs"] += 1
+    stats["total_ms"] += timings[stage.name]["ms"]
+    stats["max_ms"] = max(stats["max_ms"], timings[stage.name]["ms"])
+    if status == "timeout":
+        stats["timeouts"] += 1
+    elif status == "fallback":
+        stats["fallbacks"] += 1
+    if on_stage is not None:
+        await on_stage(stage.name, timings[stage.name])
+
+
+async def run_stages(
+    stages: List[Stage],
+    on_stage: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Run stages (listed after their deps) as a DAG; returns (results by name, timings)
+
+    on_stage(name, timing), if given, is awaited as each stage finishes (progress reporting).
+    """
+    origin = time.perf_counter()
+    results: Dict[str, Any] = {}
+    timings: Dict[str, Dict[str, Any]] = {}
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def schedule(stage: Stage):
+        if stage.deps:
+            await asyncio.gather(*(tasks[dep] for dep in stage.deps))
+        await _run_stage(stage, results, timings, origin, on_stage)
+
+    for stage in stages:
+        missing = [dep for dep in stage.deps if dep not in tasks]
+        if missing:
+            raise ValueError(f"Stage {stage.name} depends on unknown or later stages: {missing}")
+        tasks[stage.name] = asyncio.create_task(schedule(stage))
+    try:
+        await asyncio.gather(*tasks.values())
+    except Exception:
+        for task in tasks.values():
+            task.cancel()
+        raise
+    return results, {"stages": timings, "total_ms": round((time.perf_counter() - origin) * 1000, 2)}
+
+
+def format_timings(timings: Dict[str, Any]) -> str:
+    stages = ", ".join(f"{name}={t['ms']}ms" + ("" if t["status"] == "ok" else f"({t['status']})")
+                       for name, t in timings["stages"].items())
+    return f"{stages} (total {timings['total_ms']}ms)"
+
+
+def get_pipeline_stats() -> Dict[str, Dict[str, float]]:
+    """Per-stage run counts, latency and degradations since process start"""
+    return {
+        name: {
+            "runs": int(s["runs"]),
+            "avg_ms": round(s["total_ms"] / s["runs"], 2) if s["runs"] else 0.0,
+            "max_ms": round(s["max_ms"], 2),
+            "timeouts": int(s["timeouts"]),
+            "fallbacks": int(s["fallbacks"])
+        }
+        for name, s in _stage_stats.items()
+    }
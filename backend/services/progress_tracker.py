@@ -1,7 +1,19 @@
 from typing import Dict, List, Any
 from datetime import datetime
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from models.planner_models import InterviewPlan, ProgressLog, Achievement, UserAchievement
+from models.planner_models import (
+    InterviewPlan, ProgressLog, Achievement, UserAchievement, PlanRecommendation, recommendation_progress_update
+)
+
+
+def progress_logs_stmt(plan_id: str, activity_type: str):
+    return select(ProgressLog).where(ProgressLog.plan_id == plan_id, ProgressLog.activity_type == activity_type)
+
+
+def user_plans_stmt(user_id: str):
+    return select(InterviewPlan).where(InterviewPlan.user_id == user_id)
+
 
 class ProgressTracker:
     def __init__(self, db_session: Session):
@@ -9,27 +21,25 @@ class ProgressTracker:
     
     def calculate_plan_progress(self, plan: InterviewPlan) -> Dict[str, Any]:
         """计算计划进度"""
+        # 推荐项数量：按 kind 计数，不加载推荐内容
+        totals = dict(self.db.query(PlanRecommendation.kind, func.count(PlanRecommendation.id)).filter(
+            PlanRecommendation.plan_id == plan.id
+        ).group_by(PlanRecommendation.kind).all())
         progress = {
-            "courses": {"completed": 0, "total": len(plan.recommended_courses or []), "percentage": 0},
-            "projects": {"completed": 0, "total": len(plan.recommended_projects or []), "percentage": 0},
+            "courses": {"completed": 0, "total": totals.get("course", 0), "percentage": 0},
+            "projects": {"completed": 0, "total": totals.get("project", 0), "percentage": 0},
             "interviews": {"completed": plan.interviews_completed, "target": 5, "percentage": 0}
         }
         
         # 计算课程进度
-        course_logs = self.db.query(ProgressLog).filter(
-            ProgressLog.plan_id == plan.id,
-            ProgressLog.activity_type == "course"
-        ).all()
+        course_logs = self.db.execute(progress_logs_stmt(plan.id, "course")).scalars().all()
         
         completed_courses = sum(1 for log in course_logs if log.completed)
         progress["courses"]["completed"] = completed_courses
         progress["courses"]["percentage"] = (completed_courses / progress["courses"]["total"]) * 100 if progress["courses"]["total"] > 0 else 0
         
         # 计算项目进度
-        project_logs = self.db.query(ProgressLog).filter(
-            ProgressLog.plan_id == plan.id,
-            ProgressLog.activity_type == "project"
-        ).all()
+        project_logs = self.db.execute(progress_logs_stmt(plan.id, "project")).scalars().all()
         
         completed_projects = sum(1 for log in project_logs if log.completed)
         progress["projects"]["completed"] = completed_projects
@@ -106,6 +116,11 @@ class ProgressTracker:
             progress_log.completed_at = datetime.utcnow()
         
         self.db.add(progress_log)
+        # 只更新对应的推荐项一行
+        self.db.execute(
+            recommendation_progress_update(plan_id, activity_id, progress_percentage, completed),
+            execution_options={"synchronize_session": False}
+        )
         self.db.commit()
         
         # 检查是否获得新成就
@@ -119,7 +134,7 @@ class ProgressTracker:
     
     def get_user_progress_summary(self, user_id: str) -> Dict[str, Any]:
         """获取用户进度总结"""
-        plans = self.db.query(InterviewPlan).filter(InterviewPlan.user_id == user_id).all()
+        plans = self.db.execute(user_plans_stmt(user_id)).scalars().all()
         
         total_plans = len(plans)
         completed_plans = sum(1 for plan in plans if plan.interviews_completed >= 5)
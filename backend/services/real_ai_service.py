@@ -1,22 +1,29 @@
-import openai
 import json
 import re
 from typing import Dict, List, Any, Optional
 from pathlib import Path
-import PyPDF2
-import docx
-import io
 from config import config
+from llm.llm_backend import chat_completion
+from services.document_extractor import document_extractor, DocumentExtractionError
+from models.jd_analysis_cache import jd_analysis_cache, JD_PROFILE_KIND
+from services.recommendation_catalog import get_recommendation_catalog
 
 class RealAIService:
-    """真实的AI服务，使用OpenAI API"""
+    """真实的AI服务，经由 llm.llm_backend 调用（OpenAI API 或本地模型）"""
     
     def __init__(self, openai_api_key: str):
-        self.client = openai.OpenAI(api_key=openai_api_key)
-        self.model = config.LLM_MODEL  # 使用o4-mini模型
+        self.openai_api_key = openai_api_key
         
     async def analyze_job_description(self, jd_text: str) -> Dict[str, Any]:
-        """智能解析职位描述"""
+        """智能解析职位描述（按规范化JD哈希缓存）"""
+        result = await jd_analysis_cache.aget_or_compute(
+            JD_PROFILE_KIND, config.LLM_EXTRACTION_MODEL, jd_text,
+            lambda: self._request_jd_profile(jd_text)
+        )
+        return result if result is not None else self._parse_jd_fallback(jd_text)
+    
+    async def _request_jd_profile(self, jd_text: str) -> Optional[Dict[str, Any]]:
+        """调用模型解析JD；失败返回 None（不缓存）"""
         try:
             prompt = f"""
             请分析以下职位描述，提取关键信息：
@@ -38,8 +45,8 @@ class RealAIService:
             }}
             """
             
-            response = self.client.chat.completions.create(
-                model=self.model,
+            result = chat_completion(
+                config.LLM_EXTRACTION_MODEL,
                 messages=[
                     {"role": "system", "content": "你是一个专业的职位分析专家，擅长提取职位描述中的关键信息。"},
                     {"role": "user", "content": prompt}
@@ -47,17 +54,16 @@ class RealAIService:
                 temperature=0.3
             )
             
-            result = response.choices[0].message.content
             # 提取JSON部分
             json_match = re.search(r'\{.*\}', result, re.DOTALL)
             if json_match:
                 return json.loads(json_match.group())
             else:
-                return self._parse_jd_fallback(jd_text)
+                return None
                 
         except Exception as e:
             print(f"JD解析失败: {e}")
-            return self._parse_jd_fallback(jd_text)
+            return None
     
     async def analyze_job_match(
         self,
@@ -95,8 +101,8 @@ class RealAIService:
             }}
             """
             
-            response = self.client.chat.completions.create(
-                model=self.model,
+            result = chat_completion(
+                config.LLM_ANALYSIS_MODEL,
                 messages=[
                     {"role": "system", "content": "你是一个专业的技能匹配分析专家。"},
                     {"role": "user", "content": prompt}
@@ -104,7 +110,6 @@ class RealAIService:
                 temperature=0.2
             )
             
-            result = response.choices[0].message.content
             json_match = re.search(r'\{.*\}', result, re.DOTALL)
             if json_match:
                 return json.loads(json_match.group())
@@ -166,8 +171,8 @@ class RealAIService:
             }}
             """
             
-            response = self.client.chat.completions.create(
-                model=self.model,
+            result = chat_completion(
+                config.LLM_ANALYSIS_MODEL,
                 messages=[
                     {"role": "system", "content": "你是一个专业的职业发展顾问，擅长制定个性化学习计划。"},
                     {"role": "user", "content": prompt}
@@ -175,7 +180,6 @@ class RealAIService:
                 temperature=0.3
             )
             
-            result = response.choices[0].message.content
             json_match = re.search(r'\{.*\}', result, re.DOTALL)
             if json_match:
                 return json.loads(json_match.group())
@@ -215,8 +219,8 @@ class RealAIService:
             }}
             """
             
-            response = self.client.chat.completions.create(
-                model=self.model,
+            result = chat_completion(
+                config.LLM_EXTRACTION_MODEL,
                 messages=[
                     {"role": "system", "content": "你是一个专业的简历解析专家，擅长提取简历中的关键信息。"},
                     {"role": "user", "content": prompt}
@@ -224,7 +228,6 @@ class RealAIService:
                 temperature=0.2
             )
             
-            result = response.choices[0].message.content
             json_match = re.search(r'\{.*\}', result, re.DOTALL)
             if json_match:
                 return json.loads(json_match.group())
@@ -237,43 +240,12 @@ class RealAIService:
     
     async def _extract_text_from_file(self, file_path: str) -> str:
         """从文件中提取文本内容"""
-        try:
-            file_path = Path(file_path)
-            if file_path.suffix.lower() == '.pdf':
-                return self._extract_pdf_text(file_path)
-            elif file_path.suffix.lower() in ['.docx', '.doc']:
-                return self._extract_docx_text(file_path)
-            elif file_path.suffix.lower() == '.txt':
-                return file_path.read_text(encoding='utf-8')
-            else:
-                return ""
-        except Exception as e:
-            print(f"文件读取失败: {e}")
+        if Path(file_path).suffix.lower() not in ('.pdf', '.docx', '.doc', '.txt'):
             return ""
-    
-    def _extract_pdf_text(self, file_path: Path) -> str:
-        """提取PDF文本"""
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-                return text
-        except Exception as e:
-            print(f"PDF解析失败: {e}")
-            return ""
-    
-    def _extract_docx_text(self, file_path: Path) -> str:
-        """提取DOCX文本"""
-        try:
-            doc = docx.Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
-        except Exception as e:
-            print(f"DOCX解析失败: {e}")
+            return await document_extractor.extract_text(file_path)
+        except DocumentExtractionError as e:
+            print(f"文件读取失败: {e}")
             return ""
     
     # 备用方法
@@ -312,42 +284,27 @@ class RealAIService:
         }
     
     def _generate_recommendations_fallback(self, analysis_result: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
-        """推荐生成备用方法"""
+        """推荐生成备用方法（索引推荐目录按差距排序）"""
+        gap_analysis = analysis_result.get("gap_analysis") or {}
+        gaps = [
+            {"skill": gap["skill"], "priority": gap.get("gap_level") or gap.get("importance"), "status": "partial"}
+            for gap in gap_analysis.get("skill_gaps", []) if isinstance(gap, dict) and gap.get("skill")
+        ]
+        listed = {gap["skill"] for gap in gaps}
+        gaps += [
+            {"skill": skill, "priority": "high", "status": "missing"}
+            for skill in gap_analysis.get("missing_skills", []) if isinstance(skill, str) and skill not in listed
+        ]
+        gaps += [
+            {"skill": gap["area"], "priority": "medium", "status": "partial"}
+            for gap in gap_analysis.get("experience_gaps", []) if isinstance(gap, dict) and gap.get("area")
+        ]
+        # skill_match 在此服务中是 0-1 的比例
+        skill_match = analysis_result.get("skill_match") or 0
+        recommendations = get_recommendation_catalog().recommend(gaps, skill_match * 100 if skill_match <= 1 else skill_match)
         return {
-            "courses": [
-                {
-                    "id": "course_1",
-                    "title": "Docker容器化实践",
-                    "platform": "Coursera",
-                    "duration": "4周",
-                    "difficulty": "中级",
-                    "url": "https://coursera.org/docker",
-                    "description": "学习Docker容器化技术",
-                    "reason": "提升部署效率"
-                }
-            ],
-            "projects": [
-                {
-                    "id": "project_1",
-                    "title": "微服务架构项目",
-                    "description": "使用Spring Boot + Docker构建微服务",
-                    "duration": "2-3个月",
-                    "tech_stack": ["Spring Boot", "Docker", "MySQL"],
-                    "github_url": "https://github.com/example/microservice",
-                    "reason": "实践微服务架构"
-                }
-            ],
-            "practice": [
-                {
-                    "id": "practice_1",
-                    "title": "系统设计面试练习",
-                    "type": "模拟面试",
-                    "duration": "45分钟",
-                    "focus_areas": ["系统架构", "扩展性", "性能优化"],
-                    "difficulty": "高级",
-                    "reason": "提升系统设计能力"
-                }
-            ]
+            kind: [{**item, "title": item.get("name") or item.get("type")} for item in items]
+            for kind, items in recommendations.items()
         }
     
     def _parse_resume_fallback(self, content: str) -> Dict[str, Any]:
@@ -0,0 +1,194 @@
+# recommendation_cache.py — Version 1.1.1
+# =============================================================================
+# Interview Helper Backend — Semantic Recommendation Cache
+#
+# Overview:
+#   - generate_recommendations spends an LLM call per plan, yet users aiming at the same
+#     role tend to have near-identical gap lists and would get near-identical answers.
+#   - A gap list is canonicalized into a gap vector: the set of (skill, priority) pairs,
+#     skill mapped to its ontology synonym ID (else its normalized name). LLM results are
+#     stored per (gap vector, scope) in the recommendation_cache table; the scope is
+#     recommendation mode + model + catalog version, so changing any of them starts fresh.
+#   - Lookup is exact key first, then nearest neighbour: an inverted index (pair → entries)
+#     counts shared pairs for every candidate in one pass, and the most similar entry is
+#     reused if it reaches RECOMMEND_CACHE_THRESHOLD under RECOMMEND_CACHE_METRIC:
+#       jaccard  |A∩B| / |A∪B|          cosine  |A∩B| / sqrt(|A|·|B|)
+#   - Entries of a scope are loaded from the table on first use (newest
+#     RECOMMEND_CACHE_MAX_ENTRIES), and the in-process index is LRU-bounded to that size.
+#   - Only LLM results are stored; catalog fallbacks are returned uncached so the next
+#     request retries the model. Callers get a deep copy.
+#
+# Usage:
+#   recommendation_cache.bind(db)                     # app startup
+#   cached = await recommendation_cache.lookup(scope, gaps)
+#   await recommendation_cache.store(scope, gaps, recommendations)
+#
+# Author: BeeBee AI Track-B
+# Version: 1.1.1
+# =============================================================================
+
+import asyncio
+import copy
+import hashlib
+import json
+import math
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+from sqlalchemy import select
+from config import config
+from models.recommendation_cache_models import CachedRecommendation
+from services.skill_ontology import SkillOntology, get_skill_ontology
+
+GapVector = FrozenSet[Tuple[str, str]]
+
+
+class _ScopeIndex:
+    """In-process entries of one scope plus the pair → entry-key inverted index"""
+
+    def __init__(self):
+        self.entries: "OrderedDict[str, Tuple[GapVector, Dict[str, Any]]]" = OrderedDict()
+        self.postings: Dict[Tuple[str, str], Set[str]] = {}
+
+    def add(self, key: str, vector: GapVector, recommendations: Dict[str, Any], max_entries: int):
+        if key in self.entries:
+            self.remove(key)
+        self.entries[key] = (vector, recommendations)
+        for pair in vector:
+            self.postings.setdefault(pair, set()).add(key)
+        while len(self.entries) > max_entries:
+            self.remove(next(iter(self.entries)))
+
+    def remove(self, key: str):
+        vector, _ = self.entries.pop(key)
+        for pair in vector:
+            keys = self.postings.get(pair)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.postings[pair]
+
+
+class RecommendationCache:
+    def __init__(self, ontology: Optional[SkillOntology] = None):
+        self.db = None
+        self.ontology = ontology or get_skill_ontology()
+        self.metric = config.RECOMMEND_CACHE_METRIC
+        self.threshold = config.RECOMMEND_CACHE_THRESHOLD
+        self.max_entries = config.RECOMMEND_CACHE_MAX_ENTRIES
+        self._scopes: Dict[str, _ScopeIndex] = {}
+        self._load_lock = asyncio.Lock()
+        self.stats = {"exact_hits": 0, "near_hits": 0, "misses": 0, "stored": 0, "loaded": 0}
+
+    def bind(self, db):
+        """Attach the database; until then the cache is in-process only"""
+        self.db = db
+
+    @staticmethod
+    def scope(mode: str, model: str, catalog_version: str) -> str:
+        return f"{mode}:{model}:catalog-v{catalog_version}"
+
+    def gap_vector(self, gaps: List[Dict[str, Any]]) -> GapVector:
+        pairs = set()
+        for gap in gaps:
+            skill = gap.get("skill")
+            if not isinstance(skill, str) or not skill.strip():
+                continue
+            name = " ".join(unicodedata.normalize("NFKC", skill).casefold().split())
+            pairs.add((self.ontology.canonical_id(name) or name, gap.get("priority") or "medium"))
+        return frozenset(pairs)
+
+    @staticmethod
+    def gap_key(vector: GapVector) -> str:
+        return hashlib.sha256(json.dumps(sorted(vector), ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    def similarity(self, a: GapVector, b: GapVector, shared: Optional[int] = None) -> float:
+        if not a or not b:
+            return 1.0 if a == b else 0.0
+        shared = len(a & b) if shared is None else shared
+        if self.metric == "cosine":
+            return shared / math.sqrt(len(a) * len(b))
+        return shared / (len(a) + len(b) - shared)
+
+    async def _index(self, scope: str) -> _ScopeIndex:
+        index = self._scopes.get(scope)
+        if index is not None:
+            return index
+        async with self._load_lock:
+            index = self._scopes.get(scope)
+            if index is not None:
+                return index
+            index = _ScopeIndex()
+            if self.db is not None:
+                async with self.db.get_async_session() as db_session:
+                    rows = (await db_session.execute(
+                        select(CachedRecommendation.gap_key, CachedRecommendation.gaps, CachedRecommendation.recommendations)
+                        .where(CachedRecommendation.scope == scope)
+                        .order_by(CachedRecommendation.created_at.desc())
+                        .limit(self.max_entries)
+                    )).all()
+                # 由旧到新加入，LRU 顺序与写入时间一致
+                for key, gaps, recommendations in reversed(rows):
+                    index.add(key, frozenset(tuple(pair) for pair in gaps), recommendations, self.max_entries)
+                self.stats["loaded"] += len(rows)
+            self._scopes[scope] = index
+            return index
+
+    async def lookup(self, scope: str, gaps: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Stored recommendations for this gap list or its nearest neighbour above the threshold"""
+        vector = self.gap_vector(gaps)
+        key = self.gap_key(vector)
+        index = await self._index(scope)
+
+        if key in index.entries:
+            index.entries.move_to_end(key)
+            self.stats["exact_hits"] += 1
+            print(f"⚡ 命中推荐缓存: {len(vector)} 项技能差距")
+            return copy.deepcopy(index.entries[key][1])
+
+        shared: Dict[str, int] = {}
+        for pair in vector:
+            for candidate in index.postings.get(pair, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        best_key, best_score = None, 0.0
+        for candidate, count in shared.items():
+            score = self.similarity(vector, index.entries[candidate][0], count)
+            if score > best_score:
+                best_key, best_score = candidate, score
+
+        if best_key is not None and best_score >= self.threshold:
+            index.entries.move_to_end(best_key)
+            self.stats["near_hits"] += 1
+            print(f"⚡ 命中相似推荐缓存: {self.metric}={best_score:.2f} ({len(vector)} 项技能差距)")
+            return copy.deepcopy(index.entries[best_key][1])
+        self.stats["misses"] += 1
+        return None
+
+    async def store(self, scope: str, gaps: List[Dict[str, Any]], recommendations: Dict[str, Any]):
+        vector = self.gap_vector(gaps)
+        key = self.gap_key(vector)
+        recommendations = copy.deepcopy(recommendations)
+        (await self._index(scope)).add(key, vector, recommendations, self.max_entries)
+        self.stats["stored"] += 1
+        if self.db is None:
+            return
+        try:
+            async with self.db.get_async_session() as db_session:
+                await db_session.merge(CachedRecommendation(
+                    gap_key=key, scope=scope, gaps=sorted(vector), recommendations=recommendations
+                ))
+                await db_session.commit()
+        except Exception as e:
+            print(f"⚠️ 推荐缓存写入失败: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "metric": self.metric,
+            "threshold": self.threshold,
+            "entries": sum(len(index.entries) for index in self._scopes.values()),
+            "persistent": self.db is not None
+        }
+
+
+recommendation_cache = RecommendationCache()
@@ -0,0 +1,153 @@
+# recommendation_catalog.py — Version 1.1.1
+# =============================================================================
+# Interview Helper Backend — Indexed Recommendation Catalog
+#
+# Overview:
+#   - Loads data/recommendation_catalog.json (versioned) once per process. Courses,
+#     projects and practice items used to be hard-coded dicts in the planner fallbacks,
+#     picked by a chain of any('python' in gap['skill'].lower() ...) scans.
+#   - Every entry is indexed by the canonical ID of each of its skills (ontology synonym ID,
+#     else the lowercased name) and then by difficulty: index[term][difficulty] → entries.
+#   - recommend() resolves each gap to a term once (whole name first, then its words, so
+#     "Python programming" still finds Python) and scores the entries it reaches in one
+#     pass: gap priority weight × difficulty fit. Missing skills prefer 初级/中级 entries,
+#     partial skills 中级/高级.
+#   - Ranked results are complete recommendation dicts; the LLM only re-ranks / annotates
+#     them (PLANNER_RECOMMEND_LLM=rerank) or is skipped entirely (=off).
+#
+# Usage:
+#   catalog = get_recommendation_catalog()
+#   catalog.recommend(analysis_result["gaps"], analysis_result["skill_match"])
+#
+# Author: BeeBee AI Track-B
+# Version: 1.1.1
+# =============================================================================
+
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from config import config
+from services.skill_ontology import SkillOntology, get_skill_ontology
+
+KINDS = ("courses", "projects", "practice")
+DIFFICULTIES = ("初级", "中级", "高级")
+PRIORITY_WEIGHTS = {"high": 3.0, "medium": 2.0, "low": 1.0}
+# 差距状态 → 合适的难度
+PREFERRED_DIFFICULTY = {"missing": ("初级", "中级"), "partial": ("中级", "高级")}
+DIFFICULTY_MISMATCH = 0.6
+INDEX_FIELDS = ("skills", "always", "max_skill_match")
+
+_WORD = re.compile(r"[a-z0-9+#./-]+|[\u4e00-\u9fff]+")
+
+
+class RecommendationCatalog:
+    def __init__(self, data: Dict, ontology: Optional[SkillOntology] = None):
+        self.version = str(data.get("version", "0"))
+        self.ontology = ontology or get_skill_ontology()
+        self.entries: Dict[str, List[Dict[str, Any]]] = {kind: data.get(kind, []) for kind in KINDS}
+
+        # term → difficulty → [(kind, position)]
+        self.index: Dict[str, Dict[str, List[Tuple[str, int]]]] = {}
+        self.always: List[Tuple[str, int]] = []
+        for kind, entries in self.entries.items():
+            for position, entry in enumerate(entries):
+                if entry.get("always"):
+                    self.always.append((kind, position))
+                for skill in entry.get("skills", []):
+                    postings = self.index.setdefault(self.term(skill), {}).setdefault(entry.get("difficulty", "中级"), [])
+                    if (kind, position) not in postings:
+                        postings.append((kind, position))
+        self.stats = {"queries": 0}
+
+    def term(self, skill: str) -> str:
+        return self.ontology.canonical_id(skill) or skill.strip().lower()
+
+    def _gap_terms(self, skill: str) -> List[str]:
+        """Index terms a gap skill reaches: its whole name, else each of its words"""
+        term = self.term(skill)
+        if term in self.index:
+            return [term]
+        terms = []
+        for word in _WORD.findall(skill.lower()):
+            word_term = self.term(word)
+            if word_term in self.index and word_term not in terms:
+                terms.append(word_term)
+        return terms
+
+    def recommend(
+        self,
+        gaps: List[Dict[str, Any]],
+        skill_match: float = 0,
+        limit: Optional[int] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Best catalog entries per kind for a gap list ({"skill", "priority", "status"} dicts)"""
+        self.stats["queries"] += 1
+        limit = limit or config.RECOMMEND_CATALOG_LIMIT
+        scores: Dict[Tuple[str, int], float] = {}
+        covered: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+
+        for gap in gaps:
+            skill = gap.get("skill")
+            if not isinstance(skill, str) or not skill.strip():
+                continue
+            weight = PRIORITY_WEIGHTS.get(gap.get("priority"), 1.0)
+            preferred = PREFERRED_DIFFICULTY.get(gap.get("status"), DIFFICULTIES)
+            for term in self._gap_terms(skill):
+                for difficulty, postings in self.index[term].items():
+                    fit = 1.0 if difficulty in preferred else DIFFICULTY_MISMATCH
+                    for key in postings:
+                        gaps_for_entry = covered.setdefault(key, [])
+                        if gap in gaps_for_entry:
+                            continue
+                        gaps_for_entry.append(gap)
+                        scores[key] = scores.get(key, 0.0) + weight * fit
+
+        ranked = sorted(scores, key=lambda key: (-scores[key], key[1]))
+        for key in self.always:
+            max_skill_match = self.entries[key[0]][key[1]].get("max_skill_match")
+            if key not in scores and (max_skill_match is None or skill_match < max_skill_match):
+                ranked.append(key)
+
+        results: Dict[str, List[Dict[str, Any]]] = {kind: [] for kind in KINDS}
+        for kind, position in ranked:
+            if len(results[kind]) < limit:
+                results[kind].append(self._render(kind, self.entries[kind][position], covered.get((kind, position), [])))
+        return results
+
+    @staticmethod
+    def _render(kind: str, entry: Dict[str, Any], gaps: List[Dict[str, Any]]) -> Dict[str, Any]:
+        item = {key: value for key, value in entry.items() if key not in INDEX_FIELDS}
+        gap_skills = [gap["skill"] for gap in gaps]
+        if kind == "courses":
+            item["target_skill"] = gap_skills[0] if gap_skills else entry.get("skills", [""])[0]
+            priorities = [gap.get("priority") for gap in gaps]
+            item["priority"] = next((p for p in ("high", "medium", "low") if p in priorities), "medium")
+        else:
+            item["target_skills"] = gap_skills + [s for s in entry.get("skills", []) if s not in gap_skills]
+        item["matched_gaps"] = gap_skills
+        item["reason"] = f"弥补技能差距: {', '.join(gap_skills)}" if gap_skills else "通用面试准备"
+        return item
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "version": self.version,
+            "entries": {kind: len(entries) for kind, entries in self.entries.items()},
+            "terms": len(self.index)
+        }
+
+
+def load_recommendation_catalog(path: Optional[Path] = None) -> RecommendationCatalog:
+    with open(path or config.RECOMMENDATION_CATALOG_PATH, "r", encoding="utf-8") as f:
+        catalog = RecommendationCatalog(json.load(f))
+    print(f">>> Recommendation catalog v{catalog.version} loaded: "
+          f"{sum(len(entries) for entries in catalog.entries.values())} entries, {len(catalog.index)} skill terms")
+    return catalog
+
+
+@lru_cache(maxsize=1)
+def get_recommendation_catalog() -> RecommendationCatalog:
+    """Process-wide indexed catalog"""
+    return load_recommendation_catalog()
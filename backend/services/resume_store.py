@@ -0,0 +1,89 @@
+# resume_store.py — Version 1.1.1
+# =============================================================================
+# Interview Helper Backend — Content-Addressed Resume Uploads
+#
+# Overview:
+#   - Uploads used to be written as uploads/resumes/<plan_id>_<filename>, so the same PDF
+#     uploaded to several plans was stored (and parsed by the LLM) once per upload.
+#   - store_upload() streams the upload to a temp file in chunks, hashing as it writes,
+#     then moves it to config.RESUME_STORE_DIR/<sha256><ext>. A file whose content is
+#     already stored is discarded and the existing copy is reused.
+#   - Stored files are shared by every plan (and queued upload task) with the same content,
+#     so the upload path never deletes them, not even when parsing fails: a later upload of
+#     the same bytes may already point at the file. An unreferenced file only costs disk.
+#   - The parsed profile is cached in resume_parses per (content hash, parser version)
+#     (see repositories.get_resume_parse), so a re-upload skips text extraction and the
+#     parse_resume LLM call entirely. Bumping the parser version re-parses on next upload.
+#
+# Usage:
+#   stored = await store_upload(file)
+#   stored.path, stored.content_hash, stored.deduplicated
+#
+# Author: BeeBee AI Track-B
+# Version: 1.1.1
+# =============================================================================
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+from fastapi import UploadFile
+from config import config
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class StoredUpload:
+    def __init__(self, path: Path, content_hash: str, size: int, deduplicated: bool):
+        self.path = path
+        self.content_hash = content_hash
+        self.size = size
+        self.deduplicated = deduplicated  # True when the content was already stored
+
+    @property
+    def relative_path(self) -> str:
+        """Path as saved on the plan (relative to the backend directory, as before)"""
+        try:
+            return str(self.path.relative_to(config.BASE_DIR))
+        except ValueError:
+            return str(self.path)
+
+
+async def store_upload(
+    upload: UploadFile,
+    directory: Optional[Path] = None,
+    max_bytes: Optional[int] = None
+) -> StoredUpload:
+    """Stream an upload to the content-addressed store; raises ValueError if larger than max_bytes"""
+    directory = Path(directory or config.RESUME_STORE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    max_bytes = max_bytes or config.MAX_FILE_SIZE
+    suffix = Path(upload.filename or "").suffix.lower()
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".incoming-")
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while True:
+                chunk = await upload.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError(f"文件超过大小限制 {max_bytes} 字节")
+                digest.update(chunk)
+                buffer.write(chunk)
+
+        content_hash = digest.hexdigest()
+        path = directory / f"{content_hash}{suffix}"
+        if path.exists():
+            os.remove(temp_path)
+            return StoredUpload(path, content_hash, size, deduplicated=True)
+        os.replace(temp_path, path)
+        return StoredUpload(path, content_hash, size, deduplicated=False)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
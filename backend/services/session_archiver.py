@@ -0,0 +1,187 @@
+# session_archiver.py — Version 1.1.1
+# =============================================================================
+# Interview Helper Backend — Cold-Storage Archival of Finished Sessions
+#
+# Overview:
+#   - Moves interview sessions that ended more than N days ago (and their questions) out of
+#     the live database into append-only gzip JSONL segments under config.ARCHIVE_DIR.
+#   - Each session is one JSON line compressed as its own gzip member, so a segment is
+#     still a valid .jsonl.gz file (zcat works) and any record can be read with one seek.
+#   - The offset index (session_id → segment, offset, length) lives in the small
+#     archived_sessions table; GET /api/sessions/{id} reads through to it when the
+#     session is no longer in the live tables.
+#   - Freed pages are returned with PRAGMA incremental_vacuum in short steps, so the
+#     SQLite file shrinks without an exclusive full VACUUM.
+#
+# Crash safety:
+#   Records are appended and fsynced before the index rows are inserted and the live rows
+#   deleted (one transaction per batch). A crash in between only leaves unreferenced bytes
+#   in a segment; the sessions are archived again on the next run.
+#
+# Usage:
+#   python -m services.session_archiver [--days N] [--full-vacuum] [database_url]
+#
+# Author: BeeBee AI Track-B
+# Version: 1.1.1
+# =============================================================================
+
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from sqlalchemy import select, delete
+from sqlalchemy.orm import Session, selectinload
+from config import config
+from models.database import InterviewSession, Question
+from models.archive_models import ArchivedSession
+
+SEGMENT_PREFIX = "sessions-"
+SEGMENT_SUFFIX = ".jsonl.gz"
+
+
+def _row_to_dict(obj) -> Dict[str, Any]:
+    return {column.name: getattr(obj, column.name) for column in obj.__table__.columns}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def session_record(session: InterviewSession) -> Dict[str, Any]:
+    """Archive record: session columns, job title/category and every question, by order_index"""
+    record = _row_to_dict(session)
+    record["job"] = {
+        "title": session.job.title if session.job else None,
+        "category": session.job.category if session.job else None
+    }
+    record["questions"] = [
+        _row_to_dict(q) for q in sorted(session.questions, key=lambda q: q.order_index or 0)
+    ]
+    return record
+
+
+def read_archived_record(segment: str, offset: int, length: int, archive_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """Read one session record from a segment (blocking file I/O; run in a thread from handlers)"""
+    path = Path(archive_dir or config.ARCHIVE_DIR) / segment
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read(length)
+    return json.loads(gzip.decompress(data).decode("utf-8"))
+
+
+class SessionArchiver:
+    def __init__(self, db, archive_dir: Optional[Path] = None, segment_max_bytes: Optional[int] = None):
+        self.db = db
+        self.archive_dir = Path(archive_dir or config.ARCHIVE_DIR)
+        self.segment_max_bytes = segment_max_bytes or config.SESSION_ARCHIVE_SEGMENT_MAX_MB * 1024 * 1024
+
+    def _current_segment(self) -> Path:
+        """Newest segment, or a new one once it reaches segment_max_bytes"""
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        segments = sorted(self.archive_dir.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"))
+        if segments and segments[-1].stat().st_size < self.segment_max_bytes:
+            return segments[-1]
+        number = int(segments[-1].name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) + 1 if segments else 1
+        return self.archive_dir / f"{SEGMENT_PREFIX}{number:06d}{SEGMENT_SUFFIX}"
+
+    def _append(self, records: List[Dict[str, Any]]) -> List[ArchivedSession]:
+        segment = self._current_segment()
+        entries = []
+        with open(segment, "ab") as f:
+            for record in records:
+                line = json.dumps(record, ensure_ascii=False, default=_json_default) + "\n"
+                data = gzip.compress(line.encode("utf-8"))
+                entries.append(ArchivedSession(
+                    session_id=record["id"],
+                    user_id=record.get("user_id"),
+                    segment=segment.name,
+                    offset=f.tell(),
+                    length=len(data),
+                    ended_at=record.get("end_time")
+                ))
+                f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        return entries
+
+    def archive(self, older_than_days: Optional[int] = None, batch_size: Optional[int] = None) -> int:
+        """Archive sessions ended before now - older_than_days; returns the number archived"""
+        days = config.SESSION_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+        batch_size = batch_size or config.SESSION_ARCHIVE_BATCH_SIZE
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        archived = 0
+        while True:
+            session: Session = self.db.get_session()
+            try:
+                sessions = session.execute(
+                    select(InterviewSession)
+                    .options(selectinload(InterviewSession.job), selectinload(InterviewSession.questions))
+                    .where(InterviewSession.end_time.isnot(None), InterviewSession.end_time < cutoff)
+                    .order_by(InterviewSession.end_time)
+                    .limit(batch_size)
+                ).scalars().all()
+                if not sessions:
+                    break
+                entries = self._append([session_record(s) for s in sessions])
+                ids = [s.id for s in sessions]
+                # 索引写入与删除在同一事务：要么都生效，要么下次重新归档
+                session.add_all(entries)
+                session.execute(delete(Question).where(Question.session_id.in_(ids)))
+                session.execute(delete(InterviewSession).where(InterviewSession.id.in_(ids)))
+                session.commit()
+                archived += len(ids)
+                print(f"📦 已归档 {len(ids)} 个会话 -> {entries[0].segment}")
+            finally:
+                session.close()
+        return archived
+
+    def vacuum(self, full: bool = False, step_pages: int = 1000) -> Dict[str, Any]:
+        """Return free pages to the OS; incremental unless the file predates auto_vacuum"""
+        engine = self.db.engine
+        if engine.dialect.name != "sqlite":
+            return {"mode": "skipped"}
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            auto_vacuum = conn.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+            before = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+            if auto_vacuum != 2:
+                if not full:
+                    print("⚠️ 数据库未启用 auto_vacuum=INCREMENTAL，需执行一次 --full-vacuum 转换")
+                    return {"mode": "none", "free_pages": before}
+                # 一次性转换：之后均可在线增量回收
+                conn.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+                conn.exec_driver_sql("VACUUM")
+                return {"mode": "full", "freed_pages": before}
+            # 分步回收，每步只短暂持有写锁
+            remaining = before
+            while remaining > 0:
+                # 该 pragma 每执行一步回收一页；pysqlite 对无结果列的语句只执行一步（fetchall 也不会继续），
+                # executescript 经 sqlite3_exec 执行到底，每条语句回收至多 step_pages 页
+                conn.connection.driver_connection.executescript(f"PRAGMA incremental_vacuum({step_pages})")
+                left = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+                if left >= remaining:
+                    break
+                remaining = left
+            return {"mode": "incremental", "freed_pages": before - remaining}
+
+
+if __name__ == "__main__":
+    import argparse
+    from models.database import Database
+    from models.migrations import run_startup_steps
+
+    parser = argparse.ArgumentParser(description="Archive finished interview sessions to cold storage")
+    parser.add_argument("database_url", nargs="?", default=config.DATABASE_URL)
+    parser.add_argument("--days", type=int, default=config.SESSION_ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--full-vacuum", action="store_true", help="one-time VACUUM to enable incremental vacuum")
+    args = parser.parse_args()
+
+    database = Database(args.database_url)
+    run_startup_steps(database)
+    archiver = SessionArchiver(database)
+    count = archiver.archive(args.days)
+    print(f"✅ 共归档 {count} 个会话（结束超过 {args.days} 天）")
+    print(f"🧹 vacuum: {archiver.vacuum(full=args.full_vacuum)}")
@@ -0,0 +1,179 @@
+# skill_extractor.py — Version 1.1.1
+# =============================================================================
+# Interview Helper Backend — Multi-Pattern Skill Extraction (Aho–Corasick)
+#
+# Overview:
+#   - Compiles every skill name and alias in the skill ontology (categories, synonym
+#     groups, similar-skills table) into one Aho–Corasick automaton, built once per process.
+#   - A JD or resume is lowercased and scanned in a single pass, independent of the number
+#     of skills; each hit reports its position, the alias that matched and its canonical
+#     skill ID, and hits are counted per canonical skill.
+#   - ASCII word boundaries are enforced at pattern edges that are letters/digits, so "Go"
+#     no longer matches "Google" and "Java" no longer matches "JavaScript"; "C++" or
+#     Chinese skills need no boundary on their non-alphanumeric / CJK edges.
+#   - A hit names a category skill only when the matched term is that skill or an alias of
+#     exactly one category skill ("k8s" → Kubernetes, "py" → Python), which is how
+#     _fallback_skill_extraction finds category skills without the LLM. Synonym groups are
+#     transitive and can span several category skills (sql / database / mysql / postgresql),
+#     so a group is never expanded: "SQL" stays "SQL" and is not reported as MySQL +
+#     PostgreSQL, and "machine learning" is not renamed to its group ID 机器学习.
+#
+# Usage:
+#   extractor = get_skill_extractor()
+#   extractor.scan(text)                  # [SkillMatch(start, end, term, canonical), ...]
+#   extractor.category_skills(text)       # [{"skill", "category", "count"}] in category order
+#   extractor.skill_names(text)           # category names where unambiguous, else as written
+#
+# Author: BeeBee AI Track-B
+# Version: 1.1.1
+# =============================================================================
+
+from collections import Counter, deque
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional
+from services.skill_ontology import SkillOntology, get_skill_ontology
+
+
+class SkillMatch(NamedTuple):
+    start: int        # 在小写文本中的起止位置（对 ASCII / 中文与原文一致）
+    end: int
+    term: str         # 命中的别名（小写）
+    canonical: str    # 本体中的规范技能ID
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isascii() and ch.isalnum()
+
+
+class SkillExtractor:
+    def __init__(self, ontology: SkillOntology):
+        self.ontology = ontology
+
+        terms = set()
+        for skills in ontology.categories.values():
+            terms.update(skills)
+        for skill, similar in ontology.similar_skills.items():
+            terms.add(skill)
+            terms.update(similar)
+        terms.update(ontology.alias_to_canonical)
+        # term (小写) → canonical ID；不在同义词组中的技能自成一组
+        self.term_to_canonical: Dict[str, str] = {}
+        for term in terms:
+            lowered = term.lower().strip()
+            if len(lowered) >= 2:
+                self.term_to_canonical[lowered] = ontology.alias_to_canonical.get(lowered, lowered)
+
+        # canonical ID → 对应的分类技能（按分类顺序）
+        self.canonical_skills: Dict[str, List[str]] = {}
+        for skills in ontology.categories.values():
+            for skill in skills:
+                canonical = self.term_to_canonical[skill.lower()]
+                if skill not in self.canonical_skills.setdefault(canonical, []):
+                    self.canonical_skills[canonical].append(skill)
+
+        # term → 分类技能：技能名本身，或只对应一个分类技能的别名（同义词组不展开）
+        self.term_to_skill: Dict[str, str] = {}
+        for term, canonical in self.term_to_canonical.items():
+            skills = self.canonical_skills.get(canonical, [])
+            if len(skills) == 1:
+                self.term_to_skill[term] = skills[0]
+        for skills in ontology.categories.values():
+            for skill in skills:
+                self.term_to_skill[skill.lower()] = skill
+
+        self._build(self.term_to_canonical)
+
+    def _build(self, terms: Dict[str, str]):
+        """Trie goto table, failure links and merged output lists"""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        for term in terms:
+            state = 0
+            for ch in term:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = nxt
+            self._output[state].append(term)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+    def scan(self, text: Optional[str]) -> List[SkillMatch]:
+        """All word-bounded skill mentions in text, in order of end position (overlaps kept)"""
+        if not text:
+            return []
+        lowered = text.lower()
+        goto, fail, output = self._goto, self._fail, self._output
+        matches = []
+        state = 0
+        for index, ch in enumerate(lowered):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for term in output[state]:
+                start = index - len(term) + 1
+                if _is_word_char(term[0]) and start > 0 and _is_word_char(lowered[start - 1]):
+                    continue
+                if _is_word_char(term[-1]) and index + 1 < len(lowered) and _is_word_char(lowered[index + 1]):
+                    continue
+                matches.append(SkillMatch(start, index + 1, term, self.term_to_canonical[term]))
+        return matches
+
+    def count(self, text: Optional[str]) -> Counter:
+        """Mentions per canonical skill ID"""
+        return Counter(match.canonical for match in self.scan(text))
+
+    def category_skills(self, text: Optional[str]) -> List[Dict[str, Any]]:
+        """Category skills mentioned in text (by name or an unambiguous alias), in category order"""
+        counts = Counter(
+            self.term_to_skill[match.term] for match in self.scan(text) if match.term in self.term_to_skill
+        )
+        found = []
+        for category, skills in self.ontology.categories.items():
+            for skill in skills:
+                if counts[skill]:
+                    found.append({"skill": skill, "category": category, "count": counts[skill]})
+        return found
+
+    def skill_names(self, text: Optional[str]) -> List[str]:
+        """Distinct skills mentioned in text, most frequent first
+
+        Category skill name where the term maps to exactly one, else the term as first written.
+        """
+        # 包含在更长命中里的词（"design patterns" 中的 "patterns"）不单独计入：按起点扫描一次
+        matches = []
+        covered_to = -1
+        for match in sorted(self.scan(text), key=lambda match: (match.start, -match.end)):
+            if match.end > covered_to:
+                matches.append(match)
+                covered_to = match.end
+        # 小写不改变长度时（ASCII / 中文）按位置取原文写法
+        aligned = len(text or "") == len((text or "").lower())
+        counts: Counter = Counter()
+        names: Dict[str, str] = {}
+        for match in matches:
+            name = self.term_to_skill.get(match.term) or (text[match.start:match.end] if aligned else match.term)
+            key = name.lower()
+            names.setdefault(key, name)
+            counts[key] += 1
+        return [names[key] for key, _ in counts.most_common()]
+
+
+@lru_cache(maxsize=1)
+def get_skill_extractor() -> SkillExtractor:
+    """Process-wide automaton over the compiled ontology"""
+    return SkillExtractor(get_skill_ontology())
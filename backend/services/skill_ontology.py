@@ -0,0 +1,127 @@
+# skill_ontology.py — Version 1.1.1
+# =============================================================================
+# Interview Helper Backend — Compiled Skill Ontology
+#
+# Overview:
+#   - Loads data/skill_ontology.json (versioned) once per process and compiles it into
+#     lookup tables, replacing the dict literals PlannerAnalysisService used to rebuild on
+#     every similarity call / every JD skill.
+#   - Every synonym alias maps to a canonical skill ID (overlapping synonym groups are
+#     merged), raw skill names map to their categories, and the "similar skills" table
+#     becomes a set of directed edges. Pairwise similarity is then a few dict/set lookups,
+#     and results are memoized per (text1, text2) pair.
+#
+# Similarity rules (same order and scores as before):
+#   1.0  equal ignoring case            0.85 same canonical synonym ID
+#   0.9  similar-skills edge (raw)      0.6  share a category (raw names)
+#   0.8  one contains the other         0.4  share a word
+#                                       0.1  otherwise
+#
+# Usage:
+#   ontology = get_skill_ontology()
+#   ontology.similarity("Docker", "k8s")
+#
+# Author: BeeBee AI Track-B
+# Version: 1.1.1
+# =============================================================================
+
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+from config import config
+
+
+class SkillOntology:
+    def __init__(self, data: Dict):
+        self.version = str(data.get("version", "0"))
+        self.categories: Dict[str, List[str]] = data.get("categories", {})
+        self.similar_skills: Dict[str, List[str]] = data.get("similar_skills", {})
+        self.jd_skill_mappings: Dict[str, List[str]] = data.get("jd_skill_mappings", {})
+
+        # raw skill name → categories it belongs to
+        self.skill_to_categories: Dict[str, FrozenSet[str]] = {}
+        for category, skills in self.categories.items():
+            for skill in skills:
+                self.skill_to_categories[skill] = self.skill_to_categories.get(skill, frozenset()) | {category}
+
+        # similar-skills edges, checked in both directions
+        self.similar_edges: Set[Tuple[str, str]] = set()
+        for skill, similar in self.similar_skills.items():
+            for other in similar:
+                self.similar_edges.add((skill, other))
+                self.similar_edges.add((other, skill))
+
+        self.alias_to_canonical = self._compile_synonyms(data.get("synonym_groups", {}))
+
+        # lowercased user skill alias → extra terms it implies
+        self.user_skill_expansions: Dict[str, List[str]] = {}
+        for rule in data.get("user_skill_expansions", []):
+            for alias in rule["aliases"]:
+                self.user_skill_expansions.setdefault(alias.lower(), list(rule["adds"]))
+
+        self._similarity = lru_cache(maxsize=65536)(self._compute_similarity)
+
+    @staticmethod
+    def _compile_synonyms(groups: Dict[str, List[str]]) -> Dict[str, str]:
+        """Union overlapping synonym groups; each alias (lowercased) → canonical ID"""
+        parent: Dict[str, str] = {}
+
+        def find(term: str) -> str:
+            parent.setdefault(term, term)
+            while parent[term] != term:
+                parent[term] = parent[parent[term]]
+                term = parent[term]
+            return term
+
+        for head, aliases in groups.items():
+            root = find(head.lower())
+            for alias in aliases:
+                other = find(alias.lower())
+                if other != root:
+                    parent[other] = root
+        return {term: find(term) for term in parent}
+
+    def canonical_id(self, term: str) -> Optional[str]:
+        return self.alias_to_canonical.get(term.lower())
+
+    def categories_of(self, skill: str) -> FrozenSet[str]:
+        return self.skill_to_categories.get(skill, frozenset())
+
+    def expand_user_skill(self, skill: str) -> List[str]:
+        """Terms implied by a user skill (e.g. pytorch → machine learning), not including itself"""
+        return self.user_skill_expansions.get(skill.lower(), [])
+
+    def similarity(self, text1: str, text2: str) -> float:
+        return self._similarity(text1, text2)
+
+    def _compute_similarity(self, text1: str, text2: str) -> float:
+        lower1, lower2 = text1.lower(), text2.lower()
+        if lower1 == lower2:
+            return 1.0
+        if (text1, text2) in self.similar_edges:
+            return 0.9
+        if lower1 in lower2 or lower2 in lower1:
+            return 0.8
+        canonical1 = self.alias_to_canonical.get(lower1)
+        if canonical1 is not None and canonical1 == self.alias_to_canonical.get(lower2):
+            return 0.85
+        if self.categories_of(text1) & self.categories_of(text2):
+            return 0.6
+        if set(lower1.split()) & set(lower2.split()):
+            return 0.4
+        return 0.1
+
+
+def load_skill_ontology(path: Optional[Path] = None) -> SkillOntology:
+    with open(path or config.SKILL_ONTOLOGY_PATH, "r", encoding="utf-8") as f:
+        ontology = SkillOntology(json.load(f))
+    print(f">>> Skill ontology v{ontology.version} loaded: {len(ontology.alias_to_canonical)} aliases, "
+          f"{len(ontology.skill_to_categories)} categorized skills")
+    return ontology
+
+
+@lru_cache(maxsize=1)
+def get_skill_ontology() -> SkillOntology:
+    """Process-wide compiled ontology"""
+    return load_skill_ontology()
@@ -0,0 +1,203 @@
+from typing import Dict, List, Any, Optional
+from sqlalchemy import select, func, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import sqlite, postgresql
+from models.database import Job, InterviewSession
+from models.stats_models import UserStatsRollup, UserRoleStatsRollup, ALL_USERS_SCOPE
+
+_UPSERT_DIALECTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def _scopes(user_id: Optional[str]) -> List[str]:
+    return [ALL_USERS_SCOPE, user_id] if user_id else [ALL_USERS_SCOPE]
+
+
+def totals_stmt(user_id: Optional[str]):
+    stmt = select(
+        func.count(InterviewSession.id),
+        func.count(InterviewSession.overall_score),
+        func.coalesce(func.sum(InterviewSession.overall_score), 0.0),
+        func.coalesce(func.sum(InterviewSession.duration_seconds), 0)
+    )
+    if user_id:
+        stmt = stmt.where(InterviewSession.user_id == user_id)
+    return stmt
+
+
+def _role_counts_stmt(user_id: Optional[str]):
+    stmt = select(
+        InterviewSession.job_id,
+        func.count(InterviewSession.id).label("session_count")
+    ).group_by(InterviewSession.job_id)
+    if user_id:
+        stmt = stmt.where(InterviewSession.user_id == user_id)
+    return stmt
+
+
+def top_role_fallback_stmt(user_id: Optional[str]):
+    """Most practiced job title via GROUP BY, for scopes without a rollup row"""
+    role_counts = _role_counts_stmt(user_id).subquery()
+    return (
+        select(Job.title)
+        .join(role_counts, role_counts.c.job_id == Job.id)
+        .order_by(role_counts.c.session_count.desc())
+        .limit(1)
+    )
+
+
+def recent_sessions_stmt(user_id: Optional[str], limit: int = 5):
+    """Newest sessions via the (user_id, start_time) / (start_time) indexes"""
+    stmt = (
+        select(InterviewSession.id, Job.title, InterviewSession.start_time,
+               InterviewSession.overall_score, InterviewSession.duration_seconds)
+        .join(Job, Job.id == InterviewSession.job_id)
+        .order_by(InterviewSession.start_time.desc())
+        .limit(limit)
+    )
+    if user_id:
+        stmt = stmt.where(InterviewSession.user_id == user_id)
+    return stmt
+
+
+class StatsService:
+    """/api/stats: O(1) rollup reads, updated in the same transaction as session start/end
+
+    Falls back to SQL GROUP BY / ORDER BY ... LIMIT queries when a scope has no rollup row yet.
+    """
+
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+
+    async def _bump(self, scope: str, **deltas):
+        """Atomic upsert: add deltas to the scope's rollup row"""
+        dialect = self.db.get_bind().dialect.name
+        if dialect in _UPSERT_DIALECTS:
+            insert = _UPSERT_DIALECTS[dialect]
+            stmt = insert(UserStatsRollup).values(scope=scope, **deltas)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[UserStatsRollup.scope],
+                set_={name: getattr(UserStatsRollup, name) + getattr(stmt.excluded, name) for name in deltas}
+            )
+            await self.db.execute(stmt)
+            return
+        row = await self.db.get(UserStatsRollup, scope)
+        if row is None:
+            row = UserStatsRollup(scope=scope, total_sessions=0, scored_sessions=0, score_sum=0.0, total_practice_time=0)
+            self.db.add(row)
+        for name, delta in deltas.items():
+            setattr(row, name, (getattr(row, name) or 0) + delta)
+
+    async def _bump_role(self, scope: str, job_id: str):
+        dialect = self.db.get_bind().dialect.name
+        if dialect in _UPSERT_DIALECTS:
+            insert = _UPSERT_DIALECTS[dialect]
+            stmt = insert(UserRoleStatsRollup).values(scope=scope, job_id=job_id, session_count=1)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[UserRoleStatsRollup.scope, UserRoleStatsRollup.job_id],
+                set_={"session_count": UserRoleStatsRollup.session_count + 1}
+            )
+            await self.db.execute(stmt)
+            return
+        row = await self.db.get(UserRoleStatsRollup, (scope, job_id))
+        if row is None:
+            self.db.add(UserRoleStatsRollup(scope=scope, job_id=job_id, session_count=1))
+        else:
+            row.session_count += 1
+
+    async def record_session_started(self, session: InterviewSession):
+        """Count a new session; caller commits"""
+        for scope in _scopes(session.user_id):
+            await self._bump(scope, total_sessions=1)
+            await self._bump_role(scope, session.job_id)
+
+    async def record_session_ended(
+        self,
+        session: InterviewSession,
+        previous_score: Optional[float],
+        previous_duration: Optional[int]
+    ):
+        """Apply score/duration changes of an ended session; safe to call again if a session is re-ended"""
+        scored_delta = (session.overall_score is not None) - (previous_score is not None)
+        score_delta = (session.overall_score or 0.0) - (previous_score or 0.0)
+        time_delta = (session.duration_seconds or 0) - (previous_duration or 0)
+        if not (scored_delta or score_delta or time_delta):
+            return
+        for scope in _scopes(session.user_id):
+            await self._bump(scope, scored_sessions=scored_delta, score_sum=score_delta, total_practice_time=time_delta)
+
+    async def get_statistics(self, user_id: Optional[str] = None) -> Dict[str, Any]:
+        scope = user_id or ALL_USERS_SCOPE
+        rollup = await self.db.get(UserStatsRollup, scope)
+        if rollup is not None:
+            total, scored, score_sum, total_time = (
+                rollup.total_sessions, rollup.scored_sessions, rollup.score_sum, rollup.total_practice_time
+            )
+            role_rows = await self.db.execute(
+                select(Job.title)
+                .join(UserRoleStatsRollup, UserRoleStatsRollup.job_id == Job.id)
+                .where(UserRoleStatsRollup.scope == scope)
+                .order_by(UserRoleStatsRollup.session_count.desc())
+                .limit(1)
+            )
+        else:
+            # 回退：SQL聚合
+            total, scored, score_sum, total_time = (await self.db.execute(totals_stmt(user_id))).one()
+            role_rows = await self.db.execute(top_role_fallback_stmt(user_id))
+        most_practiced = role_rows.scalar()
+        if not total:
+            return {
+                "total_sessions": 0,
+                "average_score": 0,
+                "total_practice_time": 0,
+                "most_practiced_role": None
+            }
+        return {
+            "total_sessions": total,
+            "average_score": round(score_sum / scored, 2) if scored else 0.0,
+            "total_practice_time": total_time,
+            "most_practiced_role": most_practiced,
+            "recent_sessions": await self._recent_sessions(user_id)
+        }
+
+    async def _recent_sessions(self, user_id: Optional[str], limit: int = 5) -> List[Dict[str, Any]]:
+        """Newest sessions (recent_sessions_stmt)"""
+        rows = await self.db.execute(recent_sessions_stmt(user_id, limit))
+        return [
+            {"id": sid, "job_title": title, "date": start_time, "score": score, "duration": duration}
+            for sid, title, start_time, score, duration in rows.all()
+        ]
+
+
+def rebuild_stats_rollups(db_session: Session) -> int:
+    """Recompute every rollup from interview_sessions (startup backfill); returns rows written"""
+    db_session.execute(delete(UserRoleStatsRollup))
+    db_session.execute(delete(UserStatsRollup))
+    user_ids = [row[0] for row in db_session.execute(
+        select(InterviewSession.user_id).where(InterviewSession.user_id.isnot(None)).distinct()
+    )]
+    written = 0
+    for user_id in [None] + user_ids:
+        scope = user_id or ALL_USERS_SCOPE
+        total, scored, score_sum, total_time = db_session.execute(totals_stmt(user_id)).one()
+        if not total:
+            continue
+        db_session.add(UserStatsRollup(
+            scope=scope, total_sessions=total, scored_sessions=scored,
+            score_sum=float(score_sum), total_practice_time=int(total_time)
+        ))
+        for job_id, count in db_session.execute(_role_counts_stmt(user_id)):
+            db_session.add(UserRoleStatsRollup(scope=scope, job_id=job_id, session_count=count))
+        written += 1
+    db_session.commit()
+    return written
+
+
+def ensure_stats_rollups(db_session: Session) -> bool:
+    """Backfill rollups for databases created before the rollup tables existed"""
+    has_rollups = db_session.execute(select(UserStatsRollup.scope).limit(1)).first() is not None
+    has_sessions = db_session.execute(select(InterviewSession.id).limit(1)).first() is not None
+    if has_rollups or not has_sessions:
+        return False
+    rebuild_stats_rollups(db_session)
+    return True
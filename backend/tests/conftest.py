@@ -0,0 +1,10 @@
+import os
+import sys
+
+# 与运行 app.py 一致：以 backend 目录为导入根
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("OPENAI_API_KEY", "test")
+# 文档文本在线程中提取，测试不启动进程池
+os.environ.setdefault("DOC_EXTRACT_WORKERS", "0")
@@ -0,0 +1,49 @@
+import asyncio
+import hashlib
+from models.database import Database
+from services.candidate_ranker import CandidateRanker
+from services.planner_analysis import PlannerAnalysisService
+from services.resume_store import StoredUpload
+
+POSTGRES_JD = {
+    "required_skills": [{"skill": "PostgreSQL", "importance": "high", "category": "database"}],
+    "experience_requirements": []
+}
+
+
+def _stored(tmp_path, name, text):
+    data = text.encode("utf-8")
+    path = tmp_path / name
+    path.write_bytes(data)
+    return StoredUpload(path, hashlib.sha256(data).hexdigest(), len(data), deduplicated=False)
+
+
+def test_local_profiles_rank_the_named_database_above_a_related_one(tmp_path, monkeypatch):
+    db = Database(f"sqlite:///{tmp_path / 'rank.db'}")
+    db.create_tables()
+    planner = PlannerAnalysisService("test")
+
+    async def jd_analysis(job_description):
+        return POSTGRES_JD
+
+    monkeypatch.setattr(planner, "extract_skills_from_jd_async", jd_analysis)
+    ranker = CandidateRanker(planner, db, workers=2)
+    uploads = [
+        ("sql.txt", _stored(tmp_path, "sql.txt", "Backend developer, 5 years of SQL reporting."), None),
+        ("postgres.txt", _stored(tmp_path, "postgres.txt", "Backend developer, 5 years running PostgreSQL."), None),
+    ]
+
+    async def scenario():
+        try:
+            events = [event async for event in ranker.run("PostgreSQL DBA", uploads)]
+            return ranker.page(events[-1]["ranking_id"])
+        finally:
+            await db.async_engine.dispose()
+
+    ranking = asyncio.run(scenario())
+    by_file = {candidate["filename"]: candidate for candidate in ranking["candidates"]}
+    assert [candidate["filename"] for candidate in ranking["candidates"]] == ["postgres.txt", "sql.txt"]
+    assert by_file["postgres.txt"]["strengths"] == ["PostgreSQL"]
+    assert by_file["sql.txt"]["skills"] == ["SQL"]
+    assert by_file["sql.txt"]["strengths"] == []
+    assert by_file["sql.txt"]["partial"] == ["PostgreSQL"]
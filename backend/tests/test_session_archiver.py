@@ -0,0 +1,31 @@
+from sqlalchemy import event, text
+from models.database import Database
+from services.session_archiver import SessionArchiver
+
+
+def test_incremental_vacuum_frees_step_pages_per_statement(tmp_path):
+    db = Database(f"sqlite:///{tmp_path / 'vacuum.db'}")
+    with db.engine.begin() as conn:
+        conn.execute(text("CREATE TABLE filler (data BLOB)"))
+        conn.execute(text("INSERT INTO filler VALUES (zeroblob(4096))"))
+        for _ in range(9):
+            conn.execute(text("INSERT INTO filler SELECT data FROM filler"))
+        conn.execute(text("DELETE FROM filler"))
+    with db.engine.connect() as conn:
+        free_pages = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+    assert free_pages > 300
+
+    # 记录每步之后的空闲页数
+    freelist = []
+
+    @event.listens_for(db.engine, "before_cursor_execute")
+    def record_freelist(conn, cursor, statement, parameters, context, executemany):
+        if statement == "PRAGMA freelist_count":
+            freelist.append(cursor.connection.execute(statement).fetchone()[0])
+
+    result = SessionArchiver(db, archive_dir=tmp_path / "archive").vacuum(step_pages=100)
+    assert result == {"mode": "incremental", "freed_pages": free_pages}
+    # 第一次是回收前；之后每步回收至多 step_pages 页，而不是一页
+    assert freelist[0] == free_pages
+    assert free_pages - freelist[1] == 100
+    assert len(freelist) <= free_pages // 100 + 2
@@ -0,0 +1,19 @@
+from services.skill_extractor import get_skill_extractor
+
+
+def test_synonym_group_is_not_expanded_into_category_skills():
+    extractor = get_skill_extractor()
+    found = extractor.category_skills("We need SQL experience and a database background. Redis a plus.")
+    assert [hit["skill"] for hit in found] == ["Redis"]
+
+
+def test_unambiguous_alias_maps_to_its_category_skill():
+    extractor = get_skill_extractor()
+    found = extractor.category_skills("Python services on k8s, backed by MySQL")
+    assert [hit["skill"] for hit in found] == ["Python", "MySQL", "Kubernetes"]
+
+
+def test_skill_names_keep_the_terms_the_text_uses():
+    extractor = get_skill_extractor()
+    names = extractor.skill_names("SQL, Machine Learning and design patterns; deployed with k8s")
+    assert names == ["SQL", "Machine Learning", "design patterns", "Kubernetes"]
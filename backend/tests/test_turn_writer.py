@@ -0,0 +1,39 @@
+import asyncio
+from sqlalchemy import func, select
+from models.database import Database, Question
+from models.turn_writer import TurnWriter
+
+
+def _turn(order_index):
+    return {"session_id": "s1", "order_index": order_index, "question_text": f"Q{order_index}"}
+
+
+def test_cancelled_commit_enqueue_does_not_stop_the_writer(tmp_path):
+    db = Database(f"sqlite:///{tmp_path / 'turns.db'}")
+    db.create_tables()
+
+    async def scenario():
+        writer = TurnWriter(db, durability="commit", max_delay_ms=50)
+        await writer.start()
+        try:
+            # 客户端断开：等待提交的请求被取消
+            first = asyncio.create_task(writer.enqueue(**_turn(0)))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            waiter = asyncio.create_task(writer.wait_for_session("s1"))
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+
+            await asyncio.wait_for(writer.enqueue(**_turn(1)), timeout=5)
+            assert writer.running
+            await asyncio.wait_for(writer.wait_for_session("s1"), timeout=5)
+            assert writer._pending == {}
+
+            async with db.get_async_session() as db_session:
+                count = await db_session.scalar(select(func.count(Question.id)).where(Question.session_id == "s1"))
+            assert count == 2
+        finally:
+            await writer.stop()
+            await db.async_engine.dispose()
+
+    asyncio.run(scenario())
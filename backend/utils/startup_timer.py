@@ -0,0 +1,37 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Dict
+
+
+class StartupTimer:
+    """Wall-clock breakdown of process start: imports, client construction, DB init"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.details: Dict[str, Any] = {}
+
+    def mark(self, phase: str, since: float) -> float:
+        """Record phase as the time elapsed since `since`; returns now"""
+        now = time.perf_counter()
+        self.phases[phase] = round((now - since) * 1000, 2)
+        return now
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark(name, started)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "phases_ms": dict(self.phases),
+            "total_ms": round(sum(self.phases.values()), 2),
+            **self.details
+        }
+
+    def print_report(self):
+        phases = ", ".join(f"{name}={ms}ms" for name, ms in self.phases.items())
+        print(f">>> 启动耗时: {phases} (total {self.report()['total_ms']}ms)")
@@ -197,8 +197,39 @@ export function useInterviewWebSocket({
 
 // ===== Interview Planner API Methods =====
 
-// 创建面试规划
-export async function createInterviewPlan(planData) {
+// 等待后台规划任务完成（SSE 进度流），返回任务结果
+// onProgress(task) 在每次阶段变化时回调
+export function waitForTask(accepted, onProgress) {
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(accepted.events_url);
+    source.addEventListener("progress", (event) => {
+      if (onProgress) onProgress(JSON.parse(event.data));
+    });
+    source.addEventListener("succeeded", (event) => {
+      source.close();
+      resolve(JSON.parse(event.data).result);
+    });
+    source.addEventListener("failed", (event) => {
+      source.close();
+      reject(new Error(`任务失败: ${JSON.parse(event.data).error}`));
+    });
+    source.onerror = () => {
+      // 连接中断时改为查询一次任务状态
+      source.close();
+      fetch(accepted.status_url)
+        .then((response) => response.json())
+        .then((task) => {
+          if (task.status === "succeeded") resolve(task.result);
+          else if (task.status === "failed") reject(new Error(`任务失败: ${task.error}`));
+          else resolve(waitForTask(accepted, onProgress));
+        })
+        .catch(reject);
+    };
+  });
+}
+
+// 创建面试规划（后台任务）
+export async function createInterviewPlan(planData, onProgress) {
   const response = await fetch("/api/planner/create", {
     method: "POST",
     headers: { "Content-Type": "application/json" },
@@ -209,7 +240,7 @@ export async function createInterviewPlan(planData) {
     throw new Error(`创建规划失败: ${response.statusText}`);
   }
   
-  return await response.json();
+  return await waitForTask(await response.json(), onProgress);
 }
 
 // 获取面试规划详情
@@ -241,8 +272,8 @@ export async function updateProgress(planId, progressData) {
   return await response.json();
 }
 
-// 上传简历
-export async function uploadResume(planId, file) {
+// 上传简历（后台解析任务）
+export async function uploadResume(planId, file, onProgress) {
   const formData = new FormData();
   formData.append('file', file);
   
@@ -255,7 +286,7 @@ export async function uploadResume(planId, file) {
     throw new Error(`上传简历失败: ${response.statusText}`);
   }
   
-  return await response.json();
+  return await waitForTask(await response.json(), onProgress);
 }
 
 // 获取用户规划总结